@@ -15,7 +15,8 @@ Buenas prácticas aplicadas:
 import sys
 import os
 import threading
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialog, QLineEdit, QComboBox, QListWidget, QTextEdit, QMessageBox, QInputDialog, QScrollArea, QShortcut, QSizePolicy, QMenu, QWidgetAction
+import bisect
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialog, QLineEdit, QComboBox, QListWidget, QListWidgetItem, QTextEdit, QMessageBox, QInputDialog, QScrollArea, QShortcut, QSizePolicy, QMenu, QWidgetAction
 from PyQt5.QtGui import QPainter, QPen, QColor, QLinearGradient, QIcon
 from PyQt5.QtCore import Qt, QTimer, QRectF, pyqtSignal
 
@@ -33,11 +34,13 @@ except Exception:
     from voz import escuchar_comando, hablar
 import json
 import speech_recognition as sr
-from datetime import datetime, timedelta
+from datetime import datetime
 try:
     from src import db  # nuevo backend SQLite
+    from src.paginacion import CargaPaginada
 except ImportError:
     import db  # type: ignore
+    from paginacion import CargaPaginada  # type: ignore
 
 class MicrofonoWidget(QWidget):
     """Widget decorativo que dibuja un micrófono con efecto neón animado."""
@@ -87,6 +90,14 @@ class AsistenteMain(QMainWindow):
     """
 
     chat_signal = pyqtSignal(str, str)
+    alertas_signal = pyqtSignal()
+    db_change_signal = pyqtSignal(object)  # db.Change, reenviado al hilo de la GUI
+    db_lista_signal = pyqtSignal(object)  # resumen de la inicialización en segundo plano
+    migracion_progreso_signal = pyqtSignal(str, int, int)  # fase, hechos, total
+    respaldo_progreso_signal = pyqtSignal(int, int)  # páginas copiadas, total
+    respaldo_fin_signal = pyqtSignal(object)  # ruta del snapshot o None
+    mantenimiento_signal = pyqtSignal(object)  # informe de db.run_maintenance
+    busqueda_signal = pyqtSignal(str, object)  # término y carpeta: abre los resultados paginados
 
     def _aplicar_color_titulo_windows(self, widget=None, rgb: tuple[int,int,int] = (102, 221, 255)) -> None:
         """Intenta colorear la barra de título en Windows 11 (DWMWA_CAPTION_COLOR).
@@ -308,11 +319,15 @@ class AsistenteMain(QMainWindow):
         if intent == 'search_note':
             p = analysis.get('params', {})
             res = self.buscar_notas(p.get('term'), p.get('folder'))
-            if res:
-                respuesta = 'Notas: ' + ', '.join([t for t,_ in res])
+            if res['results']:
+                respuesta = 'Notas: ' + ', '.join(r['title'] for r in res['results'])
+                self.chat_signal.emit(self._texto_busqueda(res), 'sistema')
+                if res['next'] is not None:
+                    self.busqueda_signal.emit(p.get('term'), p.get('folder'))
             else:
                 respuesta = 'Sin resultados'
-            self.chat_signal.emit(respuesta, 'sistema'); self.hablar_async(respuesta); return
+                self.chat_signal.emit(respuesta, 'sistema')
+            self.hablar_async(respuesta); return
         if intent == 'reminder_create':
             p = analysis.get('params', {})
             when = p.get('when_iso') or p.get('when_text')
@@ -401,6 +416,11 @@ class AsistenteMain(QMainWindow):
                 "- crear nota <título> [en <carpeta>] | leer nota <título>\n"
                 "- eliminar nota <título> | buscar nota <palabra> [en <carpeta>]\n"
                 "- /limpiar_legacy (renombrar archivos legacy eventos.json / notas)\n"
+                "- /respaldo (snapshot de la base en data/backups)\n"
+                "- /mantenimiento (compactar y optimizar la base)\n"
+                "- /borrar_carpeta <nombre> (eliminar una carpeta vacía)\n"
+                "- /historial | /restaurar <rev> (versiones de la nota abierta)\n"
+                "- /db_stats (consultas más costosas y aciertos de caché)\n"
             )
         elif texto_l.strip() == '/limpiar_legacy':
             ok = False
@@ -409,6 +429,58 @@ class AsistenteMain(QMainWindow):
             except Exception:
                 pass
             respuesta = 'Archivos legacy renombrados.' if ok else 'No había archivos legacy que renombrar.'
+        elif texto_l.startswith('/borrar_carpeta'):
+            nombre = texto.strip()[len('/borrar_carpeta'):].strip()
+            if not nombre:
+                respuesta = 'Uso: /borrar_carpeta <nombre>'
+            elif db.folder_delete(nombre):
+                respuesta = f"Carpeta '{nombre}' eliminada."
+            else:
+                respuesta = f"No se pudo eliminar '{nombre}': no existe o tiene notas."
+        elif texto_l.strip() == '/historial' or texto_l.startswith('/restaurar'):
+            titulo = self.titulo_edit.text().strip()
+            carpeta = self.carpeta_actual()
+            if not titulo:
+                respuesta = 'Abre una nota en el panel de notas primero.'
+            elif texto_l.startswith('/restaurar'):
+                rev = texto_l[len('/restaurar'):].strip()
+                if rev.isdigit() and db.note_revision_restore(titulo, carpeta, int(rev)):
+                    self.contenido_edit.setPlainText(db.note_get(titulo, carpeta) or '')
+                    respuesta = f"Nota '{titulo}' restaurada a la revisión {rev}."
+                else:
+                    respuesta = 'Uso: /restaurar <revisión> (ver /historial)'
+            else:
+                from datetime import datetime
+                revs = db.note_revisions(titulo, carpeta)
+                respuesta = (f"Revisiones de '{titulo}' (rev | fecha | caracteres):\n" + "\n".join(
+                    f"- {r['rev']} | {datetime.fromtimestamp(r['created']):%Y-%m-%d %H:%M} | {r['size']}"
+                    for r in revs[:15])) if revs else f"'{titulo}' no tiene revisiones."
+        elif texto_l.strip() == '/db_stats':
+            filas = list(db.stats().items())[:8]
+            respuesta = "Consultas (total ms | llamadas | media | p95 | filas):\n" + "\n".join(
+                f"- {n}: {m['total_ms']:.1f} | {m['calls']} | {m['mean_ms']:.2f} | {m['p95_ms']:.2f} | {m['rows']}"
+                for n, m in filas) if filas else 'Sin consultas registradas.'
+            respuesta += "\nCaché (aciertos | fallos | % | entradas | KB):\n" + "\n".join(
+                f"- {n}: {c['hits']} | {c['misses']} | {c['hit_rate']:.0%} | {c['items']} | {c['bytes'] / 1024:.1f}"
+                for n, c in db.cache_stats().items())
+            try:
+                from src import nlp
+            except Exception:
+                import nlp  # type: ignore
+            c = nlp.cache_stats()
+            respuesta += f"\n- nlp (analyze): {c['hits']} | {c['misses']} | {c['hit_rate']:.0%} | {c['items']} | -"
+        elif texto_l.strip() == '/mantenimiento':
+            if self._mantenimiento is None:
+                respuesta = 'El mantenimiento no está disponible.'
+            else:
+                threading.Thread(target=self._mantenimiento.revisar, kwargs={'force': True}, daemon=True).start()
+                respuesta = 'Optimizando la base en segundo plano…'
+        elif texto_l.strip() == '/respaldo':
+            if self._respaldos is None:
+                respuesta = 'Los respaldos no están disponibles.'
+            else:
+                self._respaldos.respaldar_ahora()
+                respuesta = 'Creando snapshot de la base en segundo plano…'
         # Decir la hora
         elif "hora" in texto_l:
             from datetime import datetime
@@ -630,9 +702,14 @@ class AsistenteMain(QMainWindow):
             if m:
                 palabra = m.group(1).strip()
                 carpeta = m.group(3).strip() if m.group(3) else None
-                resultados = self.buscar_notas(palabra, carpeta)
-                if resultados:
-                    respuesta = "Notas encontradas: " + ", ".join([f"'{t}' (carpeta: {c})" for t,c in resultados])
+                res = self.buscar_notas(palabra, carpeta)
+                if res['results']:
+                    respuesta = "Notas encontradas: " + ", ".join(f"'{r['title']}'" for r in res['results'])
+                    self.chat_signal.emit(self._texto_busqueda(res), 'sistema')
+                    if res['next'] is not None:
+                        self.busqueda_signal.emit(palabra, carpeta)
+                    self.hablar_async(respuesta)
+                    return
                 else:
                     respuesta = "No se encontraron notas con ese término."
             else:
@@ -682,6 +759,18 @@ class AsistenteMain(QMainWindow):
                 self._escucha_thread.join(timeout=1.0)
         except Exception:
             pass
+        try:
+            if getattr(self, '_respaldos', None) is not None:
+                self._respaldos.detener(timeout=2.0)
+            if getattr(self, '_mantenimiento', None) is not None:
+                self._mantenimiento.detener(timeout=2.0)
+            if getattr(self, '_alertas', None) is not None:
+                db.unsubscribe(self._alertas.on_change)
+            db.unsubscribe(self._db_change_cb)
+            db.unsubscribe_migration_progress(self._migracion_cb)
+            db.close_all()
+        except Exception:
+            pass
         super().closeEvent(event)
     def __init__(self) -> None:
         super().__init__()
@@ -692,29 +781,46 @@ class AsistenteMain(QMainWindow):
         self.chat_layout = None
         self.chat_signal.connect(self.mostrar_mensaje_chat)
         self._escucha_iniciada = False
-        # Recordatorios de eventos (diario) y alertas puntuales (cada minuto)
+        # Recordatorios de eventos (diario) y alertas puntuales (programadas)
         self._recordatorio_fecha_mostrado = None
         self._timer_recordatorios = None
         self._timer_alertas = None
+        self._alertas = None
+        self._respaldos = None
+        self._mantenimiento = None
         self._active_notifs = []
         # Config runtime (actualizado desde panel)
         self.config_mic_index = None
         self.init_ui()
-        # Mensaje de migración (primera vez)
+        # Cambios de la base → parches incrementales de las listas
         try:
-            msg_m = db.consume_migration_message()
-            if msg_m:
-                self.chat_signal.emit(msg_m, 'sistema')
+            self.migracion_progreso_signal.connect(self._mostrar_progreso_migracion)
+            # Guardar el callable: cada acceso a una señal ligada crea un objeto nuevo
+            self._migracion_cb = self.migracion_progreso_signal.emit
+            self._db_change_cb = self.db_change_signal.emit
+            db.subscribe_migration_progress(self._migracion_cb)
+            self.db_lista_signal.connect(self._db_lista)
+            self.busqueda_signal.connect(self.mostrar_resultados_busqueda)
+            self.db_change_signal.connect(self._aplicar_cambio_db)
+            db.subscribe(self._db_change_cb)
         except Exception:
             pass
-        # Iniciar recordatorios después de construir la UI
+        # Migraciones en segundo plano: el mensaje llega cuando terminan
         try:
-            self._iniciar_recorditorios()
+            db.init_async().add_done_callback(
+                lambda f: self.db_lista_signal.emit(None if f.exception() else f.result()))
         except Exception:
             pass
-        # Iniciar alertas puntuales (cada minuto)
+        # Recordatorios y alertas leen eventos (esquema v3+): arrancan en _db_lista,
+        # cuando init_async termina, para no bloquear la ventana con los upgrades
+        # Snapshots diarios de la base en segundo plano
         try:
-            self._iniciar_alertas()
+            self._iniciar_respaldos()
+        except Exception:
+            pass
+        # Mantenimiento de la base (checkpoint, optimize, vacuum) en ratos ociosos
+        try:
+            self._iniciar_mantenimiento()
         except Exception:
             pass
 
@@ -1061,6 +1167,9 @@ class AsistenteMain(QMainWindow):
         self.lista_notas = QListWidget()
         self.lista_notas.setStyleSheet("background:rgba(0,0,0,0.18);color:#fff;border-radius:8px;padding:6px;font-size:14px;")
         notes_layout.addWidget(self.lista_notas)
+        # Títulos por páginas (cursor title, id) a medida que se hace scroll
+        self._paginas_notas = CargaPaginada(
+            self.lista_notas, lambda despues: db.note_list_titles_page(self.carpeta_actual(), despues))
         self.titulo_edit = QLineEdit()
         self.titulo_edit.setPlaceholderText("Título de la nota")
         self.titulo_edit.setStyleSheet("background:rgba(0,0,0,0.18);color:#fff;border-radius:8px;padding:8px;font-size:14px;")
@@ -1176,9 +1285,11 @@ class AsistenteMain(QMainWindow):
             "<b>Voz:</b> cambia voz edge español femenina | cambia voz gtts<br>"
             "<b>Aplicaciones:</b> abrir calculadora | abrir navegador<br>"
             "<b>Limpiar legacy:</b> /limpiar_legacy<br>"
+            "<b>Respaldo:</b> /respaldo<br>"
+            "<b>Mantenimiento:</b> /mantenimiento<br>"
             "<b>Salir:</b> salir | cerrar asistente<br>"
             "<hr style='border:0;border-top:1px solid #0ff;margin:10px 0;'>"
-            "<small style='color:#8be9ff;'>Consejo: puedes hablar o escribir; el NLP soporta fechas naturales si dateparser está instalado.</small>"
+            "<small style='color:#8be9ff;'>Consejo: puedes hablar o escribir; el NLP entiende fechas como «mañana a las 5» o «en 10 minutos» (más formas si dateparser está instalado).</small>"
         )
 
     def _toggle_help(self):
@@ -1462,40 +1573,133 @@ class AsistenteMain(QMainWindow):
 
     # ===== Alertas de eventos (hora exacta y 5 minutos antes) =====
     def _iniciar_alertas(self) -> None:
-        """Temporizador que revisa cada minuto si hay que disparar alertas."""
+        """Programa alertas con un montículo de disparos y un QTimer de un solo disparo.
+
+        El temporizador duerme hasta el próximo disparo; los cambios en la tabla
+        events (vía db.subscribe) actualizan el montículo y re‑arman el timer.
+        """
+        try:
+            from src.alertas import ProgramadorAlertas
+        except Exception:
+            from alertas import ProgramadorAlertas  # type: ignore
         self._timer_alertas = QTimer(self)
-        self._timer_alertas.setInterval(60 * 1000)  # 1 minuto
+        self._timer_alertas.setSingleShot(True)
         self._timer_alertas.timeout.connect(self._revisar_alertas)
-        self._timer_alertas.start()
+        self.alertas_signal.connect(self._reprogramar_alertas)
+        # El callback puede llegar desde cualquier hilo: reenviar por señal Qt
+        self._alertas = ProgramadorAlertas(al_cambiar=self.alertas_signal.emit)
+        self._alertas.cargar()
+        db.subscribe(self._alertas.on_change)
+
+    def _mostrar_progreso_migracion(self, fase: str, hechos: int, total: int) -> None:
+        if total:
+            self.statusBar().showMessage(f"Migrando {fase}: {hechos}/{total}")
+
+    def _db_lista(self, resumen) -> None:
+        """Inicialización de la base terminada (hilo GUI): lecturas que esperan el esquema."""
+        # Iniciar recordatorios del día
+        try:
+            if self._timer_recordatorios is None:
+                self._iniciar_recordatorios()
+        except Exception:
+            pass
+        # Iniciar alertas puntuales (hora exacta y 5 min antes)
+        try:
+            if self._alertas is None:
+                self._iniciar_alertas()
+        except Exception:
+            pass
+        self._mostrar_mensaje_migracion(resumen)
 
-    def _revisar_alertas(self) -> None:
-        from datetime import datetime as _dt
-        hora_actual = _dt.now().strftime('%H:%M')
-        fecha_actual = str(_dt.now().date())
+    def _mostrar_mensaje_migracion(self, resumen) -> None:
+        """Mensaje de migración (primera vez), tras la inicialización de la base."""
         try:
-            from calendario import leer_eventos
-            eventos = leer_eventos()
+            db.unsubscribe_migration_progress(self._migracion_cb)
+            self.statusBar().clearMessage()
         except Exception:
-            eventos = []
-        for ev in eventos:
-            fecha = ev.get('fecha')
-            hora = ev.get('hora')
-            if ev.get('completado'):
-                continue
-            if fecha != fecha_actual or not hora:
-                continue
-            # Comparar hora exacta
-            if hora == hora_actual:
-                self._disparar_alerta(ev, previo=False)
-            # Comparar 5 minutos antes
+            pass
+        try:
+            # Notas migradas antes de suscribirse a los cambios: recargar listas
+            if resumen and resumen.get('notas_migradas'):
+                self.cargar_combo_carpetas()
+                self.cargar_lista_notas()
+        except Exception:
+            pass
+        try:
+            msg_m = db.consume_migration_message()
+            if msg_m:
+                self.chat_signal.emit(msg_m, 'sistema')
+        except Exception:
+            pass
+
+    # ===== Snapshots de la base =====
+    def _iniciar_respaldos(self) -> None:
+        """Snapshot diario (API de backup de SQLite) en un hilo de fondo con rotación."""
+        try:
+            from src.respaldos import ProgramadorRespaldos
+        except Exception:
+            from respaldos import ProgramadorRespaldos  # type: ignore
+        self.respaldo_progreso_signal.connect(self._mostrar_progreso_respaldo)
+        self.respaldo_fin_signal.connect(self._fin_respaldo)
+        self._respaldos = ProgramadorRespaldos(al_progreso=self.respaldo_progreso_signal.emit,
+                                               al_terminar=self.respaldo_fin_signal.emit)
+        self._respaldos.iniciar()
+
+    def _iniciar_mantenimiento(self) -> None:
+        """Revisa los umbrales de mantenimiento cada 5 min y actúa si la base está ociosa."""
+        try:
+            from src.mantenimiento import ProgramadorMantenimiento
+        except Exception:
+            from mantenimiento import ProgramadorMantenimiento  # type: ignore
+        self.mantenimiento_signal.connect(self._fin_mantenimiento)
+        self._mantenimiento = ProgramadorMantenimiento(al_terminar=self.mantenimiento_signal.emit)
+        self._mantenimiento.iniciar()
+
+    def _precalentar_nlp(self) -> None:
+        """Carga dateparser en segundo plano una vez visible la ventana: el primer comando no paga la importación."""
+        try:
             try:
-                h, m = map(int, hora.split(':'))
-                dt_ev = _dt.strptime(f"{fecha} {h:02d}:{m:02d}", "%Y-%m-%d %H:%M")
-                dt_prev = dt_ev - timedelta(minutes=5)
-                if _dt.now().strftime('%Y-%m-%d %H:%M') == dt_prev.strftime('%Y-%m-%d %H:%M'):
-                    self._disparar_alerta(ev, previo=True)
+                from src import nlp
             except Exception:
-                continue
+                import nlp  # type: ignore
+            nlp.warmup()
+        except Exception:
+            pass
+
+    def _fin_mantenimiento(self, informe) -> None:
+        if informe and informe.get('tasks'):
+            kb = informe.get('reclaimed_bytes', 0) // 1024
+            self.statusBar().showMessage(
+                f"Base optimizada ({', '.join(informe['tasks'])}); {kb} KB recuperados", 8000)
+
+    def _mostrar_progreso_respaldo(self, copiadas: int, total: int) -> None:
+        if total:
+            self.statusBar().showMessage(f"Snapshot de la base: {copiadas * 100 // total}%")
+
+    def _fin_respaldo(self, ruta) -> None:
+        if ruta:
+            self.statusBar().showMessage(f"Snapshot guardado: {os.path.basename(ruta)}", 8000)
+        else:
+            self.statusBar().showMessage("Error al crear el snapshot (ver data/db_errors.log)", 8000)
+
+    def _reprogramar_alertas(self) -> None:
+        from datetime import datetime as _dt
+        if self._timer_alertas is None or self._alertas is None:
+            return
+        proximo = self._alertas.proximo_disparo()
+        if proximo is None:
+            self._timer_alertas.stop()
+            return
+        espera = max(0, proximo - db.to_start_ts(_dt.now()))
+        # Tope de 1 h para absorber cambios del reloj del sistema
+        self._timer_alertas.start(min(espera, 3600) * 1000)
+
+    def _revisar_alertas(self) -> None:
+        try:
+            for ev, previo in self._alertas.vencidas():
+                self._disparar_alerta(ev, previo=previo)
+        finally:
+            self._reprogramar_alertas()
 
     def _disparar_alerta(self, ev: dict, previo: bool) -> None:
         """Muestra en chat, reproduce sonido y notificación interactiva."""
@@ -1621,14 +1825,8 @@ class AsistenteMain(QMainWindow):
         self.carpeta_combo.blockSignals(False)
 
     def cargar_lista_notas(self) -> None:
-        carpeta = self.carpeta_actual()
-        try:
-            titulos = db.note_list_titles(carpeta)
-        except Exception:
-            titulos = []
-        self.lista_notas.clear()
-        for t in titulos:
-            self.lista_notas.addItem(t)
+        """Carga la primera página de títulos; el resto llega al hacer scroll."""
+        self._paginas_notas.recargar()
 
     def cargar_nota_desde_lista(self, item) -> None:
         titulo = item.text()
@@ -1651,8 +1849,8 @@ class AsistenteMain(QMainWindow):
             return
         carpeta = self.carpeta_actual()
         if db.note_upsert(titulo, contenido, carpeta):
+            # La lista se actualiza vía _aplicar_cambio_db
             self.chat_signal.emit(f"Nota '{titulo}' guardada.", 'sistema')
-            self.cargar_lista_notas()
         else:
             QMessageBox.critical(self, "Notas", "Error guardando la nota en la base de datos.")
 
@@ -1665,7 +1863,6 @@ class AsistenteMain(QMainWindow):
         carpeta = self.carpeta_actual()
         if db.note_delete(titulo, carpeta):
             self.chat_signal.emit(f"Nota '{titulo}' eliminada.", 'sistema')
-            self.cargar_lista_notas()
             if self.titulo_edit.text().strip() == titulo:
                 self.titulo_edit.clear()
                 self.contenido_edit.clear()
@@ -1679,17 +1876,62 @@ class AsistenteMain(QMainWindow):
             if not nombre:
                 QMessageBox.information(self, "Notas", "El nombre no puede estar vacío.")
                 return
-            # Crear una nota dummy para asegurar carpeta en listado si está vacía
-            dummy_title = f"__carpeta__{nombre}__placeholder__"
-            db.note_upsert(dummy_title, "", nombre)
-            # Eliminar placeholder si existía
-            db.note_delete(dummy_title, nombre)
-            self.cargar_combo_carpetas()
-            idx = self.carpeta_combo.findText(nombre)
-            if idx >= 0:
-                self.carpeta_combo.setCurrentIndex(idx)
+            # Carpeta vacía real en la base (tabla folders); el combo se parchea por el bus
+            db.folder_create(nombre)
+            idx = self._insertar_carpeta_combo(nombre)
+            self.carpeta_combo.setCurrentIndex(idx)
             self.cargar_lista_notas()
 
+    def _insertar_carpeta_combo(self, nombre: str) -> int:
+        """Inserta la carpeta en orden (tras "(sin carpeta)") si no existe; devuelve su índice."""
+        idx = self.carpeta_combo.findText(nombre)
+        if idx >= 0:
+            return idx
+        pos = 1
+        while pos < self.carpeta_combo.count() and self.carpeta_combo.itemText(pos) < nombre:
+            pos += 1
+        self.carpeta_combo.blockSignals(True)
+        self.carpeta_combo.insertItem(pos, nombre)
+        self.carpeta_combo.blockSignals(False)
+        return pos
+
+    def _aplicar_cambio_db(self, change) -> None:
+        """Parchea combo de carpetas y lista de notas a partir de un db.Change."""
+        if getattr(change, 'table', None) == 'folders':
+            for (nombre,) in change.keys:
+                idx = self.carpeta_combo.findText(nombre)
+                if change.kind == 'insert':
+                    self._insertar_carpeta_combo(nombre)
+                elif change.kind == 'delete' and idx > 0:
+                    seleccionada = idx == self.carpeta_combo.currentIndex()
+                    self.carpeta_combo.blockSignals(True)
+                    self.carpeta_combo.removeItem(idx)
+                    if seleccionada:
+                        self.carpeta_combo.setCurrentIndex(0)
+                    self.carpeta_combo.blockSignals(False)
+                    if seleccionada:
+                        self.cargar_lista_notas()
+            return
+        if getattr(change, 'table', None) != 'notes' or change.kind == 'update':
+            return
+        actual = self.carpeta_actual() or ''
+        titulos = [self.lista_notas.item(i).text() for i in range(self.lista_notas.count())]
+        for titulo, carpeta in change.keys:
+            if change.kind == 'insert':
+                if carpeta:
+                    self._insertar_carpeta_combo(carpeta)
+                # Títulos más allá de lo cargado llegarán con su página
+                if carpeta == actual and titulo not in titulos and self._paginas_notas.cubre((titulo,)):
+                    pos = bisect.bisect_left(titulos, titulo)
+                    titulos.insert(pos, titulo)
+                    self.lista_notas.insertItem(pos, titulo)
+            elif change.kind == 'delete':
+                if carpeta == actual and titulo in titulos:
+                    pos = titulos.index(titulo)
+                    del titulos[pos]
+                    self.lista_notas.takeItem(pos)
+        # Las carpetas que quedan vacías se conservan (se borran con /borrar_carpeta)
+
     # ===== Helpers de notas (BD) =====
     def guardar_nota(self, titulo: str, contenido: str, carpeta: str | None = None) -> None:
         db.note_upsert(titulo, contenido, carpeta)
@@ -1700,8 +1942,77 @@ class AsistenteMain(QMainWindow):
     def eliminar_nota(self, titulo: str, carpeta: str | None = None) -> bool:
         return db.note_delete(titulo, carpeta)
 
-    def buscar_notas(self, palabra: str, carpeta: str | None = None) -> list[tuple[str, str | None]]:
-        return db.note_search(palabra, carpeta)
+    def buscar_notas(self, palabra: str, carpeta: str | None = None) -> dict:
+        """Primera página de la búsqueda: {'results': [{title, folder, snippet}], 'next': cursor | None}."""
+        return self._pagina_busqueda_notas(palabra, carpeta)(None)
+
+    def _pagina_busqueda_notas(self, palabra: str, carpeta: str | None, limite: int = 20):
+        """Función de página (para CargaPaginada) de una búsqueda de notas.
+
+        Primero las coincidencias por relevancia (FTS5/bm25, cursor (score, id),
+        con el fragmento resaltado); agotadas, las que solo encuentra la búsqueda
+        por subcadena (cursor ('like', (title, id))). Cada página es una consulta
+        con LIMIT: el total es el de db.note_search sin cargarlo entero.
+        """
+        def pagina(despues):
+            if despues is None or despues[0] != 'like':
+                res = db.note_search_ranked(palabra, carpeta, limit=limite, after=despues)
+                filas = [{'title': r['title'], 'folder': r['folder'], 'snippet': r['snippet']}
+                         for r in res['results']]
+                if res['next'] is not None:
+                    return {'results': filas, 'next': res['next']}
+                despues, cupo = ('like', None), limite - len(filas)
+            else:
+                filas, cupo = [], limite
+            extra = db.note_search_page(palabra, carpeta, despues[1], cupo, exclude_ranked=True)
+            filas += [{'title': t, 'folder': c, 'snippet': None} for t, c in extra['results']]
+            return {'results': filas, 'next': ('like', extra['next']) if extra['next'] else None}
+        return pagina
+
+    def _texto_busqueda(self, res: dict) -> str:
+        """Resultados para el chat: título, carpeta y fragmento con las coincidencias resaltadas."""
+        lineas = ["Notas encontradas:"]
+        for r in res['results']:
+            linea = f"• {r['title']}" + (f" (carpeta: {r['folder']})" if r['folder'] else "")
+            lineas.append(linea + (f": {r['snippet']}" if r['snippet'] else ""))
+        if res['next'] is not None:
+            lineas.append("… hay más en la ventana de resultados.")
+        return "\n".join(lineas)
+
+    def mostrar_resultados_busqueda(self, palabra: str, carpeta: str | None = None) -> None:
+        """Ventana con todos los resultados, cargados por páginas al hacer scroll."""
+        dlg = QDialog(self)
+        dlg.setWindowTitle(f"Notas: {palabra}")
+        dlg.resize(520, 480)
+        lay = QVBoxLayout(dlg)
+        lista = QListWidget()
+        lista.setStyleSheet("background:rgba(0,0,0,0.18);color:#fff;border-radius:8px;padding:6px;font-size:14px;")
+        lay.addWidget(lista)
+
+        def crear(r: dict) -> QListWidgetItem:
+            texto = r['title'] + (f" (carpeta: {r['folder']})" if r['folder'] else "")
+            it = QListWidgetItem(texto + (f"\n{r['snippet']}" if r['snippet'] else ""))
+            it.setData(Qt.UserRole, (r['title'], r['folder']))
+            return it
+
+        dlg._paginas = CargaPaginada(lista, self._pagina_busqueda_notas(palabra, carpeta), crear=crear)
+        lista.itemClicked.connect(lambda it: self._abrir_nota_resultado(*it.data(Qt.UserRole)))
+        dlg.setAttribute(Qt.WA_DeleteOnClose)
+        dlg.show()
+        dlg._paginas.recargar()
+
+    def _abrir_nota_resultado(self, titulo: str, carpeta: str | None) -> None:
+        """Selecciona la carpeta de la nota y la abre en el editor."""
+        idx = self.carpeta_combo.findText(carpeta) if carpeta else 0
+        if idx >= 0 and idx != self.carpeta_combo.currentIndex():
+            self.carpeta_combo.setCurrentIndex(idx)
+            self.cargar_lista_notas()
+        contenido = db.note_get(titulo, carpeta)
+        if contenido is None:
+            self.chat_signal.emit(f"No se pudo abrir la nota '{titulo}'.", 'sistema')
+            return
+        self.titulo_edit.setText(titulo)
+        self.contenido_edit.setPlainText(contenido)
 
     # ===== Calendario =====
     def abrir_calendario(self) -> None:
@@ -1764,6 +2075,7 @@ class AsistenteMain(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    db.init_async()  # apertura rápida; migraciones en segundo plano
     ventana = AsistenteMain()
     # Asegurar botones de minimizar/maximizar/cerrar y mostrar maximizada
     try:
@@ -1773,4 +2085,5 @@ if __name__ == "__main__":
     ventana.showMaximized()
     # Aplicar color a la barra de título (Windows 11+)
     QTimer.singleShot(0, ventana._aplicar_color_titulo_windows)
+    QTimer.singleShot(0, ventana._precalentar_nlp)  # tras el primer pintado
     sys.exit(app.exec_())
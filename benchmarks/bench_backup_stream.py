@@ -0,0 +1,65 @@
+"""Benchmark: memoria pico de backup_export/backup_import (NDJSON en streaming vs. JSON completo).
+
+Ejecutar: python benchmarks/bench_backup_stream.py [n_notas]
+Usa una base temporal (no toca data/app.db). Mide con tracemalloc.
+"""
+import json, sys, tempfile, time, tracemalloc
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db  # type: ignore
+
+N = 20_000
+
+def _medir(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    res = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return res, elapsed, peak / 2**20
+
+def _export_json_completo(path: Path) -> None:
+    """Exportación previa: todas las filas en dicts + un único json.dumps."""
+    conn = db.get_conn()
+    data = {}
+    for tbl in ('events', 'notes', 'config'):
+        cur = conn.execute(f"SELECT * FROM {tbl}")
+        cols = [d[0] for d in cur.description]
+        data[tbl] = [dict(zip(cols, row)) for row in cur.fetchall()]
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+def _usar_base(path: Path) -> None:
+    db.close_all()
+    db.DB_PATH = path
+    db.get_conn()
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db.NOTAS_DIR = tmp_dir / 'notas'
+        db.EVENTOS_JSON = tmp_dir / 'eventos.json'
+        db.MIGRATION_MSG_FILE = tmp_dir / 'migration.json'
+        db.CONFIG_JSON_PATH = tmp_dir / 'config.json'
+        _usar_base(tmp_dir / 'origen.db')
+        db.note_upsert_many([(f'Nota {i}', f'contenido {i} ' * 200, f'c{i % 10}') for i in range(n)])
+        db.event_create_many([(f'Evento {i}', f'2099-{i % 12 + 1:02d}-{i % 28 + 1:02d}', '') for i in range(n)])
+        print(f"{n} notas (~{len('contenido 0 ' * 200)} B) + {n} eventos")
+        casos = (
+            ('JSON completo ', tmp_dir / 'b.json', lambda p: _export_json_completo(p)),
+            ('NDJSON        ', tmp_dir / 'b.ndjson', lambda p: db.backup_export(str(p))),
+            ('NDJSON gzip   ', tmp_dir / 'b.ndjson.gz', lambda p: db.backup_export(str(p))),
+        )
+        for nombre, path, fn in casos:
+            _usar_base(tmp_dir / 'origen.db')
+            _, t, mb = _medir(lambda: fn(path))
+            print(f"export {nombre} {t:6.2f} s  pico {mb:7.1f} MiB  archivo {path.stat().st_size / 2**20:6.1f} MiB")
+        for nombre, path, _ in casos:
+            _usar_base(tmp_dir / f'destino_{path.name}.db')
+            ok, t, mb = _medir(lambda: db.backup_import(str(path)))
+            print(f"import {nombre} {t:6.2f} s  pico {mb:7.1f} MiB  ok={ok}")
+        db.close_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark: importación de 10k eventos + 10k notas vía backup_import.
+
+Ejecutar: python benchmarks/bench_bulk_import.py
+Usa una base temporal (no toca data/app.db).
+"""
+import json, sys, tempfile, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db  # type: ignore
+
+N = 10_000
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db.close_all()
+        db.DB_PATH = tmp_dir / 'bench.db'
+        db.NOTAS_DIR = tmp_dir / 'notas'
+        db.EVENTOS_JSON = tmp_dir / 'eventos.json'
+        db.MIGRATION_MSG_FILE = tmp_dir / 'migration.json'
+        db.CONFIG_JSON_PATH = tmp_dir / 'config.json'
+        blob = {
+            'events': [{'title': f'Evento {i}', 'date': f'2099-{i % 12 + 1:02d}-{i % 28 + 1:02d}',
+                        'time': f'{i % 24:02d}:{i % 60:02d}', 'completed': 0} for i in range(N)],
+            'notes': [{'title': f'Nota {i}', 'content': f'contenido de la nota {i} ' * 4,
+                       'folder': f'carpeta{i % 10}'} for i in range(N)],
+            'config': [],
+        }
+        src = tmp_dir / 'import.json'
+        src.write_text(json.dumps(blob), encoding='utf-8')
+        db.get_conn()
+        t0 = time.perf_counter()
+        ok = db.backup_import(str(src))
+        elapsed = time.perf_counter() - t0
+        n_ev = db.get_conn().execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        n_no = db.get_conn().execute('SELECT COUNT(*) FROM notes').fetchone()[0]
+        print(f"backup_import ok={ok}: {n_ev} eventos + {n_no} notas en {elapsed*1000:.1f} ms")
+        db.close_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Benchmark: config_store.load_config() con caché vs. lectura desde SQLite.
+
+Ejecutar: python benchmarks/bench_config_cache.py
+Usa una base temporal (no toca data/app.db).
+"""
+import sys, tempfile, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db, config_store  # type: ignore
+
+N = 20_000
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db.close_all()
+        db.DB_PATH = tmp_dir / 'bench.db'
+        db.NOTAS_DIR = tmp_dir / 'notas'
+        db.EVENTOS_JSON = tmp_dir / 'eventos.json'
+        db.MIGRATION_MSG_FILE = tmp_dir / 'migration.json'
+        db.CONFIG_JSON_PATH = tmp_dir / 'config.json'
+        config_store.save_config({**config_store.DEFAULT_CFG, 'voice_name': 'es-ES-ElviraNeural'})
+        # Sin caché: se invalida antes de cada llamada (equivale al SELECT + json.loads previo)
+        t0 = time.perf_counter()
+        for _ in range(N):
+            db._invalidate_config_cache()
+            config_store.load_config()
+        sin_cache = (time.perf_counter() - t0) / N
+        config_store.load_config()
+        t0 = time.perf_counter()
+        for _ in range(N):
+            config_store.load_config()
+        con_cache = (time.perf_counter() - t0) / N
+        print(f"load_config sin caché: {sin_cache*1e6:.1f} µs/llamada")
+        print(f"load_config con caché: {con_cache*1e6:.2f} µs/llamada (x{sin_cache/con_cache:.0f})")
+        db.close_all()
+
+if __name__ == '__main__':
+    main()
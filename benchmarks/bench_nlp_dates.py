@@ -0,0 +1,46 @@
+"""Benchmark: cobertura y latencia del parser de fechas en español de nlp.
+
+Ejecutar: python benchmarks/bench_nlp_dates.py
+Para un corpus de expresiones habituales en recordatorios mide qué fracción
+resuelve nlp.parse_when sin dateparser y cuánto tarda, frente a
+dateparser.parse con los mismos ajustes (si está instalado).
+"""
+import sys, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import nlp  # type: ignore
+
+FRASES = [
+    "mañana", "pasado mañana", "hoy a las 17:30", "mañana a las 5", "mañana a las 8 de la mañana",
+    "mañana a las 5 de la tarde", "el lunes", "el viernes a las 9", "el próximo martes a las 10:15",
+    "en 10 minutos", "en una hora", "dentro de media hora", "en 2 horas y media", "en 3 días",
+    "dentro de 2 semanas", "a las 9", "a las 9 y media", "a las 8 menos cuarto", "al mediodía",
+    "a medianoche", "5 de marzo", "el 12 de octubre a las 10", "2025-12-24 a las 20:00", "24/12",
+    "24/12/2026 a las 9 pm", "a las 7 pm", "mañana al mediodía", "sábado a las 11 de la noche",
+    # Formas que quedan para dateparser
+    "fin de mes", "la semana que viene", "esta noche", "el primer lunes de abril",
+]
+REPS = 200
+
+def _medir(fn) -> tuple[float, int]:
+    resueltas = 0
+    t0 = time.perf_counter()
+    for _ in range(REPS):
+        resueltas = sum(1 for f in FRASES if fn(f))
+    return (time.perf_counter() - t0) / (REPS * len(FRASES)), resueltas
+
+def main() -> None:
+    media, n = _medir(nlp.parse_when)
+    print(f"parse_when: {n}/{len(FRASES)} frases ({n / len(FRASES):.0%}), {media * 1e6:.1f} µs por frase")
+    faltan = [f for f in FRASES if not nlp.parse_when(f)]
+    print("  sin reconocer:", ", ".join(faltan) or "-")
+    if not nlp.wait_ready(60) or not nlp._load_dateparser():
+        print("dateparser no está instalado: sin comparación")
+        return
+    global REPS
+    REPS = 3
+    media, n = _medir(nlp._parse_natural_datetime)
+    print(f"dateparser: {n}/{len(FRASES)} frases ({n / len(FRASES):.0%}), {media * 1e6:.1f} µs por frase")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark: comandos por segundo de nlp.analyze según el número de patrones.
+
+Ejecutar: python benchmarks/bench_nlp_intents.py [max_extra]
+Añade comandos sintéticos a COMMAND_PATTERNS y frases a INTENT_PATTERNS
+(palabras inventadas), recompila y mide dos mezclas: comandos reales y
+frases con errores o dentro de oraciones largas (puntuación difusa por índice
+de trigramas). Ambos ritmos deben mantenerse planos. Se miden sin la caché
+de resultados de analyze; la última columna repite los comandos con ella.
+"""
+import random, sys, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import nlp  # type: ignore
+
+COMANDOS = [
+    "crear evento Reunión de equipo el 2025-03-04 a las 10:30",
+    "eliminar evento Dentista de 2025-03-05",
+    "crear nota lista de compras en casa",
+    "buscar nota presupuesto",
+    "cambia tema oscuro",
+    "abrir calculadora",
+    "qué tengo hoy",
+    "que hora es",
+    "hola",
+    "cerrar asistente",
+]
+DIFUSOS = [
+    "holaa",
+    "buenas dias asistente",
+    "ayudaa por favor",
+    "oye me podrias mostrar la agenda hoy",
+    "termina el asistente",
+    "quiero escuchar algo de musica tranquila para trabajar",
+]
+EXTRAS = (0, 10, 100, 1000)
+REPS = 2000
+
+def _palabra(rnd: random.Random) -> str:
+    return ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7))
+
+def _medir(textos: list, cache: bool = False) -> float:
+    nlp.cache_clear()
+    nlp._cache.max_items = nlp.ANALYZE_CACHE_SIZE if cache else 0
+    t0 = time.perf_counter()
+    for i in range(REPS):
+        nlp.analyze(textos[i % len(textos)])
+    return REPS / (time.perf_counter() - t0)
+
+def main() -> None:
+    max_extra = int(sys.argv[1]) if len(sys.argv) > 1 else EXTRAS[-1]
+    base_cmd, base_frases = list(nlp.COMMAND_PATTERNS), list(nlp.INTENT_PATTERNS)
+    rnd = random.Random(7)
+    print(f"{'patrones extra':>15} {'comandos/s':>12} {'difusos/s':>12} {'con caché/s':>12}")
+    try:
+        for extra in (e for e in EXTRAS if e <= max_extra):
+            nlp.COMMAND_PATTERNS[:] = base_cmd
+            nlp.INTENT_PATTERNS[:] = base_frases
+            for i in range(extra):
+                verbo, objeto = _palabra(rnd), _palabra(rnd)
+                nlp.COMMAND_PATTERNS.append(
+                    (f"extra_{i}", (f"{verbo} {objeto}",), rf"{verbo} {objeto} (?P<arg>.+)$", 0.9))
+                nlp.INTENT_PATTERNS.append((f"frase_{i}", [f"{_palabra(rnd)} {_palabra(rnd)}"]))
+            nlp.compile_patterns()
+            _medir(COMANDOS)  # calentar
+            print(f"{extra:>15} {_medir(COMANDOS):>12.0f} {_medir(DIFUSOS):>12.0f} {_medir(COMANDOS, cache=True):>12.0f}")
+    finally:
+        nlp.COMMAND_PATTERNS[:] = base_cmd
+        nlp.INTENT_PATTERNS[:] = base_frases
+        nlp.compile_patterns()
+        nlp._cache.max_items = nlp.ANALYZE_CACHE_SIZE
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark: coste de arranque de nlp y del primer recordatorio.
+
+Ejecutar: python benchmarks/bench_nlp_startup.py
+Cada medida corre en un intérprete nuevo (importaciones en frío):
+- import de nlp (ya no importa dateparser),
+- import de dateparser por sí solo (lo que antes pagaba el import de nlp),
+- primer analyze de un recordatorio sin precalentar (paga dateparser),
+- primer analyze tras warmup() + wait_ready() (lo que ve la app).
+"""
+import subprocess, sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+FRASE = "pon recordatorio llamar a mamá para mañana a las 5"
+
+CASOS = {
+    'import nlp': "t0 = time.perf_counter(); from src import nlp; r = time.perf_counter() - t0",
+    'import dateparser': (
+        "t0 = time.perf_counter()\n"
+        "try:\n    import dateparser\nexcept Exception:\n    pass\n"
+        "r = time.perf_counter() - t0"),
+    'primer recordatorio (frío)': (
+        "from src import nlp; t0 = time.perf_counter(); nlp.analyze(FRASE); r = time.perf_counter() - t0"),
+    'primer recordatorio (warmup)': (
+        "from src import nlp; nlp.wait_ready(); t0 = time.perf_counter(); nlp.analyze(FRASE); "
+        "r = time.perf_counter() - t0"),
+}
+
+def _correr(codigo: str) -> float:
+    script = f"import sys, time\nsys.path.insert(0, {str(RAIZ)!r})\nFRASE = {FRASE!r}\n{codigo}\nprint(r)"
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    try:
+        import dateparser  # noqa: F401
+    except Exception:
+        print("dateparser no está instalado: las cifras solo muestran el coste base")
+    print(f"{'medida':>30} {'ms':>10}")
+    for nombre, codigo in CASOS.items():
+        # Mediana de 3 ejecuciones en frío
+        tiempos = sorted(_correr(codigo) for _ in range(3))
+        print(f"{nombre:>30} {tiempos[1] * 1000:>10.1f}")
+    script = (f"import sys\nsys.path.insert(0, {str(RAIZ)!r})\nfrom src import nlp\n"
+              "nlp.wait_ready()\nprint(nlp.load_times())")
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    print("nlp.load_times():", out.stdout.strip())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: note_search con índice de subcadenas vs. recorrido LIKE.
+
+Ejecutar: python benchmarks/bench_note_search.py [n_notas] [--ngram]
+--ngram fuerza la tabla de n‑gramas (como si FTS5 trigram no existiera).
+Usa una base temporal (no toca data/app.db).
+"""
+import random, string, sys, tempfile, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db  # type: ignore
+
+N = 100_000
+TERMS = ('zanahoria', 'reunión', 'presupuesto anual', 'xq7k')
+REPS = 20
+
+def _texto(rnd: random.Random, palabras: int) -> str:
+    return ' '.join(''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 9))) for _ in range(palabras))
+
+def _like(term: str) -> list:
+    like = f"%{term.lower()}%"
+    return db.get_conn().execute(
+        "SELECT title, folder FROM notes WHERE LOWER(content) LIKE ? OR LOWER(title) LIKE ?", (like, like)).fetchall()
+
+def _medir(fn, term: str) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPS):
+        fn(term)
+    return (time.perf_counter() - t0) / REPS
+
+def main() -> None:
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    n = int(args[0]) if args else N
+    if '--ngram' in sys.argv:
+        db.TRIGRAM_TOKENIZE = 'tokenizador_inexistente'
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db.close_all()
+        db.DB_PATH = tmp_dir / 'bench.db'
+        db.NOTAS_DIR = tmp_dir / 'notas'
+        db.EVENTOS_JSON = tmp_dir / 'eventos.json'
+        db.MIGRATION_MSG_FILE = tmp_dir / 'migration.json'
+        db.CONFIG_JSON_PATH = tmp_dir / 'config.json'
+        filas = []
+        for i in range(n):
+            cuerpo = _texto(rnd, 40)
+            if i % 1000 == 0:
+                cuerpo += ' ' + rnd.choice(TERMS)
+            filas.append((f'nota {i}', cuerpo, f'carpeta{i % 20}'))
+        t0 = time.perf_counter()
+        db.note_upsert_many(filas)
+        print(f"índice: {db._substring_index(db.get_conn())}; {n} notas insertadas en {time.perf_counter() - t0:.2f} s")
+        db.note_search('xxx')  # indexa pendientes (modo n‑gramas)
+        for term in TERMS:
+            assert sorted(db.note_search(term)) == sorted(tuple(r) for r in _like(term)), term
+            scan, idx = _medir(_like, term), _medir(db.note_search, term)
+            print(f"{term!r:22} LIKE {scan*1e3:8.2f} ms   índice {idx*1e3:7.3f} ms   x{scan/idx:.0f}")
+        db.close_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: coste de expandir series recurrentes según ventana y longitud.
+
+Ejecutar: python benchmarks/bench_recurring.py [n_series]
+Mide event_list_range (sin caché) para ventanas de 1 a 365 días sobre series
+cortas, largas y sin fin: el tiempo debe crecer con la ventana y no con la
+longitud de la serie. Usa una base temporal (no toca data/app.db).
+"""
+import sys, tempfile, time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db  # type: ignore
+
+N_SERIES = 20
+REGLAS = {
+    'COUNT=100': 'FREQ=DAILY;COUNT=100',
+    'COUNT=100000': 'FREQ=DAILY;COUNT=100000',
+    'sin fin': 'FREQ=DAILY',
+}
+VENTANAS = (1, 7, 30, 365)
+REPS = 20
+
+def _medir(lo: int, hi: int) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    for _ in range(REPS):
+        n = len(db.event_list_range(lo, hi))
+    return (time.perf_counter() - t0) / REPS, n
+
+def main() -> None:
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else N_SERIES
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        db.close_all()
+        db.DB_PATH = tmp_dir / 'bench.db'
+        db.NOTAS_DIR = tmp_dir / 'notas'
+        db.EVENTOS_JSON = tmp_dir / 'eventos.json'
+        db.MIGRATION_MSG_FILE = tmp_dir / 'migration.json'
+        db.CONFIG_JSON_PATH = tmp_dir / 'config.json'
+        db.wait_ready()
+        # Consulta lejos del inicio (año 2100): el salto a la ventana es aritmético
+        desde = db.event_start_ts('2100-03-01', '00:00')
+        print(f"{n_series} series por caso; ventana desde 2100-03-01 (series desde 2024-01-01)")
+        print(f"{'serie':>14} " + ' '.join(f"{str(v) + ' d':>14}" for v in VENTANAS))
+        for nombre, regla in REGLAS.items():
+            db.close_all()
+            db.DB_PATH.unlink(missing_ok=True)
+            db.wait_ready()
+            for i in range(n_series):
+                db.event_series_create(f'serie {i}', '2024-01-01', f'{i % 24:02d}:00', regla)
+            celdas = []
+            for dias in VENTANAS:
+                t, n = _medir(desde, desde + dias * 86400 - 1)
+                celdas.append(f"{t*1e3:7.2f} ms/{n:<5}")
+            print(f"{nombre:>14} " + ' '.join(celdas))
+        db.close_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Programador de alertas de eventos basado en un montículo (heapq).
+
+Sustituye el sondeo por minuto: mantiene una cola de prioridad con los
+instantes de disparo (hora exacta y aviso 5 minutos antes) de los eventos
+pendientes dentro de un horizonte, y se actualiza de forma incremental con
+los cambios publicados por `db.subscribe` (alta, baja, completado).
+
+La clase no depende de Qt: la GUI consulta `proximo_disparo()` para armar un
+QTimer de un solo disparo y llama a `vencidas()` cuando expira.
+"""
+from __future__ import annotations
+import heapq, threading
+from datetime import datetime
+try:
+    from . import db  # type: ignore
+except ImportError:
+    import db  # type: ignore
+
+AVISO_PREVIO = 5 * 60        # segundos antes del evento para el pre‑aviso
+HORIZONTE = 2 * 86400        # ventana precargada desde la base
+TOLERANCIA = 10 * 60         # alertas más atrasadas que esto se descartan (p.ej. tras suspender)
+
+
+def _ahora() -> int:
+    return db.to_start_ts(datetime.now())
+
+
+def _start_ts(fecha: str, hora: str) -> int | None:
+    try:
+        return db.to_start_ts(datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProgramadorAlertas:
+    """Cola de disparos pendientes con borrado perezoso.
+
+    Cada entrada del montículo es (instante, seq, clave, generación, previo).
+    Cancelar o reprogramar un evento incrementa su generación; las entradas
+    obsoletas se descartan al llegar a la cima. Coste O(log n) por cambio.
+    """
+
+    def __init__(self, horizonte: int = HORIZONTE, al_cambiar=None) -> None:
+        self.horizonte = horizonte
+        self.al_cambiar = al_cambiar  # callback sin argumentos (p.ej. re‑armar QTimer)
+        self._heap: list[tuple[int, int, tuple, int, bool]] = []
+        self._gen: dict[tuple, int] = {}
+        self._vivos: dict[tuple, int] = {}  # clave -> start_ts de eventos activos
+        self._seq = 0
+        self._fin_ventana = 0
+        self._lock = threading.RLock()
+
+    # --- Carga y cambios ---
+    def cargar(self, ahora: int | None = None) -> None:
+        """(Re)carga los eventos pendientes con hora dentro del horizonte."""
+        ahora = _ahora() if ahora is None else ahora
+        filas = db.event_list_range(ahora - 60, ahora + self.horizonte + AVISO_PREVIO,
+                                    pending_only=True, timed_only=True)
+        with self._lock:
+            self._heap.clear()
+            self._gen.clear()
+            self._vivos.clear()
+            self._fin_ventana = ahora + self.horizonte
+            for f in filas:
+                self._programar((f['title'], f['date'], f['time']), f['start_ts'], ahora)
+        self._notificar()
+
+    def programar(self, titulo: str, fecha: str, hora: str | None) -> None:
+        ts = _start_ts(fecha, hora or '')
+        if ts is None:
+            return
+        with self._lock:
+            self._programar((titulo, fecha, hora or ''), ts, _ahora())
+        self._notificar()
+
+    def cancelar(self, titulo: str, fecha: str, hora: str | None) -> None:
+        with self._lock:
+            self._cancelar((titulo, fecha, hora or ''))
+        self._notificar()
+
+    def on_change(self, change) -> None:
+        """Suscriptor para `db.subscribe`: aplica cambios de la tabla events."""
+        if change.table == 'series':
+            self.cargar()  # la ventana se reexpande con las ocurrencias de la serie
+            return
+        if change.table != 'events':
+            return
+        ahora = _ahora()
+        with self._lock:
+            for clave in change.keys:
+                activo = change.kind != 'delete' and not change.fields.get('completed')
+                if activo:
+                    ts = _start_ts(clave[1], clave[2])
+                    if ts is not None:
+                        self._programar(tuple(clave), ts, ahora)
+                else:
+                    self._cancelar(tuple(clave))
+        self._notificar()
+
+    # --- Consulta ---
+    def proximo_disparo(self) -> int | None:
+        """Instante (escala start_ts) del próximo disparo o recarga de ventana."""
+        with self._lock:
+            self._podar()
+            if self._heap:
+                return min(self._heap[0][0], self._fin_ventana)
+            return self._fin_ventana or None
+
+    def vencidas(self, ahora: int | None = None) -> list[tuple[dict, bool]]:
+        """Extrae las alertas vencidas: lista de (evento, previo)."""
+        ahora = _ahora() if ahora is None else ahora
+        if self._fin_ventana and ahora >= self._fin_ventana:
+            self.cargar(ahora)
+        salida: list[tuple[dict, bool]] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= ahora:
+                instante, _, clave, gen, previo = heapq.heappop(self._heap)
+                if self._gen.get(clave) != gen or clave not in self._vivos:
+                    continue
+                if not previo:
+                    # Disparo final: el evento deja de estar programado
+                    del self._vivos[clave]
+                if ahora - instante > TOLERANCIA:
+                    continue
+                titulo, fecha, hora = clave
+                salida.append(({'evento': titulo, 'fecha': fecha, 'hora': hora, 'completado': False}, previo))
+        return salida
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._vivos)
+
+    # --- Internos (con self._lock tomado) ---
+    def _programar(self, clave: tuple, ts: int, ahora: int) -> None:
+        self._cancelar(clave)
+        if ts < ahora - 59 or (self._fin_ventana and ts > self._fin_ventana + AVISO_PREVIO):
+            return  # pasado o fuera de la ventana (se cargará al renovarla)
+        gen = self._gen.get(clave, 0) + 1
+        self._gen[clave] = gen
+        self._vivos[clave] = ts
+        for instante, previo in ((ts - AVISO_PREVIO, True), (ts, False)):
+            if instante >= ahora - 59:
+                self._seq += 1
+                heapq.heappush(self._heap, (instante, self._seq, clave, gen, previo))
+
+    def _cancelar(self, clave: tuple) -> None:
+        if clave in self._vivos:
+            del self._vivos[clave]
+            self._gen[clave] = self._gen.get(clave, 0) + 1
+        # Compactar si predominan entradas obsoletas
+        if len(self._heap) > 64 and len(self._heap) > 4 * len(self._vivos):
+            self._heap = [e for e in self._heap if self._gen.get(e[2]) == e[3] and e[2] in self._vivos]
+            heapq.heapify(self._heap)
+
+    def _podar(self) -> None:
+        while self._heap and (self._gen.get(self._heap[0][2]) != self._heap[0][3]
+                              or self._heap[0][2] not in self._vivos):
+            heapq.heappop(self._heap)
+
+    def _notificar(self) -> None:
+        if self.al_cambiar:
+            try:
+                self.al_cambiar()
+            except Exception:
+                pass
@@ -5,15 +5,27 @@ escribe en JSON; si existe el JSON se migra por `db.get_conn()`.
 """
 from PyQt5.QtWidgets import (
     QWidget, QCalendarWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem,
-    QPushButton, QDialog, QLineEdit, QHBoxLayout, QDateEdit, QTimeEdit, QAbstractItemView
+    QPushButton, QDialog, QLineEdit, QHBoxLayout, QDateEdit, QTimeEdit, QAbstractItemView, QComboBox
 )
 from PyQt5.QtCore import QDate, Qt, QTime, pyqtSignal
 from PyQt5.QtGui import QFont, QColor
 import os
 try:
     from . import db  # type: ignore
+    from .paginacion import CargaPaginada  # type: ignore
 except ImportError:
     import db  # type: ignore
+    from paginacion import CargaPaginada  # type: ignore
+
+# Opciones de repetición del diálogo de alta (texto, RRULE)
+REPETICIONES = [
+    ("No se repite", ''),
+    ("Cada día", 'FREQ=DAILY'),
+    ("Días laborables", 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR'),
+    ("Cada semana", 'FREQ=WEEKLY'),
+    ("Cada mes", 'FREQ=MONTHLY'),
+    ("Cada año", 'FREQ=YEARLY'),
+]
 
 
 class CalendarioEventos(QWidget):
@@ -22,6 +34,8 @@ class CalendarioEventos(QWidget):
     # evento_eliminado(titulo, fecha, hora)
     evento_toggle_completado = pyqtSignal(str, str, object, bool)
     evento_eliminado = pyqtSignal(str, str, object)
+    # Cambios de la base (db.Change) reenviados al hilo de la GUI
+    cambio_db = pyqtSignal(object)
     def __init__(self, eventos_path: str, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.eventos_path = eventos_path
@@ -73,6 +87,8 @@ class CalendarioEventos(QWidget):
         except Exception:
             pass
         layout.addWidget(self.lista)
+        # Eventos del día por páginas (cursor start_ts, title, id) al hacer scroll
+        self._paginas = CargaPaginada(self.lista, self._pagina_dia, crear=self._crear_item_fila)
         # Acciones de estado
         btn_row = QHBoxLayout()
         btn_hecho = QPushButton("Marcar como completado")
@@ -97,6 +113,11 @@ class CalendarioEventos(QWidget):
             pass
         self.setLayout(layout)
         self.mostrar_eventos_dia()
+        # Parchear la lista con los cambios publicados por db en lugar de recargarla
+        self.cambio_db.connect(self._aplicar_cambio_db)
+        suscriptor = self.cambio_db.emit
+        db.subscribe(suscriptor)
+        self.destroyed.connect(lambda *_: db.unsubscribe(suscriptor))
 
     def crear_evento_en_fecha(self) -> None:
         fecha = self.calendario.selectedDate().toString('yyyy-MM-dd')
@@ -127,6 +148,12 @@ class CalendarioEventos(QWidget):
         input_hora.setDisplayFormat("HH:mm")
         input_hora.setTime(QTime.currentTime())
         lay.addWidget(input_hora)
+        # Repetición (RRULE); las ocurrencias se calculan al consultar
+        lay.addWidget(QLabel("Repetir:"))
+        input_repetir = QComboBox()
+        for texto, regla in REPETICIONES:
+            input_repetir.addItem(texto, regla)
+        lay.addWidget(input_repetir)
         btns = QHBoxLayout()
         btn_ok = QPushButton("Crear")
         btn_cancel = QPushButton("Cancelar")
@@ -146,6 +173,11 @@ class CalendarioEventos(QWidget):
                 return
             d = input_fecha.date().toString('yyyy-MM-dd')
             h = input_hora.time().toString('HH:mm')
+            regla = input_repetir.currentData()
+            if regla:
+                db.event_series_create(evento, d, h, regla)
+                dlg.accept()
+                return
             try:
                 from calendario import crear_evento
                 crear_evento(evento, d, h)
@@ -154,81 +186,114 @@ class CalendarioEventos(QWidget):
                     db.event_create(evento, d, h)
                 except Exception:
                     pass
-            self.mostrar_eventos_dia()
             dlg.accept()
         btn_ok.clicked.connect(crear)
         btn_cancel.clicked.connect(dlg.reject)
         dlg.exec_()
 
-    def cargar_eventos(self) -> list[dict]:
-        # Devuelve eventos de toda la base (año corriente). Optimizable si hiciera falta.
-        from datetime import date, timedelta
-        hoy = date.today()
-        fin = hoy + timedelta(days=365)
-        try:
-            rows = db.event_list_week(str(hoy), str(fin))
-            return [
-                {
-                    'evento': r['title'],
-                    'fecha': r['date'],
-                    'hora': r['time'],
-                    'completado': bool(r['completed'])
-                } for r in rows
-            ]
-        except Exception:
-            return []
-
     def mostrar_eventos_dia(self) -> None:
+        # Consulta por rango de start_ts: ya viene ordenada por hora (sin hora al final)
+        if not self._paginas.recargar():
+            self.lista.addItem("Sin eventos para este día")
+
+    def _pagina_dia(self, despues) -> dict:
         fecha = self.calendario.selectedDate().toString('yyyy-MM-dd')
-        eventos = self.cargar_eventos()
-        self.lista.clear()
-        encontrados = [ev for ev in eventos if ev['fecha'] == fecha]
-        # Ordenar por hora si existe
-        try:
-            encontrados.sort(key=lambda e: e.get('hora') or '99:99')
-        except Exception:
-            pass
-        if encontrados:
-            for ev in encontrados:
-                texto = f"{ev.get('hora','--:--')} - {ev['evento']}" if ev.get('hora') else ev['evento']
-                it = QListWidgetItem(texto)
-                it.setData(Qt.UserRole, {
-                    'evento': ev.get('evento'),
-                    'fecha': ev.get('fecha'),
-                    'hora': ev.get('hora'),
-                    'completado': ev.get('completado', False),
-                })
-                self._estilizar_item(it, ev.get('completado', False))
-                self.lista.addItem(it)
-        else:
+        inicio, fin = db.event_start_ts(fecha, '00:00'), db.event_start_ts(fecha, None)
+        if inicio is None:
+            return {'results': [], 'next': None}
+        return db.event_list_page(inicio, fin, despues)
+
+    def _crear_item_fila(self, r: dict) -> QListWidgetItem:
+        return self._crear_item({
+            'evento': r['title'],
+            'fecha': r['date'],
+            'hora': r['time'],
+            'completado': bool(r['completed'])
+        })
+
+    def _crear_item(self, ev: dict) -> QListWidgetItem:
+        texto = f"{ev.get('hora','--:--')} - {ev['evento']}" if ev.get('hora') else ev['evento']
+        it = QListWidgetItem(texto)
+        it.setData(Qt.UserRole, {
+            'evento': ev.get('evento'),
+            'fecha': ev.get('fecha'),
+            'hora': ev.get('hora'),
+            'completado': ev.get('completado', False),
+            'ts': db.event_start_ts(ev.get('fecha') or '', ev.get('hora')),
+        })
+        self._estilizar_item(it, ev.get('completado', False))
+        return it
+
+    def _aplicar_cambio_db(self, change) -> None:
+        """Inserta, quita o re‑estiliza ítems del día mostrado según un db.Change."""
+        if getattr(change, 'table', None) == 'series':
+            self.mostrar_eventos_dia()  # una serie puede tener ocurrencias en cualquier día
+            return
+        if getattr(change, 'table', None) != 'events':
+            return
+        fecha_sel = self.calendario.selectedDate().toString('yyyy-MM-dd')
+        for titulo, fecha, hora in change.keys:
+            if fecha != fecha_sel:
+                continue
+            fila = self._buscar_fila(titulo, fecha, hora)
+            if change.kind == 'insert' and fila < 0:
+                ev = {'evento': titulo, 'fecha': fecha, 'hora': hora,
+                      'completado': bool(change.fields.get('completed'))}
+                it = self._crear_item(ev)
+                orden = (it.data(Qt.UserRole)['ts'] or 0, titulo)
+                if not self._paginas.cubre(orden):
+                    continue  # llegará con su página al hacer scroll
+                pos = 0
+                while pos < self.lista.count():
+                    data = self.lista.item(pos).data(Qt.UserRole)
+                    if not data:
+                        # Placeholder "Sin eventos": se reemplaza
+                        self.lista.takeItem(pos)
+                        continue
+                    if (data.get('ts') or 0, data.get('evento') or '') > orden:
+                        break
+                    pos += 1
+                self.lista.insertItem(pos, it)
+            elif change.kind == 'update' and fila >= 0 and 'completed' in change.fields:
+                it = self.lista.item(fila)
+                data = dict(it.data(Qt.UserRole))
+                data['completado'] = bool(change.fields['completed'])
+                it.setData(Qt.UserRole, data)
+                self._estilizar_item(it, data['completado'])
+            elif change.kind == 'delete' and fila >= 0:
+                self.lista.takeItem(fila)
+        if self.lista.count() == 0:
             self.lista.addItem("Sin eventos para este día")
 
+    def _buscar_fila(self, titulo: str, fecha: str, hora: str) -> int:
+        for i in range(self.lista.count()):
+            data = self.lista.item(i).data(Qt.UserRole)
+            if data and data.get('evento') == titulo and data.get('fecha') == fecha and (data.get('hora') or '') == (hora or ''):
+                return i
+        return -1
+
     def _cambiar_estado_seleccion(self, completado: bool) -> None:
         items = self.lista.selectedItems()
         if not items:
             return
-        fallbacks: list[tuple[str, str, object]] = []
+        claves = []
         for it in items:
             data = it.data(Qt.UserRole) or {}
             titulo = data.get('evento') or ""
             fecha = data.get('fecha') or self.calendario.selectedDate().toString('yyyy-MM-dd')
             hora = data.get('hora')
-            try:
-                from calendario import marcar_evento_completado
-                marcar_evento_completado(titulo, fecha, hora or None, completado)
-            except Exception:
-                fallbacks.append((titulo, fecha, hora))
+            if titulo:
+                claves.append((titulo, fecha, hora))
+        # Una sola transacción para toda la selección
+        try:
+            db.event_set_completed_many(claves, completado)
+        except Exception:
+            pass
+        for titulo, fecha, hora in claves:
             try:
                 self.evento_toggle_completado.emit(titulo, fecha, hora, completado)
             except Exception:
                 pass
-        if fallbacks:
-            for titulo, fecha, hora in fallbacks:
-                try:
-                    db.event_toggle_complete(titulo, fecha, hora, completado)
-                except Exception:
-                    pass
-        self.mostrar_eventos_dia()
 
     def _estilizar_item(self, item: QListWidgetItem, completado: bool) -> None:
         f: QFont = item.font()
@@ -254,13 +319,11 @@ class CalendarioEventos(QWidget):
                 db.event_toggle_complete(titulo, fecha, hora, not estado)
             except Exception:
                 pass
-        # Emitir señal con el nuevo estado
+        # Emitir señal con el nuevo estado (la lista se actualiza vía _aplicar_cambio_db)
         try:
             self.evento_toggle_completado.emit(titulo or "", fecha, hora, not estado)
         except Exception:
             pass
-        # Refrescar lista
-        self.mostrar_eventos_dia()
 
     def eliminar_eventos_seleccion(self) -> None:
         """Elimina todos los eventos seleccionados (multi‑selección) y actualiza la lista al instante."""
@@ -278,27 +341,14 @@ class CalendarioEventos(QWidget):
                 claves.append((titulo, fecha, hora))
         if not claves:
             return
-        # Cargar todos los eventos
-        # Eliminar cada clave vía API/DB
-        for (t, f, h) in claves:
-            try:
-                from calendario import eliminar_evento_por_datos
-                eliminar_evento_por_datos(t, f, h)
-            except Exception:
-                try:
-                    db.event_delete(t, f, h)
-                except Exception:
-                    pass
+        # Eliminar todas las claves en una sola transacción
+        try:
+            db.event_delete_many(claves)
+        except Exception:
+            pass
         # Emitir señal por cada eliminado
         for (t, f, h) in claves:
             try:
                 self.evento_eliminado.emit(t, f, h)
             except Exception:
                 pass
-        # Actualizar UI: eliminar ítems seleccionados sin recargar todo para feedback inmediato
-        for it in items:
-            row = self.lista.row(it)
-            self.lista.takeItem(row)
-        # Si quedó vacía, mostrar mensaje
-        if self.lista.count() == 0:
-            self.lista.addItem("Sin eventos para este día")
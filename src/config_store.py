@@ -2,6 +2,8 @@
 
 Se mantiene la misma interfaz pública (load_config/save_config) pero ahora
 los valores se guardan en la tabla `config` de SQLite (ver db.config_*).
+db mantiene una caché en memoria con escritura directa, por lo que
+load_config() es una copia de dict salvo cuando otro proceso cambió la config.
 
 Claves reconocidas:
  - mic_index
@@ -30,19 +32,13 @@ DEFAULT_CFG: Dict[str, Any] = {
 def load_config() -> Dict[str, Any]:
     data = DEFAULT_CFG.copy()
     try:
-        all_cfg = db.config_load_all()
-        for k, v in all_cfg.items():
-            data[k] = v
+        data.update(db.config_load_all())
     except Exception:
         pass
     return data
 
 def save_config(cfg: Dict[str, Any]) -> bool:
-    ok = True
-    for k, v in cfg.items():
-        try:
-            if not db.config_set(k, v):
-                ok = False
-        except Exception:
-            ok = False
-    return ok
+    try:
+        return db.config_set_many(cfg)
+    except Exception:
+        return False
@@ -5,18 +5,35 @@ Crea y gestiona la base de datos local:
  - notes (notas con carpetas opcionales)
 
 Migra datos legacy desde JSON (eventos.json) y archivos .txt de notas.
+
+Conexiones: un único escritor serializado (`transaction()`) y una conexión
+de lectura por hilo (`get_conn()`).
 """
 from __future__ import annotations
-import os, json, sqlite3, threading, time, contextlib, traceback
+import os, re, copy, gzip, json, zlib, difflib, sqlite3, threading, time, contextlib, logging, atexit, calendar
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from datetime import datetime, date as _date, timedelta
 from pathlib import Path
+from typing import Iterable, NamedTuple, Sequence
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = PROJECT_DIR / 'data'
 DATA_DIR.mkdir(exist_ok=True)
 DB_PATH = DATA_DIR / 'app.db'
 
+# Pool de conexiones:
+#  - Un único escritor (`_writer`) compartido entre hilos y serializado con
+#    `_write_lock`; todas las mutaciones pasan por `transaction()`.
+#  - Una conexión de lectura por hilo (`get_conn()`), de modo que bajo WAL las
+#    lecturas no esperan a las escrituras ni ven transacciones a medio hacer.
 _lock = threading.Lock()
-_conn: sqlite3.Connection | None = None
+_write_lock = threading.RLock()
+_writer: sqlite3.Connection | None = None
+_local = threading.local()
+_readers: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+_readers_lock = threading.Lock()
+_generation = 0  # se incrementa en close_all() para invalidar lectores de otros hilos
 
 EVENTOS_JSON = PROJECT_DIR / 'resumenes' / 'eventos.json'
 NOTAS_DIR = PROJECT_DIR / 'notas'
@@ -56,16 +73,36 @@ SCHEMA = [
 INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_events_date ON events(date)",
     "CREATE INDEX IF NOT EXISTS idx_events_date_time ON events(date,time)",
-    "CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder)"
+    "CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder)",
+    # Listado paginado de títulos por carpeta (keyset sobre title, id)
+    "CREATE INDEX IF NOT EXISTS idx_notes_folder_title ON notes(folder, title)"
 ]
 
 LOG_FILE = DATA_DIR / 'db_errors.log'
 
+# Errores y consultas lentas van al logger 'asistente.db' (archivo LOG_FILE).
+# La app puede añadir sus propios handlers; no se propaga al logger raíz.
+_logger = logging.getLogger('asistente.db')
+_logger.propagate = False
+_log_handler: logging.FileHandler | None = None
+
+def _get_logger() -> logging.Logger:
+    """Logger con un FileHandler que sigue a LOG_FILE (reasignable en pruebas)."""
+    global _log_handler
+    path = os.path.abspath(LOG_FILE)
+    if _log_handler is None or _log_handler.baseFilename != path:
+        if _log_handler is not None:
+            _logger.removeHandler(_log_handler)
+            _log_handler.close()
+        _log_handler = logging.FileHandler(path, encoding='utf-8', delay=True)
+        _log_handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
+        _logger.addHandler(_log_handler)
+        _logger.setLevel(logging.INFO)
+    return _logger
+
 def _log_error(prefix: str, exc: Exception):
     try:
-        with LOG_FILE.open('a', encoding='utf-8') as f:
-            f.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {prefix}: {exc}\n")
-            f.write(''.join(traceback.format_exception(type(exc), exc, exc.__traceback__)) + '\n')
+        _get_logger().error("%s: %s", prefix, exc, exc_info=(type(exc), exc, exc.__traceback__))
     except Exception:
         pass
 
@@ -78,92 +115,538 @@ def _init_pragmas(conn: sqlite3.Connection):
     except Exception as e:
         _log_error('init_pragmas', e)
 
+def _connect(readonly: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None,
+                           cached_statements=STATEMENT_CACHE)
+    conn.row_factory = sqlite3.Row
+    if not readonly:
+        # Antes de journal_mode=WAL para aplicarse a bases nuevas; en bases
+        # existentes solo surte efecto tras un VACUUM (ver run_maintenance).
+        try:
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        except Exception as e:
+            _log_error('auto_vacuum', e)
+    _init_pragmas(conn)
+    if readonly:
+        try:
+            conn.execute('PRAGMA query_only=ON')
+        except Exception as e:
+            _log_error('init_reader', e)
+    return conn
+
+# ================== REGISTRO DE CONSULTAS ==================
+# SQL con nombre para las operaciones habituales: el texto idéntico reutiliza
+# la sentencia preparada de la caché de cada conexión (cached_statements) y
+# el nombre agrupa las métricas. Las consultas con SQL dinámico (IN por lotes)
+# pasan `sql=` pero se contabilizan igual bajo su nombre.
+STATEMENT_CACHE = 256     # sentencias preparadas por conexión (por defecto 128)
+SLOW_QUERY_MS: float | None = 100.0  # None desactiva el registro de consultas lentas
+_STATS_SAMPLES = 512      # latencias recientes por sentencia (para p95)
+
+STATEMENTS: dict[str, str] = {
+    'event_insert': "INSERT OR IGNORE INTO events(title,date,time,completed) VALUES (?,?,?,?)",
+    'event_set_completed': "UPDATE events SET completed=? WHERE title=? AND date=? AND time=?",
+    'event_delete': "DELETE FROM events WHERE title=? AND date=? AND time=?",
+    'event_range': "SELECT * FROM events WHERE start_ts BETWEEN ? AND ? ORDER BY start_ts, title",
+    'event_range_pending': "SELECT * FROM events WHERE start_ts BETWEEN ? AND ? AND completed=0 ORDER BY start_ts, title",
+    'event_range_timed': "SELECT * FROM events WHERE start_ts BETWEEN ? AND ? AND time<>'' ORDER BY start_ts, title",
+    'event_range_pending_timed': "SELECT * FROM events WHERE start_ts BETWEEN ? AND ? AND completed=0 AND time<>'' ORDER BY start_ts, title",
+    'event_range_page': "SELECT * FROM events WHERE start_ts BETWEEN ? AND ? AND (start_ts, title, id) > (?, ?, ?) "
+                        "ORDER BY start_ts, title, id LIMIT ?",
+    'note_current': "SELECT id, content, updated_at FROM notes WHERE title=? AND folder=?",
+    'note_upsert': "INSERT INTO notes(title, content, folder, updated_at) VALUES (?,?,?,COALESCE(?,CURRENT_TIMESTAMP)) "
+                   "ON CONFLICT(title, folder) DO UPDATE SET content=excluded.content, updated_at=CURRENT_TIMESTAMP",
+    'note_get': "SELECT content FROM notes WHERE title=? AND folder=?",
+    'note_delete': "DELETE FROM notes WHERE title=? AND folder=?",
+    'note_search_like': "SELECT title, folder FROM notes WHERE LOWER(content) LIKE ? OR LOWER(title) LIKE ?",
+    'note_search_like_folder': "SELECT title, folder FROM notes WHERE (LOWER(content) LIKE ? OR LOWER(title) LIKE ?) AND folder=?",
+    'note_folders': "SELECT DISTINCT folder FROM notes WHERE folder<>'' ORDER BY folder",
+    'note_folder_exists': "SELECT 1 FROM notes WHERE folder=? LIMIT 1",
+    'note_titles': "SELECT title FROM notes WHERE folder=? ORDER BY title",
+    'note_titles_page': "SELECT title, id FROM notes WHERE folder=? AND (title, id) > (?, ?) ORDER BY title, id LIMIT ?",
+    'note_folders_page': "SELECT DISTINCT folder FROM notes WHERE folder > ? ORDER BY folder LIMIT ?",
+    'folder_names': "SELECT name FROM folders ORDER BY name",
+    'folder_names_page': "SELECT name FROM folders WHERE name > ? ORDER BY name LIMIT ?",
+    'folder_exists': "SELECT 1 FROM folders WHERE name=?",
+    'folder_list': "SELECT name, note_count, updated_at FROM folders ORDER BY name",
+    'folder_create': "INSERT OR IGNORE INTO folders(name) VALUES (?)",
+    'folder_delete_empty': "DELETE FROM folders WHERE name=? AND note_count=0",
+    'series_insert': "INSERT INTO event_series(title, dtstart, time, rrule, start_ts, until_ts) VALUES (?,?,?,?,?,?)",
+    'series_find': "SELECT id FROM event_series WHERE title=? AND dtstart=? AND time=? AND rrule=? LIMIT 1",
+    'override_import': "INSERT OR REPLACE INTO event_overrides(series_id, date, cancelled, completed, title, time) VALUES (?,?,?,?,?,?)",
+    'series_delete': "DELETE FROM event_series WHERE id=?",
+    'series_all': "SELECT id, title, dtstart, time, rrule, start_ts, until_ts FROM event_series ORDER BY start_ts, id",
+    'series_window': "SELECT id, title, dtstart, time, rrule FROM event_series "
+                     "WHERE start_ts <= ? AND (until_ts IS NULL OR until_ts >= ?)",
+    'override_window': "SELECT date, cancelled, completed, title, time FROM event_overrides "
+                       "WHERE series_id=? AND date BETWEEN ? AND ?",
+    'override_cancel': "INSERT INTO event_overrides(series_id, date, cancelled) VALUES (?,?,1) "
+                       "ON CONFLICT(series_id, date) DO UPDATE SET cancelled=1",
+    'override_completed': "INSERT INTO event_overrides(series_id, date, completed) VALUES (?,?,?) "
+                          "ON CONFLICT(series_id, date) DO UPDATE SET completed=excluded.completed",
+    'override_fields': "INSERT INTO event_overrides(series_id, date, title, time) VALUES (?,?,?,?) "
+                       "ON CONFLICT(series_id, date) DO UPDATE SET title=excluded.title, time=excluded.time",
+    'override_prune': "DELETE FROM event_overrides WHERE series_id=? AND date=? AND cancelled=0 "
+                      "AND completed=0 AND title IS NULL AND time IS NULL",
+    'ngram_dirty_any': "SELECT 1 FROM notes_ngram_dirty LIMIT 1",
+    'ngram_dirty_ids': "SELECT note_id FROM notes_ngram_dirty LIMIT ?",
+    'ngram_put': "INSERT OR IGNORE INTO notes_ngram(gram, note_id) VALUES (?,?)",
+    'revision_last': "SELECT rev, created, full FROM note_revisions WHERE note_id=? ORDER BY rev DESC LIMIT 1",
+    'revision_chain': "SELECT rev, full, data FROM note_revisions WHERE note_id=? AND rev <= ? AND rev >= "
+                      "(SELECT MAX(rev) FROM note_revisions WHERE note_id=? AND rev <= ? AND full=1) ORDER BY rev",
+    'revision_meta': "SELECT created, size FROM note_revisions WHERE note_id=? AND rev=?",
+    'revision_put': "INSERT OR REPLACE INTO note_revisions(note_id, rev, created, full, size, data) VALUES (?,?,?,?,?,?)",
+    'revision_list': "SELECT r.rev, r.created, r.size, r.full, length(r.data) FROM note_revisions r "
+                     "JOIN notes n ON n.id = r.note_id WHERE n.title=? AND n.folder=? ORDER BY r.rev DESC",
+    'revision_prune': "DELETE FROM note_revisions WHERE note_id=? AND rev < ?",
+    'revision_first': "SELECT MIN(rev) FROM note_revisions WHERE note_id=?",
+    'revision_expired': "SELECT note_id, MAX(rev) FROM note_revisions WHERE created < ? GROUP BY note_id",
+    'config_version': "SELECT value FROM meta WHERE key='config_version'",
+    'config_bump': "INSERT INTO meta(key,value) VALUES('config_version','1') "
+                   "ON CONFLICT(key) DO UPDATE SET value=CAST(value AS INTEGER)+1",
+    'config_all': "SELECT key, value FROM config",
+    'config_put': "INSERT OR REPLACE INTO config(key,value) VALUES (?,?)",
+}
+
+class _StatementStats:
+    __slots__ = ('calls', 'total', 'rows', 'samples')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.rows = 0
+        self.samples: deque[float] = deque(maxlen=_STATS_SAMPLES)
+
+_stats: dict[str, _StatementStats] = {}
+_stats_lock = threading.Lock()
+
+def _record_timing(name: str, sql: str, elapsed: float, rows: int) -> None:
+    with _stats_lock:
+        st = _stats.get(name)
+        if st is None:
+            st = _stats[name] = _StatementStats()
+        st.calls += 1
+        st.total += elapsed
+        st.rows += rows
+        st.samples.append(elapsed)
+    if SLOW_QUERY_MS is not None and elapsed * 1000 >= SLOW_QUERY_MS:
+        try:
+            _get_logger().warning("consulta lenta %s: %.1f ms, %d filas — %s", name, elapsed * 1000, rows, sql)
+        except Exception:
+            pass
+
+def _query(conn: sqlite3.Connection, name: str, params: Sequence = (), sql: str | None = None) -> list[sqlite3.Row]:
+    """Ejecuta una consulta registrada y devuelve todas las filas (con métricas)."""
+    sql = sql or STATEMENTS[name]
+    t0 = time.perf_counter()
+    rows = conn.execute(sql, params).fetchall()
+    _record_timing(name, sql, time.perf_counter() - t0, len(rows))
+    return rows
+
+def _execute(conn: sqlite3.Connection, name: str, params=(), sql: str | None = None,
+             many: bool = False) -> sqlite3.Cursor:
+    """Ejecuta una sentencia registrada (executemany si many=True); filas = rowcount."""
+    sql = sql or STATEMENTS[name]
+    t0 = time.perf_counter()
+    cur = conn.executemany(sql, params) if many else conn.execute(sql, params)
+    _record_timing(name, sql, time.perf_counter() - t0, max(cur.rowcount, 0))
+    return cur
+
+def stats(reset: bool = False) -> dict[str, dict]:
+    """Métricas por sentencia: calls, total_ms, mean_ms, p95_ms, rows.
+
+    p95 se calcula sobre las últimas _STATS_SAMPLES ejecuciones. Ordenado por
+    tiempo total descendente. reset=True vacía los contadores tras leerlos.
+    """
+    with _stats_lock:
+        items = [(n, st.calls, st.total, st.rows, sorted(st.samples)) for n, st in _stats.items()]
+        if reset:
+            _stats.clear()
+    out = {}
+    for name, calls, total, rows, samples in sorted(items, key=lambda it: -it[2]):
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        out[name] = {'calls': calls, 'total_ms': total * 1000, 'mean_ms': total * 1000 / calls if calls else 0.0,
+                     'p95_ms': p95 * 1000, 'rows': rows}
+    return out
+
 @contextlib.contextmanager
 def transaction():
-    """Context manager de transacción (commit/rollback automáticos)."""
-    conn = get_conn()
+    """Context manager de transacción sobre la conexión escritora.
+
+    Abre `BEGIN IMMEDIATE` y hace commit/rollback automáticos. Las llamadas
+    anidadas en el mismo hilo se unen a la transacción exterior. Los cambios
+    registrados (`_record_change`) se publican a los suscriptores solo tras
+    el COMMIT exterior.
+    """
+    conn = _get_writer()
+    with _write_lock:
+        depth = getattr(_local, 'tx_depth', 0)
+        if depth:
+            _local.tx_depth = depth + 1
+            try:
+                yield conn
+            finally:
+                _local.tx_depth = depth
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        _local.tx_depth = 1
+        _local.changes = []
+        _local.neutral = 0
+        written = conn.total_changes
+        try:
+            yield conn
+            conn.execute('COMMIT')
+            global _last_write
+            _last_write = time.monotonic()
+            _cache_invalidate(_local.changes, conn.total_changes - written > _local.neutral)
+        except Exception as e:
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            _local.changes = []
+            _log_error('transaction', e)
+            raise
+        finally:
+            _local.tx_depth = 0
+        changes, _local.changes = _local.changes, []
+    for change in changes:
+        _publish(change)
+
+@contextlib.contextmanager
+def _cache_neutral(conn: sqlite3.Connection):
+    """Escrituras que no tocan datos cacheados (config, meta, índices y revisiones).
+
+    Sus filas no cuentan como escritura sin registrar al confirmar: no vacían
+    las cachés de notas y agenda.
+    """
+    before = conn.total_changes
     try:
         yield conn
-        conn.commit()
-    except Exception as e:
+    finally:
+        _local.neutral = getattr(_local, 'neutral', 0) + conn.total_changes - before
+
+# === Notificación de cambios ===
+
+class Change(NamedTuple):
+    """Cambio confirmado en la base.
+
+    table: 'events' | 'notes' | 'folders' | 'series'
+    kind: 'insert' | 'update' | 'delete'
+    keys: claves naturales afectadas; events → (title, date, time) (también
+          ocurrencias de series), notes → (title, folder), folders → (name,)
+          (solo folder_create/delete), series → (id,)
+    fields: columnas nuevas comunes a todas las claves (p.ej. {'completed': 1})
+    """
+    table: str
+    kind: str
+    keys: tuple
+    fields: dict
+
+_subscribers: list = []
+_subscribers_lock = threading.Lock()
+
+def subscribe(callback) -> None:
+    """Registra `callback(change: Change)`.
+
+    Se invoca en el hilo que confirmó la transacción; en Qt, reenviar con una
+    señal para procesarlo en el hilo de la GUI.
+    """
+    with _subscribers_lock:
+        if callback not in _subscribers:
+            _subscribers.append(callback)
+
+def unsubscribe(callback) -> None:
+    with _subscribers_lock:
         try:
-            conn.rollback()
-        except Exception:
+            _subscribers.remove(callback)
+        except ValueError:
             pass
-        _log_error('transaction', e)
-        raise
+
+def _record_change(table: str, kind: str, keys, fields: dict | None = None) -> None:
+    keys = tuple(keys)
+    if not keys or not getattr(_local, 'tx_depth', 0):
+        return
+    _local.changes.append(Change(table, kind, keys, fields or {}))
+
+def _publish(change: Change) -> None:
+    with _subscribers_lock:
+        callbacks = list(_subscribers)
+    for cb in callbacks:
+        try:
+            cb(change)
+        except Exception as e:
+            _log_error('subscriber', e)
 
 def optimize(vacuum: bool = False):
     """Ejecuta ANALYZE y opcional VACUUM para mantenimiento manual."""
-    conn = get_conn()
+    conn = _get_writer()
     try:
-        conn.execute('ANALYZE')
-        if vacuum:
-            conn.execute('VACUUM')
+        with _write_lock:
+            conn.execute('ANALYZE')
+            if vacuum:
+                conn.execute('VACUUM')
     except Exception as e:
         _log_error('optimize', e)
 
+# ================== MANTENIMIENTO ==================
+# Checkpoint del WAL, PRAGMA optimize, optimize de los índices FTS y vacuum
+# incremental, solo cuando se superan los umbrales. La conversión de una base
+# antigua a auto_vacuum=INCREMENTAL requiere un VACUUM completo: se hace
+# cuando, de todas formas, hay suficientes páginas libres que recuperar.
+MAINT_WAL_BYTES = 4 * 1024 * 1024
+MAINT_FTS_SEGMENTS = 16
+MAINT_CHANGES = 1000
+MAINT_FREELIST_PAGES = 256
+_FTS_TABLES = ('notes_fts', 'notes_tri')
+_last_write = 0.0
+_changes_base = 0  # total_changes del escritor en el último PRAGMA optimize
+
+def idle_seconds() -> float:
+    """Segundos desde el último COMMIT de este proceso."""
+    return time.monotonic() - _last_write
+
+def _db_files_size() -> int:
+    total = 0
+    for suffix in ('', '-wal'):
+        try:
+            total += os.path.getsize(f"{DB_PATH}{suffix}")
+        except OSError:
+            pass
+    return total
+
+def maintenance_status() -> dict:
+    """Métricas que deciden el mantenimiento: WAL, segmentos FTS, cambios y páginas libres."""
+    conn = _get_writer()
+    with _write_lock:
+        segments = {}
+        for tbl in _FTS_TABLES:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name=?", (tbl,)).fetchone():
+                segments[tbl] = conn.execute(f"SELECT COUNT(DISTINCT segid) FROM {tbl}_idx").fetchone()[0]
+        status = {
+            'wal_bytes': os.path.getsize(f"{DB_PATH}-wal") if os.path.exists(f"{DB_PATH}-wal") else 0,
+            'fts_segments': segments,
+            'changes': conn.total_changes - _changes_base,
+            'freelist_pages': conn.execute('PRAGMA freelist_count').fetchone()[0],
+            'page_size': conn.execute('PRAGMA page_size').fetchone()[0],
+            'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(
+                conn.execute('PRAGMA auto_vacuum').fetchone()[0], '?'),
+        }
+    return status
+
+def maintenance_due(status: dict | None = None) -> bool:
+    st = status or maintenance_status()
+    return (st['wal_bytes'] >= MAINT_WAL_BYTES or st['changes'] >= MAINT_CHANGES
+            or st['freelist_pages'] >= MAINT_FREELIST_PAGES
+            or any(n >= MAINT_FTS_SEGMENTS for n in st['fts_segments'].values()))
+
+def run_maintenance(force: bool = False) -> dict:
+    """Ejecuta las tareas cuyo umbral se superó (todas si force=True).
+
+    Retorna un informe: tareas hechas, páginas liberadas, bytes recuperados
+    (base + WAL, antes vs. después) y duración.
+    """
+    global _changes_base
+    t0 = time.perf_counter()
+    st = maintenance_status()
+    size_before = _db_files_size()
+    done: list[str] = []
+    conn = _get_writer()
+    if prune_revisions():  # fuera de _write_lock: espera al esquema
+        done.append('revisions_prune')
+    try:
+        with _write_lock:
+            for tbl, n in st['fts_segments'].items():
+                if force or n >= MAINT_FTS_SEGMENTS:
+                    conn.execute(f"INSERT INTO {tbl}({tbl}) VALUES('optimize')")
+                    done.append(f'fts_optimize:{tbl}')
+            if force or st['changes'] >= MAINT_CHANGES:
+                conn.execute('PRAGMA optimize')
+                _changes_base = conn.total_changes
+                done.append('optimize')
+            freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if force or freelist >= MAINT_FREELIST_PAGES:
+                if st['auto_vacuum'] == 'incremental':
+                    # execute() solo da un paso (una página); sqlite3_exec completa
+                    conn.executescript('PRAGMA incremental_vacuum;')
+                    done.append('incremental_vacuum')
+                elif freelist >= MAINT_FREELIST_PAGES:
+                    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                    conn.execute('VACUUM')
+                    done.append('vacuum')
+            freed = freelist - conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if force or done or st['wal_bytes'] >= MAINT_WAL_BYTES:
+                busy = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()[0]
+                done.append('wal_checkpoint' if not busy else 'wal_checkpoint_busy')
+    except Exception as e:
+        _log_error('run_maintenance', e)
+        freed = 0
+    return {
+        'tasks': done,
+        'freed_pages': max(0, freed),
+        'reclaimed_bytes': max(0, size_before - _db_files_size()),
+        'duration_ms': (time.perf_counter() - t0) * 1000,
+    }
+
 def get_conn() -> sqlite3.Connection:
-    global _conn
-    if _conn is not None:
-        return _conn
-    with _lock:
-        if _conn is None:
-            need_migration = not DB_PATH.exists()
-            _conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
-            _conn.row_factory = sqlite3.Row
-            _init_pragmas(_conn)
-            try:
-                for ddl in SCHEMA:
-                    _conn.execute(ddl)
-                for idx in INDEXES:
-                    _conn.execute(idx)
-            except sqlite3.OperationalError as e:
-                # Si el error es por expresiones prohibidas (versión previa), recrear BD limpia
-                if 'expressions prohibited' in str(e).lower():
-                    try:
-                        _conn.close()
-                    except Exception:
-                        pass
-                    if DB_PATH.exists():
-                        DB_PATH.unlink(missing_ok=True)  # type: ignore[arg-type]
-                    _conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
-                    _conn.row_factory = sqlite3.Row
-                    _init_pragmas(_conn)
-                    for ddl in SCHEMA:
-                        _conn.execute(ddl)
-                    for idx in INDEXES:
-                        _conn.execute(idx)
-                else:
-                    raise
-            if need_migration:
-                ev_cnt, note_cnt = _migrate_legacy(_conn)
+    """Conexión de solo lectura propia del hilo actual (se crea bajo demanda)."""
+    conn = getattr(_local, 'reader', None)
+    if conn is not None and getattr(_local, 'generation', -1) == _generation:
+        return conn
+    _get_writer()  # garantiza esquema/migraciones antes de abrir lectores
+    conn = _connect(readonly=True)
+    _local.reader = conn
+    _local.generation = _generation
+    th = threading.current_thread()
+    with _readers_lock:
+        # Cerrar lectores de hilos que ya terminaron
+        for ident, (other, other_conn) in list(_readers.items()):
+            if not other.is_alive():
                 try:
-                    MIGRATION_MSG_FILE.write_text(json.dumps({
-                        'timestamp': int(time.time()),
-                        'eventos_migrados': ev_cnt,
-                        'notas_migradas': note_cnt,
-                        'legacy_renombrado': False
-                    }, ensure_ascii=False, indent=2), encoding='utf-8')
+                    other_conn.close()
                 except Exception:
                     pass
-            # Migrar config.json si existe y tabla aún vacía
+                del _readers[ident]
+        _readers[th.ident or 0] = (th, conn)
+    return conn
+
+def close_all() -> None:
+    """Cierra el escritor y todos los lectores (p.ej. al salir de la app)."""
+    global _writer, _generation
+    th = _init_thread
+    if th is not None and th is not threading.current_thread():
+        th.join()  # no cortar una migración a medias
+    _close_write_queue()  # vaciar escrituras pendientes antes de cerrar
+    _invalidate_config_cache()
+    cache_clear()
+    with _lock, _write_lock:
+        _generation += 1
+        _schema_ready.clear()
+        with _readers_lock:
+            for _, conn in _readers.values():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            _readers.clear()
+        if _writer is not None:
             try:
-                _migrate_config_json(_conn)
+                _writer.close()
             except Exception:
                 pass
-            # Asegurar que todas las tablas existen (por fallos anteriores de creación)
+            _writer = None
+
+# --- Inicialización en dos fases ---
+# Apertura rápida (síncrona, en el primer hilo que use la base): DDL
+# idempotente, índices y config.json (la GUI lee la configuración al
+# arrancar). Mantenimiento en segundo plano: upgrades de esquema (rebuilds de
+# FTS, backfill de start_ts) y la migración legacy de eventos.json / notas.
+# `init_async()` devuelve un Future que se resuelve al terminar.
+_init_future: Future | None = None
+_init_thread: threading.Thread | None = None
+_schema_ready = threading.Event()
+
+def _get_writer() -> sqlite3.Connection:
+    global _writer, _init_future, _init_thread, _changes_base
+    if _writer is not None:
+        return _writer
+    with _lock:
+        if _writer is None:
+            conn = _open_fast()
+            _writer = conn
+            _changes_base = 0  # total_changes es por conexión
+            _schema_ready.clear()
+            _init_future = Future()
+            _init_thread = threading.Thread(target=_init_background, args=(conn, _init_future),
+                                            name='db-init', daemon=True)
+            _init_thread.start()
+        return _writer
+
+def _open_fast() -> sqlite3.Connection:
+    need_migration = not DB_PATH.exists()
+    conn = _connect()
+    try:
+        for ddl in SCHEMA:
+            conn.execute(ddl)
+        for idx in INDEXES:
+            conn.execute(idx)
+    except sqlite3.OperationalError as e:
+        # Si el error es por expresiones prohibidas (versión previa), recrear BD limpia
+        if 'expressions prohibited' in str(e).lower():
             try:
-                for idx in INDEXES:
-                    _conn.execute(idx)
-            except Exception as e:
-                _log_error('indexes_late', e)
-            # Aplicar upgrades de esquema (FTS, triggers, etc.)
+                conn.close()
+            except Exception:
+                pass
+            if DB_PATH.exists():
+                DB_PATH.unlink(missing_ok=True)  # type: ignore[arg-type]
+            need_migration = True
+            conn = _connect()
+            for ddl in SCHEMA:
+                conn.execute(ddl)
+            for idx in INDEXES:
+                conn.execute(idx)
+        else:
+            raise
+    if need_migration:
+        # Marca persistente: si la app se cierra a mitad, se reintenta al abrir
+        conn.execute("INSERT OR REPLACE INTO meta(key,value) VALUES('legacy_migration','pending')")
+    # Migrar config.json si existe y tabla aún vacía
+    try:
+        _migrate_config_json(conn)
+    except Exception:
+        pass
+    return conn
+
+def _init_background(conn: sqlite3.Connection, fut: Future) -> None:
+    """Hilo db-init: upgrades de esquema y migración legacy; resuelve `fut` con el resumen."""
+    summary = {'eventos_migrados': 0, 'notas_migradas': 0}
+    try:
+        # Aplicar upgrades de esquema (FTS, triggers, etc.)
+        # _schema_ready se marca sin soltar el lock: un escritor en espera no ve el esquema a medias
+        with _write_lock:
             try:
-                _apply_schema_upgrades(_conn)
+                _apply_schema_upgrades(conn)
             except Exception as e:
                 _log_error('schema_upgrade', e)
-        return _conn
+            finally:
+                _schema_ready.set()
+        if get_conn().execute("SELECT 1 FROM meta WHERE key='legacy_migration'").fetchone():
+            ev_cnt, note_cnt = _migrate_legacy(conn)
+            summary.update(eventos_migrados=ev_cnt, notas_migradas=note_cnt)
+            try:
+                MIGRATION_MSG_FILE.write_text(json.dumps({
+                    'timestamp': int(time.time()),
+                    'eventos_migrados': ev_cnt,
+                    'notas_migradas': note_cnt,
+                    'legacy_renombrado': False
+                }, ensure_ascii=False, indent=2), encoding='utf-8')
+            except Exception:
+                pass
+            with transaction() as tx:
+                tx.execute("DELETE FROM meta WHERE key='legacy_migration'")
+        fut.set_result(summary)
+    except Exception as e:
+        _log_error('db_init', e)
+        fut.set_exception(e)
+
+def init_async() -> Future:
+    """Abre la base sin bloquear por migraciones; el Future resuelve con
+    {'eventos_migrados', 'notas_migradas'} cuando termina la inicialización."""
+    _get_writer()
+    return _init_future  # type: ignore[return-value]
+
+def wait_ready(timeout: float | None = None) -> bool:
+    """Espera a que termine la inicialización en segundo plano."""
+    try:
+        init_async().result(timeout)
+        return True
+    except Exception:
+        return False
+
+def _wait_schema() -> None:
+    """Bloquea hasta que el esquema esté actualizado (consultas sobre columnas nuevas)."""
+    _get_writer()
+    _schema_ready.wait()
 
 # ================== SCHEMA VERSIONING & UPGRADES ==================
 
@@ -178,52 +661,178 @@ def _get_schema_version(conn: sqlite3.Connection) -> int:
         return 0
 
 def _set_schema_version(conn: sqlite3.Connection, version: int):
-    try:
-        conn.execute("INSERT OR REPLACE INTO meta(key,value) VALUES('schema_version',?)", (str(version),))
-    except Exception as e:
-        _log_error('set_schema_version', e)
+    conn.execute("INSERT OR REPLACE INTO meta(key,value) VALUES('schema_version',?)", (str(version),))
 
 def _apply_schema_upgrades(conn: sqlite3.Connection):
     """Aplica migraciones incrementales. Versión base = 0.
 
     v1: (implícito) tablas básicas + meta.
     v2: FTS5 para notas (notes_fts) + triggers sincronización.
+    v3: events.start_ts (entero derivado de date/time) + índice cubriente.
+    v4: notes_fts con `unicode61 remove_diacritics` + rebuild del índice.
+    v5: índice de subcadenas para notas (FTS5 trigram o tabla de n‑gramas).
+    v6: tabla folders con recuento de notas y última modificación (triggers).
+    v7: note_revisions (historial de notas como deltas comprimidos).
+    v8: event_series + event_overrides (eventos recurrentes).
+
+    Cada paso corre en su propia transacción con el cambio de versión: si
+    falla, se revierte, no se marca como hecho y se reintenta en el próximo
+    arranque (los pasos siguientes esperan a que se complete).
     """
+    steps = (None, _upgrade_to_v2, _upgrade_to_v3, _upgrade_to_v4, _upgrade_to_v5,
+             _upgrade_to_v6, _upgrade_to_v7, _upgrade_to_v8)
     version = _get_schema_version(conn)
-    target = 2
-    if version < 1:
-        # Establecer versión inicial si no existía.
-        _set_schema_version(conn, 1)
-        version = 1
-    if version < 2:
-        _upgrade_to_v2(conn)
-        _set_schema_version(conn, 2)
+    for target, upgrade in enumerate(steps, start=1):
+        if version >= target:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if upgrade is not None:  # v1: tablas básicas, solo se registra la versión
+                upgrade(conn)
+            _set_schema_version(conn, target)
+            conn.execute('COMMIT')
+        except Exception:
+            try:
+                conn.execute('ROLLBACK')
+            except Exception:
+                pass
+            raise
+        version = target
+
+# Tokenizador FTS: sin distinción de acentos; índices de prefijo para "term*".
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+
+def _create_notes_fts(conn: sqlite3.Connection):
+    """Crea notes_fts (contenido externo = notes) y sus triggers."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, folder, "
+                     f"content='notes', content_rowid='id', tokenize='{FTS_TOKENIZE}', prefix='2 3')")
+    except sqlite3.OperationalError as e:
+        if 'remove_diacritics' not in str(e).lower() and 'tokenize' not in str(e).lower():
+            raise
+        # SQLite < 3.27 no conoce remove_diacritics 2
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, folder, "
+                     "content='notes', content_rowid='id', tokenize='unicode61 remove_diacritics 1', prefix='2 3')")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN INSERT INTO notes_fts(rowid, title, content, folder) VALUES (new.id, new.title, new.content, new.folder); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN INSERT INTO notes_fts(notes_fts, rowid, title, content, folder) VALUES('delete', old.id, old.title, old.content, old.folder); INSERT INTO notes_fts(rowid, title, content, folder) VALUES (new.id, new.title, new.content, new.folder); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN INSERT INTO notes_fts(notes_fts, rowid, title, content, folder) VALUES('delete', old.id, old.title, old.content, old.folder); END;")
 
 def _upgrade_to_v2(conn: sqlite3.Connection):
     """Crea FTS5 para notas si está disponible."""
     try:
-        # Verificar soporte FTS5
+        _create_notes_fts(conn)
+    except sqlite3.OperationalError as e:
+        if 'fts5' in str(e).lower():
+            return  # Sin soporte FTS5, se aborta silenciosamente
+        raise
+
+def _upgrade_to_v4(conn: sqlite3.Connection):
+    """Recrea notes_fts con tokenizador sin acentos y reconstruye el índice.
+
+    El rebuild también indexa notas insertadas antes de que existiera la
+    tabla FTS (p.ej. migración legacy previa a v2).
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='notes_fts'").fetchone()
+    if row is None:
+        return  # Sin FTS5
+    if 'remove_diacritics' not in (row[0] or ''):
+        for trg in ('notes_ai', 'notes_au', 'notes_ad'):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trg}")
+        conn.execute("DROP TABLE notes_fts")
+        _create_notes_fts(conn)
+    conn.execute("INSERT INTO notes_fts(notes_fts) VALUES('rebuild')")
+
+# start_ts: segundos "de pared" desde epoch (fecha/hora local tratada como UTC,
+# sin zona horaria). Eventos sin hora se ordenan al final del día (23:59:59).
+_HHMM_SQL = "CASE WHEN length({t})=4 THEN '0' || {t} ELSE {t} END"
+_START_TS_SQL = (
+    "CASE WHEN {t}<>'' AND strftime('%s', {d} || ' ' || " + _HHMM_SQL + ") IS NOT NULL "
+    "THEN CAST(strftime('%s', {d} || ' ' || " + _HHMM_SQL + ") AS INTEGER) "
+    "ELSE CAST(strftime('%s', {d}) AS INTEGER) + 86399 END"
+)
+_BACKFILL_BATCH = 5000
+
+def _upgrade_to_v3(conn: sqlite3.Connection):
+    """Añade events.start_ts y el índice cubriente idx_events_start.
+
+    Se usa una columna generada VIRTUAL (sin reescribir la tabla). Con
+    SQLite < 3.31 se recurre a una columna normal mantenida por triggers y
+    rellenada por lotes de id.
+    """
+    try:
+        cols = {r[1] for r in conn.execute("PRAGMA table_xinfo(events)").fetchall()}
+    except sqlite3.OperationalError:
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(events)").fetchall()}
+    if 'start_ts' not in cols:
         try:
-            conn.execute("SELECT 1 FROM sqlite_master")
-            # Intento de crear virtual table (idempotente con IF NOT EXISTS no soportado en FTS5, se captura excepción)
-            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content, folder, content='notes', content_rowid='id')")
-        except sqlite3.OperationalError as e:
-            if 'fts5' in str(e).lower():
-                return  # Sin soporte FTS5, se aborta silenciosamente
-            raise
-        # Triggers (usar OR REPLACE para evitar duplicados si se recrean)
-        conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN INSERT INTO notes_fts(rowid, title, content, folder) VALUES (new.id, new.title, new.content, new.folder); END;")
-        conn.execute("CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN INSERT INTO notes_fts(notes_fts, rowid, title, content, folder) VALUES('delete', old.id, old.title, old.content, old.folder); INSERT INTO notes_fts(rowid, title, content, folder) VALUES (new.id, new.title, new.content, new.folder); END;")
-        conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN INSERT INTO notes_fts(notes_fts, rowid, title, content, folder) VALUES('delete', old.id, old.title, old.content, old.folder); END;")
-    except Exception as e:
-        _log_error('upgrade_v2', e)
+            conn.execute(
+                "ALTER TABLE events ADD COLUMN start_ts INTEGER GENERATED ALWAYS AS ("
+                + _START_TS_SQL.format(d='date', t='time') + ") VIRTUAL"
+            )
+        except sqlite3.OperationalError:
+            conn.execute("ALTER TABLE events ADD COLUMN start_ts INTEGER")
+            expr = _START_TS_SQL.format(d='new.date', t='new.time')
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS events_ts_ai AFTER INSERT ON events BEGIN UPDATE events SET start_ts=({expr}) WHERE id=new.id; END;")
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS events_ts_au AFTER UPDATE OF date, time ON events BEGIN UPDATE events SET start_ts=({expr}) WHERE id=new.id; END;")
+            max_id = conn.execute("SELECT IFNULL(MAX(id), 0) FROM events").fetchone()[0]
+            expr = _START_TS_SQL.format(d='date', t='time')
+            for lo in range(0, max_id + 1, _BACKFILL_BATCH):
+                conn.execute(f"UPDATE events SET start_ts=({expr}) WHERE id BETWEEN ? AND ?",
+                             (lo, lo + _BACKFILL_BATCH - 1))
+    # Cubre SELECT * por rango de start_ts ya ordenado (sin B-tree temporal)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_start ON events(start_ts, title, time, completed, date)")
+
+def to_start_ts(dt: datetime) -> int:
+    """Convierte un datetime local (naive) a la escala de events.start_ts."""
+    return calendar.timegm(dt.timetuple())
+
+def event_start_ts(date: str, time: str | None) -> int | None:
+    """Equivalente en Python de events.start_ts (None si la fecha no es válida)."""
+    bounds = _day_bounds(date)
+    if bounds is None:
+        return None
+    if time:
+        try:
+            h, m = map(int, time.split(':'))
+            if 0 <= h < 24 and 0 <= m < 60:
+                return bounds[0] + h * 3600 + m * 60
+        except ValueError:
+            pass
+    return bounds[1]
+
+def _day_bounds(date: str) -> tuple[int, int] | None:
+    try:
+        start = to_start_ts(datetime.strptime(date, '%Y-%m-%d'))
+    except (TypeError, ValueError):
+        return None
+    return start, start + 86399
 
 # ================== UTILIDADES EXTRA ==================
 
-def backup_export(path: str | None = None) -> str | None:
-    """Exporta contenido (events, notes, config) a JSON en data/backups.
+# Formato de backup: NDJSON (opcionalmente gzip). Primera línea = cabecera;
+# por tabla una línea {"table", "columns"} seguida de una fila por línea
+# (lista de valores). Se escribe desde el cursor y se importa por lotes, así
+# la memoria no crece con el tamaño de la base.
+BACKUP_FORMAT = 'asistente-ndjson'
+BACKUP_VERSION = 1
+BACKUP_BATCH = 1000
+_BACKUP_TABLES = ('events', 'notes', 'config', 'folders', 'event_series', 'event_overrides')
+
+def _open_backup(path: Path, mode: str, gz: bool | None = None):
+    """Abre un backup en texto; en lectura gzip se detecta por la cabecera mágica."""
+    if gz is None:
+        with open(path, 'rb') as fh:
+            gz = fh.read(2) == b'\x1f\x8b'
+    if gz:
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+def backup_export(path: str | None = None, compress: bool = True) -> str | None:
+    """Exporta events, notes, config, folders y series a NDJSON en data/backups (gzip si compress).
 
-    Si se provee path, guarda allí; retorna ruta final o None si fallo.
+    Si se provee path, guarda allí (gzip solo si termina en .gz); retorna ruta
+    final o None si fallo. Las filas se leen del cursor en una sola
+    transacción de lectura (instantánea coherente) y se escriben una a una.
     """
     conn = get_conn()
     try:
@@ -231,52 +840,148 @@ def backup_export(path: str | None = None) -> str | None:
         backup_dir = DATA_DIR / 'backups'
         backup_dir.mkdir(exist_ok=True)
         if path is None:
-            fname = f"backup_{int(time.time())}.json"
+            fname = f"backup_{int(time.time())}.ndjson" + ('.gz' if compress else '')
             path_obj = backup_dir / fname
         else:
             path_obj = Path(path)
-        data = {}
-        for tbl in ('events', 'notes', 'config'):
-            try:
-                cur = conn.execute(f"SELECT * FROM {tbl}")
-                cols = [d[0] for d in cur.description]
-                data[tbl] = [dict(zip(cols, row)) for row in cur.fetchall()]
-            except Exception as e:
-                _log_error('backup_export_table_'+tbl, e)
-        path_obj.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp = path_obj.with_name(path_obj.name + '.tmp')
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        conn.execute("BEGIN")
+        try:
+            with _open_backup(tmp, 'w', gz=path_obj.suffix == '.gz') as fh:
+                fh.write(dumps({'format': BACKUP_FORMAT, 'version': BACKUP_VERSION, 'created': int(time.time())}) + '\n')
+                for tbl in _BACKUP_TABLES:
+                    try:
+                        cur = conn.execute(f"SELECT * FROM {tbl}")
+                    except Exception as e:
+                        _log_error('backup_export_table_'+tbl, e)
+                        continue
+                    fh.write(dumps({'table': tbl, 'columns': [d[0] for d in cur.description]}) + '\n')
+                    while True:
+                        rows = cur.fetchmany(BACKUP_BATCH)
+                        if not rows:
+                            break
+                        fh.writelines(dumps(list(r)) + '\n' for r in rows)
+        finally:
+            conn.execute("COMMIT")
+        os.replace(tmp, path_obj)
         return str(path_obj)
     except Exception as e:
         _log_error('backup_export', e)
         return None
 
-def backup_import(path: str) -> bool:
-    """Importa datos desde un JSON exportado. No borra datos existentes (INSERT OR IGNORE / REPLACE según caso)."""
-    conn = get_conn()
+def _iter_backup(path: Path):
+    """Genera (tabla, dict_fila) desde un backup NDJSON o un JSON antiguo."""
+    with _open_backup(path, 'r') as fh:
+        first = fh.readline()
+        try:
+            header = json.loads(first)
+        except ValueError:
+            header = None
+        if not (isinstance(header, dict) and header.get('format') == BACKUP_FORMAT):
+            # Formato JSON previo (un único objeto): requiere cargarlo entero
+            fh.seek(0)
+            blob = json.load(fh)
+            for tbl in _BACKUP_TABLES:
+                for row in blob.get(tbl, []):
+                    if isinstance(row, dict):
+                        yield tbl, row
+            return
+        table, cols = None, []
+        for line in fh:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict):
+                table, cols = item.get('table'), item.get('columns') or []
+            elif isinstance(item, list) and table:
+                yield table, dict(zip(cols, item))
+
+def _backup_params(table: str, row: dict) -> tuple | None:
+    if table == 'events':
+        return (row.get('title',''), row.get('date',''), row.get('time','') or '', row.get('completed',0))
+    if table == 'notes':
+        return (row.get('title',''), row.get('content',''), row.get('folder','') or '', row.get('updated_at'))
+    if table == 'config' and row.get('key') is not None and row.get('value') is not None:
+        return (row.get('key'), row.get('value'))
+    if table == 'folders' and row.get('name'):
+        return (row.get('name'),)  # los recuentos los rehacen los triggers
+    if table == 'event_series' and row.get('id') and row.get('rrule'):
+        return tuple(row.get(c) for c in ('id', 'title', 'dtstart', 'time', 'rrule', 'start_ts', 'until_ts'))
+    if table == 'event_overrides' and row.get('series_id') and row.get('date'):
+        return tuple(row.get(c) for c in ('series_id', 'date', 'cancelled', 'completed', 'title', 'time'))
+    return None
+
+def _backup_apply(tx: sqlite3.Connection, table: str, batch: list[tuple], series_ids: dict):
+    if table == 'events':
+        _op_event_create_many(tx, batch)
+    elif table == 'notes':
+        _op_note_upsert_many(tx, batch)
+    elif table == 'config':
+        _execute(tx, 'config_put', batch, many=True)
+        _bump_config_version(tx)
+    elif table == 'folders':
+        _execute(tx, 'folder_create', batch, many=True)
+    elif table == 'event_series':
+        # El id del backup puede estar ocupado por otra serie local: se reutiliza
+        # una serie idéntica o se inserta con id nuevo; series_ids traduce los overrides
+        created = []
+        for old_id, title, dtstart, t, rrule, start_ts, until_ts in batch:
+            row = _query(tx, 'series_find', (title, dtstart, t or '', rrule))
+            if row:
+                series_ids[old_id] = row[0][0]
+                continue
+            cur = _execute(tx, 'series_insert', (title, dtstart, t or '', rrule, start_ts, until_ts))
+            series_ids[old_id] = cur.lastrowid
+            created.append((cur.lastrowid,))
+        if created:
+            _record_change('series', 'insert', created)
+    elif table == 'event_overrides':
+        rows = [(series_ids[b[0]],) + b[1:] for b in batch if b[0] in series_ids]
+        if rows:
+            _execute(tx, 'override_import', rows, many=True)
+            _record_change('series', 'update', {(r[0],): None for r in rows})
+
+def backup_import(path: str, batch_size: int = BACKUP_BATCH) -> bool:
+    """Importa un backup (NDJSON/gzip o JSON antiguo). No borra datos existentes.
+
+    Se confirma cada `batch_size` filas: memoria acotada y el escritor queda
+    libre entre lotes. Las escrituras son idempotentes (INSERT OR IGNORE /
+    UPSERT), por lo que reimportar tras un fallo parcial converge.
+    """
+    pending: dict[str, list[tuple]] = {}
+    series_ids: dict = {}  # id de serie en el backup -> id local
+    imported_config = False
     try:
-        content = Path(path).read_text(encoding='utf-8')
-        blob = json.loads(content)
+        _wait_schema()  # folders (v6) y series (v8) llegan con los upgrades
+        for table, row in _iter_backup(Path(path)):
+            params = _backup_params(table, row)
+            if params is None:
+                continue
+            if table not in pending and pending:
+                # Nueva tabla: aplicar antes lo pendiente (las series antes que sus overrides)
+                with transaction() as tx:
+                    for prev, batch in pending.items():
+                        _backup_apply(tx, prev, batch, series_ids)
+                pending.clear()
+            imported_config = imported_config or table == 'config'
+            batch = pending.setdefault(table, [])
+            batch.append(params)
+            if len(batch) >= batch_size:
+                with transaction() as tx:
+                    _backup_apply(tx, table, batch, series_ids)
+                batch.clear()
         with transaction() as tx:
-            for ev in blob.get('events', []):
-                try:
-                    tx.execute("INSERT OR IGNORE INTO events(title,date,time,completed) VALUES (?,?,?,?)", (
-                        ev.get('title',''), ev.get('date',''), ev.get('time','') or '', ev.get('completed',0)))
-                except Exception:
-                    pass
-            for nt in blob.get('notes', []):
-                try:
-                    tx.execute("INSERT INTO notes(title,content,folder,updated_at) VALUES (?,?,?,?) ON CONFLICT(title,folder) DO UPDATE SET content=excluded.content, updated_at=CURRENT_TIMESTAMP", (
-                        nt.get('title',''), nt.get('content',''), nt.get('folder','') or '', nt.get('updated_at','')))
-                except Exception:
-                    pass
-            for cf in blob.get('config', []):
-                try:
-                    tx.execute("INSERT OR REPLACE INTO config(key,value) VALUES (?,?)", (cf.get('key'), cf.get('value')))
-                except Exception:
-                    pass
+            for table, batch in pending.items():
+                if batch:
+                    _backup_apply(tx, table, batch, series_ids)
         return True
     except Exception as e:
         _log_error('backup_import', e)
         return False
+    finally:
+        if imported_config:
+            _invalidate_config_cache()
 
 def integrity_check() -> bool:
     """Ejecuta PRAGMA integrity_check. True si OK."""
@@ -289,95 +994,375 @@ def integrity_check() -> bool:
         _log_error('integrity_check', e)
         return False
 
+# ================== SNAPSHOTS ==================
+# Copia completa del archivo (incluye meta, FTS e índices) con la API de
+# backup de SQLite en pasos de SNAPSHOT_PAGES páginas: entre pasos se libera
+# el bloqueo de lectura y el escritor puede seguir trabajando. Si la base
+# cambia durante la copia (otra conexión), SQLite reinicia la copia.
+SNAPSHOT_PAGES = 256
+SNAPSHOT_SLEEP = 0.005
+SNAPSHOT_KEEP = 7
+SNAPSHOT_PREFIX = 'snapshot_'
+
+def snapshot_dir() -> Path:
+    return DATA_DIR / 'backups'
+
+def snapshot_create(dest: str | None = None, pages: int = SNAPSHOT_PAGES, sleep: float = SNAPSHOT_SLEEP,
+                    progress=None) -> str | None:
+    """Crea un snapshot en línea de la base y lo verifica con integrity_check.
+
+    progress(copiadas, total) se llama tras cada paso (desde el hilo que copia).
+    Retorna la ruta final o None si la copia o la verificación fallan (en
+    ese caso no queda ningún archivo parcial).
+    """
+    _get_writer()  # esquema listo antes de copiar
+    if dest is None:
+        snapshot_dir().mkdir(parents=True, exist_ok=True)
+        dest_path = snapshot_dir() / f"{SNAPSHOT_PREFIX}{time.strftime('%Y%m%d_%H%M%S')}.db"
+    else:
+        dest_path = Path(dest)
+    tmp = dest_path.with_name(dest_path.name + '.tmp')
+
+    def _step(status, remaining, total):
+        if progress is not None:
+            try:
+                progress(total - remaining, total)
+            except Exception:
+                pass
+
+    src = None
+    target = None
+    try:
+        src = _connect(readonly=True)
+        tmp.unlink(missing_ok=True)
+        target = sqlite3.connect(str(tmp))
+        src.backup(target, pages=pages, progress=_step, sleep=sleep)
+        row = target.execute("PRAGMA integrity_check").fetchone()
+        if not row or row[0] != 'ok':
+            raise sqlite3.DatabaseError(f"integrity_check: {row[0] if row else '?'}")
+        target.close()
+        target = None
+        os.replace(tmp, dest_path)
+        return str(dest_path)
+    except Exception as e:
+        _log_error('snapshot_create', e)
+        return None
+    finally:
+        for c in (target, src):
+            if c is not None:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+        try:
+            tmp.unlink(missing_ok=True)
+        except Exception:
+            pass
+
+def snapshot_list() -> list[Path]:
+    """Snapshots existentes, del más antiguo al más reciente."""
+    d = snapshot_dir()
+    if not d.exists():
+        return []
+    return sorted(d.glob(f"{SNAPSHOT_PREFIX}*.db"))
+
+def snapshot_rotate(keep: int = SNAPSHOT_KEEP) -> list[str]:
+    """Elimina los snapshots más antiguos dejando `keep`. Retorna los borrados."""
+    removed = []
+    snaps = snapshot_list()
+    for p in snaps[:max(0, len(snaps) - keep)]:
+        try:
+            p.unlink()
+            removed.append(str(p))
+        except Exception as e:
+            _log_error('snapshot_rotate', e)
+    return removed
+
 # ================== BÚSQUEDA FTS ==================
 
+# --- Índice de subcadenas (v5) ---
+# Preferente: FTS5 con tokenizador trigram (SQLite >= 3.34). Si no existe, una
+# tabla de trigramas (notes_ngram) mantenida desde Python: los triggers solo
+# marcan notas pendientes (los triggers no admiten CTE para generar n‑gramas)
+# y _ngram_flush las indexa antes de buscar. Sin OR IGNORE en los triggers: el
+# ON CONFLICT del UPSERT exterior lo anularía.
+TRIGRAM_TOKENIZE = "trigram"
+NGRAM = 3
+
+def _upgrade_to_v5(conn: sqlite3.Connection):
+    """Crea el índice de subcadenas y lo rellena con las notas existentes."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_tri USING fts5(title, content, "
+                     f"content='notes', content_rowid='id', tokenize='{TRIGRAM_TOKENIZE}')")
+    except sqlite3.OperationalError:
+        _create_notes_ngram(conn)
+        conn.execute("INSERT OR IGNORE INTO notes_ngram_dirty(note_id) SELECT id FROM notes")
+        return
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_tri_ai AFTER INSERT ON notes BEGIN INSERT INTO notes_tri(rowid, title, content) VALUES (new.id, new.title, new.content); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_tri_au AFTER UPDATE OF title, content ON notes BEGIN INSERT INTO notes_tri(notes_tri, rowid, title, content) VALUES('delete', old.id, old.title, old.content); INSERT INTO notes_tri(rowid, title, content) VALUES (new.id, new.title, new.content); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_tri_ad AFTER DELETE ON notes BEGIN INSERT INTO notes_tri(notes_tri, rowid, title, content) VALUES('delete', old.id, old.title, old.content); END;")
+    conn.execute("INSERT INTO notes_tri(notes_tri) VALUES('rebuild')")
+
+def _create_notes_ngram(conn: sqlite3.Connection):
+    conn.execute("CREATE TABLE IF NOT EXISTS notes_ngram (gram TEXT NOT NULL, note_id INTEGER NOT NULL, PRIMARY KEY (gram, note_id)) WITHOUT ROWID")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_ngram_note ON notes_ngram(note_id)")
+    conn.execute("CREATE TABLE IF NOT EXISTS notes_ngram_dirty (note_id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ng_ai AFTER INSERT ON notes BEGIN INSERT INTO notes_ngram_dirty(note_id) SELECT new.id WHERE NOT EXISTS (SELECT 1 FROM notes_ngram_dirty WHERE note_id=new.id); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ng_au AFTER UPDATE OF title, content ON notes BEGIN INSERT INTO notes_ngram_dirty(note_id) SELECT new.id WHERE NOT EXISTS (SELECT 1 FROM notes_ngram_dirty WHERE note_id=new.id); END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS notes_ng_ad AFTER DELETE ON notes BEGIN DELETE FROM notes_ngram WHERE note_id=old.id; DELETE FROM notes_ngram_dirty WHERE note_id=old.id; END;")
+
+def _ngrams(text: str) -> set[str]:
+    text = (text or '').lower()
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+def _ngram_flush(conn: sqlite3.Connection) -> int:
+    """Indexa las notas marcadas como pendientes. Retorna cuántas procesó."""
+    total = 0
+    while True:
+        ids = [r[0] for r in _query(conn, 'ngram_dirty_ids', (_IN_CHUNK,))]
+        if not ids:
+            return total
+        marks = ','.join('?' * len(ids))
+        _execute(conn, 'ngram_clear_in', ids, sql=f"DELETE FROM notes_ngram WHERE note_id IN ({marks})")
+        rows = _query(conn, 'ngram_notes_in', ids, sql=f"SELECT id, title, content FROM notes WHERE id IN ({marks})")
+        _execute(conn, 'ngram_put', [(g, r[0]) for r in rows for g in _ngrams(f"{r[1]}\n{r[2]}")], many=True)
+        _execute(conn, 'ngram_dirty_clear_in', ids, sql=f"DELETE FROM notes_ngram_dirty WHERE note_id IN ({marks})")
+        total += len(ids)
+
+def _substring_index(conn: sqlite3.Connection) -> str | None:
+    """'trigram', 'ngram' o None según el índice de subcadenas disponible."""
+    names = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('notes_tri','notes_ngram')")}
+    if 'notes_tri' in names:
+        return 'trigram'
+    if 'notes_ngram' in names:
+        return 'ngram'
+    return None
+
+def _substring_filter(conn: sqlite3.Connection, term: str) -> tuple[str, list, str]:
+    """(condición sobre `notes n`, parámetros, modo) para "título o contenido contiene term".
+
+    modo: 'trigram' o 'ngram' si hay índice de subcadenas y el término tiene
+    al menos NGRAM caracteres; si no, 'like' (recorrido completo).
+    """
+    like = f"%{term.lower()}%"
+    mode = _substring_index(conn) if len(term) >= NGRAM else None
+    if mode == 'trigram':
+        return ("n.id IN (SELECT rowid FROM notes_tri WHERE notes_tri MATCH ?)",
+                ['"' + term.replace('"', '""') + '"'], mode)
+    if mode == 'ngram':
+        if _query(conn, 'ngram_dirty_any'):
+            with transaction() as w, _cache_neutral(w):
+                _ngram_flush(w)
+        grams = sorted(_ngrams(term))
+        # Candidatos con todos los trigramas; el LIKE final descarta falsos positivos
+        return (f"n.id IN (SELECT note_id FROM notes_ngram WHERE gram IN ({','.join('?' * len(grams))}) "
+                "GROUP BY note_id HAVING COUNT(*)=?) AND (LOWER(n.content) LIKE ? OR LOWER(n.title) LIKE ?)",
+                [*grams, len(grams), like, like], mode)
+    return "(LOWER(n.content) LIKE ? OR LOWER(n.title) LIKE ?)", [like, like], 'like'
+
+def _note_search_indexed(conn: sqlite3.Connection, term: str, folder: str | None) -> list[tuple[str, str | None]] | None:
+    """Búsqueda de subcadena vía índice. None si no aplica (sin índice o término < NGRAM)."""
+    cond, params, mode = _substring_filter(conn, term)
+    if mode == 'like':
+        return None
+    q = f"SELECT n.title, n.folder FROM notes n WHERE {cond}"
+    if folder is not None:
+        q += " AND n.folder=?"
+        params.append(folder or '')
+    return [(r[0], r[1]) for r in _query(conn, f'note_search_{mode}', params, sql=q + " ORDER BY n.id")]
+
+_FTS_TOKEN_RE = re.compile(r"\w+\*?")
+
+def fts_query(text: str, prefix: bool = True) -> str | None:
+    """Convierte texto libre en una expresión MATCH segura.
+
+    Cada palabra se cita ("..."), así la puntuación o los operadores FTS del
+    usuario no provocan errores de sintaxis. Las palabras terminadas en `*`
+    y, si prefix=True, la última palabra, se buscan por prefijo. Los
+    términos se combinan con AND implícito. None si no hay palabras.
+    """
+    tokens = _FTS_TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    parts = []
+    for i, tok in enumerate(tokens):
+        star = tok.endswith('*') or (prefix and i == len(tokens) - 1)
+        parts.append(f'"{tok.rstrip("*")}"' + ('*' if star else ''))
+    return ' '.join(parts)
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='notes_fts'").fetchone() is not None
+
+# Pesos bm25 por columna (title, content, folder): el título pesa más.
+_BM25 = "bm25(notes_fts, 10.0, 1.0, 2.0)"
+
+def note_search_ranked(term: str, folder: str | None = None, limit: int = 20,
+                       after: tuple[float, int] | None = None, prefix: bool = True,
+                       highlight: tuple[str, str] = ('[', ']')) -> dict:
+    """Búsqueda FTS5 ordenada por bm25 con fragmentos y paginación por cursor.
+
+    Retorna {'results': [{id, title, folder, snippet, score}], 'next': cursor}
+    donde `next` es (score, id) de la última fila (pasarlo como `after` para
+    la página siguiente) o None si no hay más. Sin FTS5 recurre a la búsqueda
+    por subcadena: score 0, orden de id y el mismo cursor.
+    """
+    _wait_schema()
+    conn = get_conn()
+    if not _has_fts(conn):
+        cond, params, _mode = _substring_filter(conn, term)
+        q = f"SELECT n.id, n.title, n.folder, NULL, 0.0 FROM notes n WHERE {cond}"
+        if folder is not None:
+            q += " AND n.folder=?"
+            params.append(folder or '')
+        if after is not None:
+            q += " AND n.id > ?"
+            params.append(after[1])
+        rows = _query(conn, 'note_search_ranked_plain', [*params, limit], sql=q + " ORDER BY n.id LIMIT ?")
+        results = [{'id': r[0], 'title': r[1], 'folder': r[2], 'snippet': None, 'score': 0.0} for r in rows]
+        return {'results': results, 'next': (0.0, results[-1]['id']) if len(results) == limit else None}
+    match = fts_query(term, prefix=prefix)
+    if match is None:
+        return {'results': [], 'next': None}
+    q = (f"SELECT n.id, n.title, n.folder, snippet(notes_fts, 1, ?, ?, '…', 12) AS snip, {_BM25} AS score "
+         "FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid WHERE notes_fts MATCH ?")
+    params: list = [highlight[0], highlight[1], match]
+    if folder is not None:
+        q += " AND n.folder=?"
+        params.append(folder or '')
+    if after is not None:
+        q += f" AND ({_BM25} > ? OR ({_BM25} = ? AND n.id > ?))"
+        params += [after[0], after[0], after[1]]
+    q += " ORDER BY score, n.id LIMIT ?"
+    params.append(limit)
+    try:
+        rows = _query(conn, 'note_search_ranked', params, sql=q)
+    except sqlite3.OperationalError as e:
+        _log_error('note_search_ranked', e)
+        return {'results': [], 'next': None}
+    results = [{'id': r[0], 'title': r[1], 'folder': r[2], 'snippet': r[3], 'score': r[4]} for r in rows]
+    nxt = (results[-1]['score'], results[-1]['id']) if len(results) == limit else None
+    return {'results': results, 'next': nxt}
+
 def note_search_fts(term: str, folder: str | None = None, limit: int = 20) -> list[dict]:
-    """Busca usando FTS5 si está disponible; fallback silencioso a note_search.
+    """Busca usando FTS5 (ordenado por relevancia) si está disponible.
 
     Retorna lista de dicts con keys: title, folder.
     """
-    conn = get_conn()
     try:
-        # Verifica que la tabla virtual exista
-        cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='notes_fts'")
-        if not cur.fetchone():
-            # FTS no disponible → fallback
-            results = note_search(term, folder)
-            return [{'title': t, 'folder': f} for t, f in results]
-        match_expr = term.strip()
-        if not match_expr:
-            return []
-        if folder is not None:
-            folder = folder or ''
-            q = ("SELECT n.title, n.folder FROM notes_fts f JOIN notes n ON n.id = f.rowid "
-                 "WHERE notes_fts MATCH ? AND n.folder=? LIMIT ?")
-            cur2 = conn.execute(q, (match_expr, folder, limit))
-        else:
-            q = ("SELECT n.title, n.folder FROM notes_fts f JOIN notes n ON n.id = f.rowid "
-                 "WHERE notes_fts MATCH ? LIMIT ?")
-            cur2 = conn.execute(q, (match_expr, limit))
-        return [{'title': r[0], 'folder': r[1]} for r in cur2.fetchall()]
+        res = note_search_ranked(term, folder, limit=limit)
+        return [{'title': r['title'], 'folder': r['folder']} for r in res['results']]
     except Exception as e:
         _log_error('note_search_fts', e)
+        return []
+
+# --- Migración legacy por lotes y reanudable ---
+# El estado vive en meta.legacy_migration (JSON) y se guarda en la misma
+# transacción que cada lote: tras un cierre inesperado se continúa desde el
+# último lote confirmado. Las notas se procesan en orden de ruta relativa y
+# se leen con un pool de hilos (el siguiente lote se lee mientras se escribe
+# el actual).
+LEGACY_BATCH = 200
+LEGACY_READ_WORKERS = 4
+_progress_subscribers: list = []  # protegido por _subscribers_lock, como _subscribers
+
+def subscribe_migration_progress(callback) -> None:
+    """callback(fase, hechos, total) con fase 'eventos' o 'notas' (desde el hilo de migración)."""
+    with _subscribers_lock:
+        if callback not in _progress_subscribers:
+            _progress_subscribers.append(callback)
+
+def unsubscribe_migration_progress(callback) -> None:
+    with _subscribers_lock:
         try:
-            results = note_search(term, folder)
-            return [{'title': t, 'folder': f} for t, f in results]
-        except Exception:
-            return []
+            _progress_subscribers.remove(callback)
+        except ValueError:
+            pass
+
+def _report_migration(fase: str, hechos: int, total: int) -> None:
+    with _subscribers_lock:
+        callbacks = list(_progress_subscribers)
+    for cb in callbacks:
+        try:
+            cb(fase, hechos, total)
+        except Exception as e:
+            _log_error('migration_progress', e)
+
+def _legacy_state(conn: sqlite3.Connection) -> dict:
+    row = conn.execute("SELECT value FROM meta WHERE key='legacy_migration'").fetchone()
+    try:
+        state = json.loads(row[0]) if row else {}
+    except ValueError:
+        state = {}  # 'pending': aún sin progreso
+    return state if isinstance(state, dict) else {}
+
+def _save_legacy_state(tx: sqlite3.Connection, state: dict) -> None:
+    tx.execute("INSERT OR REPLACE INTO meta(key,value) VALUES('legacy_migration',?)", (json.dumps(state),))
+
+def _read_legacy_note(rel: str) -> tuple[str, str, str] | None:
+    try:
+        content = (NOTAS_DIR / rel).read_text(encoding='utf-8', errors='ignore')
+    except Exception:
+        return None
+    parent, _, fname = rel.rpartition('/')
+    return (fname[:-4], content, parent)
 
 def _migrate_legacy(conn: sqlite3.Connection) -> tuple[int,int]:
+    """Migra eventos.json y notas/*.txt por lotes. Retorna totales acumulados.
+
+    Lanza la excepción si un lote falla; el estado guardado permite reanudar.
+    """
+    state = _legacy_state(conn)
     # Migrar eventos
-    ev_cnt = 0
-    try:
+    ev_cnt = state.get('eventos', 0)
+    if not state.get('eventos_ok'):
+        rows = []
         if EVENTOS_JSON.exists():
-            with EVENTOS_JSON.open('r', encoding='utf-8') as f:
-                eventos = json.load(f)
+            try:
+                with EVENTOS_JSON.open('r', encoding='utf-8') as f:
+                    eventos = json.load(f)
+            except Exception as e:
+                _log_error('migrate_legacy_events', e)
+                eventos = []
             if isinstance(eventos, list):
-                for ev in eventos:
-                    title = ev.get('evento') or ''
-                    date = ev.get('fecha') or ''
-                    if not title or not date:
-                        continue
-                    time = ev.get('hora') or ''
-                    completed = 1 if ev.get('completado') else 0
-                    try:
-                        conn.execute(
-                            "INSERT OR IGNORE INTO events(title,date,time,completed) VALUES (?,?,?,?)",
-                            (title, date, time, completed)
-                        )
-                        ev_cnt += 1
-                    except Exception:
-                        pass
-                conn.commit()
-    except Exception:
-        pass
+                rows = [
+                    (ev.get('evento') or '', ev.get('fecha') or '', ev.get('hora') or '',
+                     1 if ev.get('completado') else 0)
+                    for ev in eventos if isinstance(ev, dict)
+                ]
+        for i in range(state.get('eventos_pos', 0), len(rows), LEGACY_BATCH):
+            batch = rows[i:i + LEGACY_BATCH]
+            with transaction() as tx:
+                ev_cnt += sum(_op_event_create_many(tx, batch))
+                state.update(eventos_pos=i + len(batch), eventos=ev_cnt)
+                _save_legacy_state(tx, state)
+            _report_migration('eventos', i + len(batch), len(rows))
+        state['eventos_ok'] = True
+        with transaction() as tx:
+            _save_legacy_state(tx, state)
     # Migrar notas
-    note_cnt = 0
-    try:
-        if NOTAS_DIR.exists():
-            for root, _, files in os.walk(NOTAS_DIR):
-                for fname in files:
-                    if not fname.endswith('.txt'):
-                        continue
-                    full = Path(root) / fname
-                    try:
-                        content = full.read_text(encoding='utf-8', errors='ignore')
-                    except Exception:
-                        continue
-                    title = fname[:-4]
-                    rel_parent = Path(root).relative_to(NOTAS_DIR)
-                    folder = None if str(rel_parent) == '.' else str(rel_parent).replace('\\', '/')
-                    try:
-                        conn.execute(
-                            "INSERT OR IGNORE INTO notes(title, content, folder) VALUES (?,?,?)",
-                            (title, content, folder or '')
-                        )
-                        note_cnt += 1
-                    except Exception:
-                        pass
-            conn.commit()
-    except Exception:
-        pass
+    note_cnt = state.get('notas', 0)
+    if NOTAS_DIR.exists():
+        paths = sorted(
+            Path(root, fname).relative_to(NOTAS_DIR).as_posix()
+            for root, _, files in os.walk(NOTAS_DIR) for fname in files if fname.endswith('.txt')
+        )
+        after = state.get('notas_tras', '')
+        pending = [p for p in paths if p > after]
+        done = len(paths) - len(pending)
+        batches = [pending[i:i + LEGACY_BATCH] for i in range(0, len(pending), LEGACY_BATCH)]
+        with ThreadPoolExecutor(LEGACY_READ_WORKERS, thread_name_prefix='legacy-read') as pool:
+            nxt = [pool.submit(_read_legacy_note, p) for p in batches[0]] if batches else []
+            for bi, batch in enumerate(batches):
+                cur = nxt
+                nxt = [pool.submit(_read_legacy_note, p) for p in batches[bi + 1]] if bi + 1 < len(batches) else []
+                rows = [r for r in (f.result() for f in cur) if r]
+                with transaction() as tx:
+                    note_cnt += sum(_op_note_upsert_many(tx, rows))
+                    state.update(notas_tras=batch[-1], notas=note_cnt)
+                    _save_legacy_state(tx, state)
+                done += len(batch)
+                _report_migration('notas', done, len(paths))
     return ev_cnt, note_cnt
 
 def cleanup_legacy() -> bool:
@@ -453,7 +1438,7 @@ def _migrate_config_json(conn: sqlite3.Connection) -> None:
                     conn.execute("INSERT OR REPLACE INTO config(key,value) VALUES (?,?)", (k, json.dumps(v, ensure_ascii=False)))
                 except Exception:
                     continue
-            conn.commit()
+            _bump_config_version(conn)
         # Renombrar
         legacy = CONFIG_JSON_PATH.with_suffix('.legacy.json')
         if not legacy.exists():
@@ -464,160 +1449,1267 @@ def _migrate_config_json(conn: sqlite3.Connection) -> None:
     except Exception:
         pass
 
-def config_set(key: str, value) -> bool:
+# Caché de configuración del proceso: se carga una vez y se actualiza por
+# escritura directa (write-through). meta.config_version se incrementa en
+# cada escritura; si otro proceso la cambia, la caché se recarga. La versión
+# se comprueba como mucho cada CONFIG_RECHECK_S segundos.
+CONFIG_RECHECK_S = 1.0
+_config_lock = threading.Lock()
+_config_cache: dict | None = None
+_config_version = -1
+_config_checked = 0.0
+
+def _decode_config(value):
+    try:
+        return json.loads(value)
+    except Exception:
+        return value
+
+def _read_config_version(conn: sqlite3.Connection) -> int:
+    rows = _query(conn, 'config_version')
+    return int(rows[0][0]) if rows else 0
+
+def _bump_config_version(conn: sqlite3.Connection) -> int:
+    _execute(conn, 'config_bump')
+    return _read_config_version(conn)
+
+def _invalidate_config_cache() -> None:
+    global _config_cache
+    with _config_lock:
+        _config_cache = None
+
+def _config_snapshot() -> dict:
+    """Dict cacheado (no copiar aquí; los llamadores públicos devuelven copia)."""
+    global _config_cache, _config_version, _config_checked
+    now = time.monotonic()
+    with _config_lock:
+        cache = _config_cache
+        if cache is not None and now - _config_checked < CONFIG_RECHECK_S:
+            return cache
     conn = get_conn()
+    version = _read_config_version(conn)
+    with _config_lock:
+        if _config_cache is not None and version == _config_version:
+            _config_checked = now
+            return _config_cache
+    # Recarga completa con versión y filas de la misma instantánea
+    conn.execute('BEGIN')
     try:
-        conn.execute("INSERT OR REPLACE INTO config(key,value) VALUES (?,?)", (key, json.dumps(value, ensure_ascii=False)))
-        conn.commit()
+        version = _read_config_version(conn)
+        rows = _query(conn, 'config_all')
+    finally:
+        conn.execute('COMMIT')
+    fresh = {k: _decode_config(v) for k, v in rows}
+    with _config_lock:
+        _config_cache, _config_version, _config_checked = fresh, version, now
+    return fresh
+
+def _config_write_through(values: dict, version: int) -> None:
+    global _config_cache, _config_version
+    with _config_lock:
+        if _config_cache is not None and version == _config_version + 1:
+            _config_cache = {**_config_cache, **values}
+            _config_version = version
+        else:
+            # Otro proceso escribió entremedias: recargar en la próxima lectura
+            _config_cache = None
+
+def config_set_many(values: dict) -> bool:
+    """Guarda varias claves en una sola transacción (y en la caché)."""
+    try:
+        encoded = [(k, json.dumps(v, ensure_ascii=False)) for k, v in values.items()]
+        with transaction() as conn, _cache_neutral(conn):
+            _execute(conn, 'config_put', encoded, many=True)
+            version = _bump_config_version(conn)
+        _config_write_through({k: _decode_config(v) for k, v in encoded}, version)
         return True
     except Exception:
         return False
 
+def config_set(key: str, value) -> bool:
+    return config_set_many({key: value})
+
 def config_get(key: str, default=None):
-    conn = get_conn()
+    """Valor de `key` (copia: modificar listas o dicts no altera la caché)."""
     try:
-        cur = conn.execute("SELECT value FROM config WHERE key=?", (key,))
-        row = cur.fetchone()
-        if not row:
-            return default
-        try:
-            return json.loads(row[0])
-        except Exception:
-            return row[0]
+        snapshot = _config_snapshot()
     except Exception:
         return default
+    return copy.deepcopy(snapshot[key]) if key in snapshot else default
 
 def config_load_all() -> dict:
+    """Copia profunda de la configuración cacheada."""
+    try:
+        return copy.deepcopy(_config_snapshot())
+    except Exception:
+        return {}
+
+# --- Carpetas (v6) ---
+# folders(name, note_count, updated_at) se mantiene con triggers sobre notes:
+# listar carpetas es una lectura del índice de la clave primaria y una
+# carpeta puede existir vacía (folder_create) sin notas de relleno. Vaciar
+# una carpeta no la borra; folder_delete solo elimina carpetas vacías. Los
+# triggers evitan cláusulas de conflicto (el UPSERT de notes las anularía).
+
+def _upgrade_to_v6(conn: sqlite3.Connection):
+    """Crea folders, sus triggers y la rellena desde notes."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS folders (
+        name TEXT PRIMARY KEY,
+        note_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID""")
+    add = ("INSERT INTO folders(name, note_count, updated_at) SELECT new.folder, 0, new.updated_at "
+           "WHERE new.folder<>'' AND NOT EXISTS (SELECT 1 FROM folders WHERE name=new.folder); ")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS folders_ai AFTER INSERT ON notes BEGIN " + add +
+                 "UPDATE folders SET note_count=note_count+1, updated_at=max(updated_at, new.updated_at) WHERE name=new.folder; END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS folders_au AFTER UPDATE OF folder, content, updated_at ON notes BEGIN "
+                 "UPDATE folders SET note_count=note_count-1, updated_at=CURRENT_TIMESTAMP WHERE name=old.folder AND old.folder<>new.folder; " + add +
+                 "UPDATE folders SET note_count=note_count+(old.folder<>new.folder), updated_at=max(updated_at, new.updated_at) WHERE name=new.folder; END;")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS folders_ad AFTER DELETE ON notes BEGIN "
+                 "UPDATE folders SET note_count=note_count-1, updated_at=CURRENT_TIMESTAMP WHERE name=old.folder; END;")
+    conn.execute("INSERT OR REPLACE INTO folders(name, note_count, updated_at) "
+                 "SELECT folder, COUNT(*), MAX(updated_at) FROM notes WHERE folder<>'' GROUP BY folder")
+
+def _folder_rows(name: str, legacy: str, params: Sequence = ()) -> list[sqlite3.Row]:
+    """Consulta sobre folders; hasta que el upgrade v6 termine, la variante DISTINCT sobre notes."""
     conn = get_conn()
-    result = {}
+    if _schema_ready.is_set():
+        try:
+            return _query(conn, name, params)
+        except sqlite3.OperationalError as e:
+            _log_error(name, e)
+    return _query(conn, legacy, params)
+
+def folder_list() -> list[dict]:
+    """Carpetas con {'name', 'notes', 'updated_at'} (incluye las vacías)."""
+    _wait_schema()
+    return [{'name': r[0], 'notes': r[1], 'updated_at': r[2]} for r in _query(get_conn(), 'folder_list')]
+
+def folder_create(name: str) -> bool:
+    """Crea una carpeta vacía. True si no existía."""
+    name = (name or '').strip()
+    if not name:
+        return False
+    _wait_schema()
     try:
-        cur = conn.execute("SELECT key, value FROM config")
-        for k, v in cur.fetchall():
+        with transaction() as conn:
+            created = _execute(conn, 'folder_create', (name,)).rowcount > 0
+            if created:
+                _record_change('folders', 'insert', [(name,)])
+            return created
+    except Exception as e:
+        _log_error('folder_create', e)
+        return False
+
+def folder_delete(name: str) -> bool:
+    """Elimina la carpeta solo si está vacía. True si se eliminó."""
+    _wait_schema()
+    try:
+        with transaction() as conn:
+            deleted = _execute(conn, 'folder_delete_empty', (name or '',)).rowcount > 0
+            if deleted:
+                _record_change('folders', 'delete', [(name,)])
+            return deleted
+    except Exception as e:
+        _log_error('folder_delete', e)
+        return False
+
+# --- Historial de revisiones (v7) ---
+# Cada guardado de note_upsert añade una revisión con el contenido nuevo:
+# completa (zlib) cada REVISION_KEYFRAME revisiones y, entre medias, un delta
+# comprimido respecto a la anterior (prefijo/sufijo comunes + diff por líneas
+# del tramo central), de modo que el coste crece con el tamaño de la edición.
+# Leer una versión aplica como mucho REVISION_KEYFRAME-1 deltas. Guardados a
+# menos de REVISION_COALESCE_S de la última revisión la reemplazan (ráfagas de
+# autoguardado = una revisión). Se conservan REVISION_KEEP por nota y
+# run_maintenance poda las de más de REVISION_MAX_DAYS (salvo la última).
+# Las escrituras masivas (note_upsert_many: importaciones, migración) no
+# generan revisiones.
+REVISION_KEYFRAME = 20
+REVISION_COALESCE_S = 60
+REVISION_KEEP = 100
+REVISION_MAX_DAYS: int | None = 365
+
+def _upgrade_to_v7(conn: sqlite3.Connection):
+    conn.execute("""CREATE TABLE IF NOT EXISTS note_revisions (
+        note_id INTEGER NOT NULL,
+        rev INTEGER NOT NULL,
+        created INTEGER NOT NULL,
+        full INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (note_id, rev)
+    ) WITHOUT ROWID""")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS note_rev_ad AFTER DELETE ON notes BEGIN "
+                 "DELETE FROM note_revisions WHERE note_id=old.id; END;")
+
+def _delta(old: str, new: str) -> bytes:
+    """Delta JSON comprimido: [prefijo, sufijo, ops]; op = [i, j] (líneas de old) o texto nuevo."""
+    limit = min(len(old), len(new))
+    p = 0
+    while p < limit and old[p] == new[p]:
+        p += 1
+    sfx = 0
+    while sfx < limit - p and old[-1 - sfx] == new[-1 - sfx]:
+        sfx += 1
+    a = old[p:len(old) - sfx].splitlines(keepends=True)
+    b = new[p:len(new) - sfx].splitlines(keepends=True)
+    ops: list = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(b[j1:j2]))
+    return zlib.compress(json.dumps([p, sfx, ops], ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def _apply_delta(old: str, data: bytes) -> str:
+    p, sfx, ops = json.loads(zlib.decompress(data))
+    a = old[p:len(old) - sfx].splitlines(keepends=True)
+    mid = ''.join(''.join(a[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+    return old[:p] + mid + old[len(old) - sfx:]
+
+def _revision_content(conn: sqlite3.Connection, note_id: int, rev: int) -> str | None:
+    text = None
+    for r, full, data in _query(conn, 'revision_chain', (note_id, rev, note_id, rev)):
+        text = zlib.decompress(data).decode('utf-8') if full else _apply_delta(text or '', data)
+    return text
+
+def _revision_payload(conn: sqlite3.Connection, note_id: int, rev: int, base: str | None, content: str) -> tuple[int, bytes]:
+    """(full, data) para la revisión `rev`: keyframe o delta sobre `base`, lo que ocupe menos."""
+    whole = zlib.compress(content.encode('utf-8'))
+    if base is None or rev % REVISION_KEYFRAME == 1:
+        return 1, whole
+    delta = _delta(base, content)
+    return (0, delta) if len(delta) < len(whole) else (1, whole)
+
+def _record_revision(conn: sqlite3.Connection, note_id: int, old: str | None, content: str,
+                     old_stamp: str | None = None) -> None:
+    now = int(time.time())
+    last = _query(conn, 'revision_last', (note_id,))
+    if not last and old is not None:
+        # Nota anterior al historial: su contenido previo es la revisión 1
+        created = now
+        if old_stamp:
             try:
-                result[k] = json.loads(v)
-            except Exception:
-                result[k] = v
-    except Exception:
+                created = calendar.timegm(time.strptime(old_stamp[:19], '%Y-%m-%d %H:%M:%S'))
+            except ValueError:
+                pass
+        _execute(conn, 'revision_put', (note_id, 1, created, 1, len(old), zlib.compress(old.encode('utf-8'))))
+        last = _query(conn, 'revision_last', (note_id,))
+    if last and old is not None and _revision_content(conn, note_id, last[0]['rev']) != old:
+        # La nota cambió fuera del historial (note_upsert_many: respaldos, migración):
+        # su contenido previo entra como revisión completa y el delta parte de él
+        rev, created = last[0]['rev'] + 1, now
+        _execute(conn, 'revision_put', (note_id, rev, created, 1, len(old), zlib.compress(old.encode('utf-8'))))
+        rev, base = rev + 1, old
+    elif last and now - last[0]['created'] < REVISION_COALESCE_S and last[0]['rev'] > 1:
+        # Ráfaga: reemplazar la última revisión (delta sobre la penúltima)
+        rev, created = last[0]['rev'], last[0]['created']
+        base = _revision_content(conn, note_id, rev - 1)
+    else:
+        rev, created = (last[0]['rev'] + 1 if last else 1), now
+        base = old
+    full, data = _revision_payload(conn, note_id, rev, base, content)
+    _execute(conn, 'revision_put', (note_id, rev, created, full, len(content), data))
+    if rev > REVISION_KEEP:
+        _prune_revisions(conn, note_id, rev - REVISION_KEEP + 1)
+
+def _prune_revisions(conn: sqlite3.Connection, note_id: int, keep_from: int) -> int:
+    """Borra revisiones < keep_from; la primera que queda pasa a completa si era delta."""
+    first = _query(conn, 'revision_first', (note_id,))[0][0]
+    if first is None or first >= keep_from:
+        return 0
+    chain = _query(conn, 'revision_chain', (note_id, keep_from, note_id, keep_from))
+    if chain and not chain[-1]['full']:
+        text = _revision_content(conn, note_id, keep_from)
+        row = _query(conn, 'revision_meta', (note_id, keep_from))[0]
+        _execute(conn, 'revision_put', (note_id, keep_from, row[0], 1, row[1],
+                                        zlib.compress((text or '').encode('utf-8'))))
+    return _execute(conn, 'revision_prune', (note_id, keep_from)).rowcount
+
+def prune_revisions(max_age_days: int | None = REVISION_MAX_DAYS) -> int:
+    """Poda revisiones más antiguas que max_age_days (conserva la última de cada nota)."""
+    if max_age_days is None:
+        return 0
+    _wait_schema()
+    cutoff = int(time.time()) - max_age_days * 86400
+    removed = 0
+    try:
+        with transaction() as conn, _cache_neutral(conn):
+            for note_id, newest_old in _query(conn, 'revision_expired', (cutoff,)):
+                last = _query(conn, 'revision_last', (note_id,))[0]['rev']
+                removed += _prune_revisions(conn, note_id, min(newest_old + 1, last))
+    except Exception as e:
+        _log_error('prune_revisions', e)
+    return removed
+
+def note_revisions(title: str, folder: str | None) -> list[dict]:
+    """Revisiones de la nota, la más reciente primero: {rev, created, size, full, stored}."""
+    _wait_schema()
+    return [{'rev': r[0], 'created': r[1], 'size': r[2], 'full': bool(r[3]), 'stored': r[4]}
+            for r in _query(get_conn(), 'revision_list', (title, folder or ''))]
+
+def note_revision_get(title: str, folder: str | None, rev: int) -> str | None:
+    """Contenido de la nota en la revisión `rev` (None si no existe)."""
+    _wait_schema()
+    conn = get_conn()
+    rows = _query(conn, 'note_current', (title, folder or ''))
+    if not rows:
+        return None
+    conn.execute('BEGIN')  # cadena de deltas de una misma instantánea
+    try:
+        return _revision_content(conn, rows[0][0], rev)
+    finally:
+        conn.execute('COMMIT')
+
+def note_revision_restore(title: str, folder: str | None, rev: int) -> bool:
+    """Vuelve a la revisión `rev` (como un guardado nuevo, que también queda en el historial)."""
+    content = note_revision_get(title, folder, rev)
+    return content is not None and note_upsert(title, content, folder)
+
+# --- Eventos recurrentes (v8) ---
+# Una serie es una sola fila con su regla (subconjunto de RRULE: FREQ=DAILY|
+# WEEKLY|MONTHLY|YEARLY, INTERVAL, COUNT, UNTIL y BYDAY solo con WEEKLY). Las
+# ocurrencias no se materializan: event_list_range (y con ella day/week, page
+# y las alertas) las calcula solo para la ventana pedida, saltando
+# aritméticamente hasta su inicio, así que el coste depende de la ventana y no
+# de la longitud de la serie. event_overrides guarda solo las ocurrencias
+# modificadas (completada, título, hora) o canceladas. Una ocurrencia usa la
+# misma clave (title, date, time) que un evento: event_toggle_complete y
+# event_delete sobre ella escriben overrides.
+_FREQS = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+def _upgrade_to_v8(conn: sqlite3.Connection):
+    conn.execute("""CREATE TABLE IF NOT EXISTS event_series (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        dtstart TEXT NOT NULL,
+        time TEXT NOT NULL DEFAULT '',
+        rrule TEXT NOT NULL,
+        start_ts INTEGER NOT NULL,
+        until_ts INTEGER
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_series_start ON event_series(start_ts)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS event_overrides (
+        series_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        cancelled INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        title TEXT,
+        time TEXT,
+        PRIMARY KEY (series_id, date)
+    ) WITHOUT ROWID""")
+    conn.execute("CREATE TRIGGER IF NOT EXISTS event_series_ad AFTER DELETE ON event_series BEGIN "
+                 "DELETE FROM event_overrides WHERE series_id=old.id; END;")
+
+def parse_rrule(rule: str) -> dict:
+    """Valida una RRULE del subconjunto soportado. ValueError si no lo es.
+
+    Retorna {'freq', 'interval', 'count', 'until' (date | None), 'byday' (lista de 0=lunes.. | None)}.
+    """
+    parts: dict[str, str] = {}
+    for item in (rule or '').strip().upper().removeprefix('RRULE:').split(';'):
+        if not item:
+            continue
+        key, sep, value = item.partition('=')
+        if not sep or not value:
+            raise ValueError(f"parte de RRULE inválida: {item}")
+        parts[key.strip()] = value.strip()
+    freq = parts.pop('FREQ', None)
+    if freq not in _FREQS:
+        raise ValueError(f"FREQ no soportada: {freq}")
+    out = {'freq': freq, 'interval': int(parts.pop('INTERVAL', '1')), 'count': None, 'until': None, 'byday': None}
+    if out['interval'] < 1:
+        raise ValueError("INTERVAL debe ser >= 1")
+    if 'COUNT' in parts:
+        out['count'] = int(parts.pop('COUNT'))
+        if out['count'] < 1:
+            raise ValueError("COUNT debe ser >= 1")
+    if 'UNTIL' in parts:
+        out['until'] = datetime.strptime(parts.pop('UNTIL').replace('-', '')[:8], '%Y%m%d').date()
+    if out['count'] is not None and out['until'] is not None:
+        raise ValueError("COUNT y UNTIL son excluyentes")
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError("BYDAY solo se admite con FREQ=WEEKLY")
+        days = parts.pop('BYDAY').split(',')
+        if any(d not in _WEEKDAYS for d in days):
+            raise ValueError(f"BYDAY inválido: {','.join(days)}")
+        out['byday'] = sorted({_WEEKDAYS.index(d) for d in days})
+    if parts:
+        raise ValueError(f"partes de RRULE no soportadas: {', '.join(parts)}")
+    return out
+
+def _add_months(d: _date, months: int) -> _date | None:
+    y, m = divmod(d.month - 1 + months, 12)
+    try:
+        return d.replace(year=d.year + y, month=m + 1)
+    except ValueError:
+        return None  # día inexistente en ese mes (31, 29‑feb): la ocurrencia no existe
+
+def _rrule_dates(rule: dict, start: _date, d0: _date, d1: _date):
+    """Fechas de la serie dentro de [d0, d1], en orden, empezando directamente en d0."""
+    step, count = rule['interval'], rule['count']
+    if rule['until'] is not None:
+        d1 = min(d1, rule['until'])
+    d0 = max(d0, start)
+    if d1 < d0:
+        return
+    if rule['freq'] == 'DAILY':
+        k = -(-(d0 - start).days // step)
+        while count is None or k < count:
+            d = start + timedelta(days=k * step)
+            if d > d1:
+                return
+            yield d
+            k += 1
+    elif rule['freq'] == 'WEEKLY':
+        days = rule['byday'] or [start.weekday()]
+        anchor = start - timedelta(days=start.weekday())
+        skipped = sum(1 for wd in days if wd < start.weekday())  # días de la 1.ª semana antes de dtstart
+        w = (d0 - anchor).days // 7 // step
+        while True:
+            week = anchor + timedelta(weeks=w * step)
+            if week > d1:
+                return
+            for i, wd in enumerate(days):
+                if count is not None and w * len(days) + i - skipped >= count:
+                    return
+                d = week + timedelta(days=wd)
+                if d > d1:
+                    return
+                if d >= d0:
+                    yield d
+            w += 1
+    else:
+        months = step * (12 if rule['freq'] == 'YEARLY' else 1)
+        k = max(0, ((d0.year - start.year) * 12 + d0.month - start.month) // months)
+        # Índice de la ocurrencia k (para COUNT): los meses sin ese día no cuentan
+        idx = k if count is None or start.day <= 28 else sum(
+            _add_months(start, j * months) is not None for j in range(k))
+        while count is None or idx < count:
+            if _add_months(start.replace(day=1), k * months) > d1:
+                return
+            d = _add_months(start, k * months)
+            k += 1
+            if d is None:
+                continue
+            idx += 1
+            if d > d1:
+                return
+            if d >= d0:
+                yield d
+
+_EPOCH = _date(1970, 1, 1)
+
+def _time_offset(hour: str) -> int:
+    """Segundos desde el inicio del día, como event_start_ts (sin hora → 23:59:59)."""
+    try:
+        h, m = map(int, hour.split(':'))
+        if 0 <= h < 24 and 0 <= m < 60:
+            return h * 3600 + m * 60
+    except ValueError:
         pass
-    return result
+    return 86399
+
+def _ts_date(ts: int) -> _date:
+    try:
+        return (datetime(1970, 1, 1) + timedelta(seconds=ts)).date()
+    except OverflowError:
+        return _date.max if ts > 0 else _date.min
+
+def _series_occurrences(conn: sqlite3.Connection, lo: int, hi: int, limit: int | None = None,
+                        series_id: int | None = None) -> list[dict]:
+    """Ocurrencias con start_ts en [lo, hi] (overrides aplicados); hasta `limit` por serie."""
+    out: list[dict] = []
+    d0, d1 = _ts_date(lo), _ts_date(hi)
+    for s in _query(conn, 'series_window', (hi, lo)):
+        if series_id is not None and s['id'] != series_id:
+            continue
+        try:
+            rule = parse_rrule(s['rrule'])
+            start = datetime.strptime(s['dtstart'], '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        overrides: dict | None = None
+        taken = 0
+        offset = _time_offset(s['time'])
+        for d in _rrule_dates(rule, start, d0, d1):
+            day = d.isoformat()
+            if overrides is None:  # una consulta por serie, acotada a la ventana
+                overrides = {r['date']: r for r in _query(conn, 'override_window', (s['id'], day, d1.isoformat()))}
+            ov = overrides.get(day)
+            if ov is not None and ov['cancelled']:
+                continue
+            title = ov['title'] if ov is not None and ov['title'] is not None else s['title']
+            hour = ov['time'] if ov is not None and ov['time'] is not None else s['time']
+            own_time = ov is None or ov['time'] is None
+            ts = (d - _EPOCH).days * 86400 + (offset if own_time else _time_offset(hour))
+            if not lo <= ts <= hi:
+                continue
+            out.append({'id': None, 'title': title, 'date': day, 'time': hour,
+                        'completed': ov['completed'] if ov is not None else 0, 'start_ts': ts, 'series_id': s['id']})
+            taken += 1
+            if limit is not None and taken >= limit:
+                break
+    return out
+
+def _op_occurrences_set(conn: sqlite3.Connection, keys: Iterable[tuple[str, str, str]],
+                        completed: int | None = None, cancel: bool = False) -> list[tuple[str, str, str]]:
+    """Marca/cancela las claves que son ocurrencias de una serie (overrides). Retorna las afectadas."""
+    done: list[tuple[str, str, str]] = []
+    if not _schema_ready.is_set():
+        return done
+    for key in dict.fromkeys(keys):
+        bounds = _day_bounds(key[1])
+        if bounds is None:
+            continue
+        for occ in _series_occurrences(conn, *bounds):
+            if (occ['title'], occ['date'], occ['time']) != key:
+                continue
+            if cancel:
+                _execute(conn, 'override_cancel', (occ['series_id'], occ['date']))
+            else:
+                _execute(conn, 'override_completed', (occ['series_id'], occ['date'], completed))
+                _execute(conn, 'override_prune', (occ['series_id'], occ['date']))
+            done.append(key)
+            break
+    return done
+
+def event_series_create(title: str, dtstart: str, time: str | None, rrule: str) -> int | None:
+    """Crea una serie recurrente desde dtstart (YYYY-MM-DD). Retorna su id o None."""
+    try:
+        rule = parse_rrule(rrule)
+        start = datetime.strptime(dtstart, '%Y-%m-%d').date()
+        last = rule['until']
+        if rule['count'] is not None:  # última ocurrencia: O(COUNT), solo al crear
+            for last in _rrule_dates(rule, start, start, _date.max - timedelta(days=366)):
+                pass
+        until_ts = _day_bounds(last.isoformat())[1] if last is not None else None
+        _wait_schema()
+        with transaction() as conn:
+            cur = _execute(conn, 'series_insert', (title, dtstart, time or '', rrule.strip().upper(),
+                                                   _day_bounds(dtstart)[0], until_ts))
+            _record_change('series', 'insert', [(cur.lastrowid,)])
+            return cur.lastrowid
+    except Exception as e:
+        _log_error('event_series_create', e)
+        return None
+
+def event_series_delete(series_id: int) -> bool:
+    """Borra la serie y sus overrides."""
+    _wait_schema()
+    try:
+        with transaction() as conn:
+            ok = _execute(conn, 'series_delete', (series_id,)).rowcount > 0
+            if ok:
+                _record_change('series', 'delete', [(series_id,)])
+            return ok
+    except Exception as e:
+        _log_error('event_series_delete', e)
+        return False
+
+def event_series_list() -> list[dict]:
+    _wait_schema()
+    return [dict(r) for r in _query(get_conn(), 'series_all')]
+
+def event_occurrence_update(series_id: int, date: str, title: str | None = None, time: str | None = None) -> bool:
+    """Cambia título y/o hora de una ocurrencia (override); None = valor de la serie."""
+    _wait_schema()
+    bounds = _day_bounds(date)
+    if bounds is None:
+        return False
+    try:
+        with transaction() as conn:
+            before = _series_occurrences(conn, *bounds, series_id=series_id)
+            if not before:
+                return False
+            _execute(conn, 'override_fields', (series_id, date, title, time))
+            _execute(conn, 'override_prune', (series_id, date))
+            old = before[0]
+            _record_change('events', 'delete', [(old['title'], date, old['time'])])
+            new = _series_occurrences(conn, *bounds, series_id=series_id)[0]
+            _record_change('events', 'insert', [(new['title'], date, new['time'])], {'completed': new['completed']})
+            return True
+    except Exception as e:
+        _log_error('event_occurrence_update', e)
+        return False
+
+# --- Caché de lectura (LRU) ---
+# note_get y event_list_day/week pasan por una LRU acotada por entradas y por
+# bytes aproximados. transaction() invalida tras cada COMMIT solo las claves
+# de los cambios registrados: la nota (title, folder) o los rangos de agenda
+# que contienen el día del evento. Cada invalidación sube `gen`; una lectura
+# que empezó antes no guarda su resultado (podría ser previo al COMMIT).
+# Una transacción que escribe filas sin registrar cambios (SQL directo,
+# config) vacía ambas cachés. Solo ve las escrituras de este proceso (la app
+# es la única escritora).
+NOTE_CACHE_ITEMS = 256
+NOTE_CACHE_BYTES = 2 * 1024 * 1024
+AGENDA_CACHE_ITEMS = 64
+AGENDA_CACHE_BYTES = 512 * 1024
+_MISS = object()
+
+class _LRUCache:
+    """LRU segura entre hilos con límite de entradas y de bytes."""
+
+    def __init__(self, max_items: int, max_bytes: int) -> None:
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.gen = 0
+        self._data: OrderedDict = OrderedDict()  # key -> (valor, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return _MISS
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size: int, gen: int) -> None:
+        with self._lock:
+            if gen != self.gen or size > self.max_bytes or self.max_items <= 0:
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_items or self._bytes > self.max_bytes:
+                _, (_, freed) = self._data.popitem(last=False)
+                self._bytes -= freed
+                self.evictions += 1
+
+    def discard(self, match) -> None:
+        """Elimina las claves con match(key) verdadero e invalida lecturas en curso."""
+        with self._lock:
+            self.gen += 1
+            for key in [k for k in self._data if match(k)]:
+                self._bytes -= self._data.pop(key)[1]
+                self.invalidations += 1
+
+    def clear(self, reset_stats: bool = False) -> None:
+        with self._lock:
+            self.gen += 1
+            self._data.clear()
+            self._bytes = 0
+            if reset_stats:
+                self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0,
+                    'evictions': self.evictions, 'invalidations': self.invalidations,
+                    'items': len(self._data), 'bytes': self._bytes}
+
+_note_cache = _LRUCache(NOTE_CACHE_ITEMS, NOTE_CACHE_BYTES)
+_agenda_cache = _LRUCache(AGENDA_CACHE_ITEMS, AGENDA_CACHE_BYTES)
+
+def _read_through(cache: _LRUCache, key, load, size):
+    value = cache.get(key)
+    if value is not _MISS:
+        return value
+    gen = cache.gen  # antes de leer: un COMMIT entremedias descarta el resultado
+    value = load()
+    cache.put(key, value, size(value), gen)
+    return value
+
+def _events_size(rows: tuple) -> int:
+    return 64 + sum(96 + len(r['title']) + len(r['date']) + len(r['time'] or '') for r in rows)
+
+def _cache_invalidate(changes: list[Change], wrote: bool = True) -> None:
+    if wrote and not changes:
+        cache_clear()  # filas de notas/eventos escritas sin registrar (SQL directo): sin precisión
+        return
+    for ch in changes:
+        if ch.table == 'notes':
+            keys = set(ch.keys)
+            _note_cache.discard(keys.__contains__)
+        elif ch.table == 'events':
+            days = [_day_bounds(k[1]) for k in ch.keys]
+            if None in days:
+                _agenda_cache.clear()
+                continue
+            _agenda_cache.discard(lambda rng: any(rng[0] <= hi and lo <= rng[1] for lo, hi in days))
+        elif ch.table == 'series':
+            _agenda_cache.clear()  # una serie abarca rangos sin límite
+
+def cache_stats() -> dict[str, dict]:
+    """Aciertos/fallos, expulsiones, invalidaciones, entradas y bytes por caché."""
+    return {'notes': _note_cache.stats(), 'agenda': _agenda_cache.stats()}
+
+def cache_clear(reset_stats: bool = False) -> None:
+    _note_cache.clear(reset_stats)
+    _agenda_cache.clear(reset_stats)
 
 # === API Eventos ===
 
+def _op_event_create(conn: sqlite3.Connection, title: str, date: str, time: str | None) -> bool:
+    cur = _execute(conn, 'event_insert', (title, date, time or '', 0))
+    if cur.rowcount > 0:
+        _record_change('events', 'insert', [(title, date, time or '')], {'completed': 0})
+    return True
+
 def event_create(title: str, date: str, time: str | None) -> bool:
     try:
         with transaction() as conn:
-            time = time or ''
-            conn.execute(
-                "INSERT OR IGNORE INTO events(title,date,time,completed) VALUES (?,?,?,0)",
-                (title, date, time)
-            )
-        return True
+            return _op_event_create(conn, title, date, time)
     except Exception as e:
         _log_error('event_create', e)
         return False
 
-def event_list_day(date: str) -> list[dict]:
+def event_list_range(start_ts: int, end_ts: int, *, pending_only: bool = False,
+                     timed_only: bool = False) -> list[dict]:
+    """Eventos con start_ts en [start_ts, end_ts], ordenados por start_ts y título.
+
+    pending_only excluye completados; timed_only excluye eventos sin hora.
+    """
+    _wait_schema()  # start_ts llega con el upgrade v3
+    name = 'event_range' + ('_pending' if pending_only else '') + ('_timed' if timed_only else '')
     conn = get_conn()
-    cur = conn.execute(
-        "SELECT * FROM events WHERE date=? ORDER BY IFNULL(time,'99:99'), title", (date,)
-    )
-    return [dict(r) for r in cur.fetchall()]
+    rows = [dict(r) for r in _query(conn, name, (start_ts, end_ts))]
+    occ = [o for o in _series_occurrences(conn, start_ts, end_ts)
+           if not (pending_only and o['completed']) and not (timed_only and not o['time'])]
+    if occ:
+        rows = sorted(rows + occ, key=lambda e: (e['start_ts'], e['title']))
+    return rows
+
+def _event_list_cached(start_ts: int, end_ts: int) -> list[dict]:
+    rows = _read_through(_agenda_cache, (start_ts, end_ts),
+                         lambda: tuple(event_list_range(start_ts, end_ts)), _events_size)
+    return [dict(r) for r in rows]  # copia: el llamador puede modificarla
+
+def event_list_day(date: str) -> list[dict]:
+    bounds = _day_bounds(date)
+    if bounds is None:
+        return []
+    return _event_list_cached(*bounds)
 
 def event_list_week(start_date: str, end_date: str) -> list[dict]:
+    lo, hi = _day_bounds(start_date), _day_bounds(end_date)
+    if lo is None or hi is None:
+        return []
+    return _event_list_cached(lo[0], hi[1])
+
+PAGE_SIZE = 200  # filas por página en los listados por cursor
+
+def event_list_page(start_ts: int, end_ts: int, after: tuple[int, str, int] | None = None,
+                    limit: int = PAGE_SIZE) -> dict:
+    """Página de eventos en [start_ts, end_ts] por cursor (keyset, sin OFFSET).
+
+    Retorna {'results': [dict], 'next': (start_ts, title, id) | None}; pasar
+    `next` como `after` para la página siguiente.
+    """
+    _wait_schema()
+    load = lambda: _event_page(start_ts, end_ts, tuple(after or (start_ts, '', 0)), limit)
+    # La primera página pasa por la caché de agenda (navegación del calendario)
+    rows = _read_through(_agenda_cache, (start_ts, end_ts, limit), load, _events_size) if after is None else load()
+    results = [dict(r) for r in rows]
+    last = results[-1] if len(results) == limit else None
+    return {'results': results, 'next': (last['start_ts'], last['title'], last['id'] or 0) if last else None}
+
+def _event_page(start_ts: int, end_ts: int, after: tuple, limit: int) -> tuple:
+    """Página de events mezclada con las ocurrencias posteriores al cursor (id 0)."""
     conn = get_conn()
-    cur = conn.execute(
-        "SELECT * FROM events WHERE date BETWEEN ? AND ? ORDER BY date, IFNULL(time,'99:99'), title",
-        (start_date, end_date)
-    )
-    return [dict(r) for r in cur.fetchall()]
+    rows = [dict(r) for r in _query(conn, 'event_range_page', (start_ts, end_ts, *after, limit))]
+    # +1: la ocurrencia del propio cursor (misma start_ts) se descarta abajo
+    occ = [o for o in _series_occurrences(conn, max(start_ts, after[0]), end_ts, limit + 1)
+           if (o['start_ts'], o['title'], 0) > after]
+    if occ:
+        rows = sorted(rows + occ, key=lambda e: (e['start_ts'], e['title'], e['id'] or 0))[:limit]
+    return tuple(rows)
+
+def _op_event_toggle_complete(conn: sqlite3.Connection, title: str, date: str, time: str | None, completed: bool) -> bool:
+    flag = 1 if completed else 0
+    cur = _execute(conn, 'event_set_completed', (flag, title, date, time or ''))
+    if cur.rowcount > 0 or _op_occurrences_set(conn, [(title, date, time or '')], completed=flag):
+        _record_change('events', 'update', [(title, date, time or '')], {'completed': flag})
+    return True
 
 def event_toggle_complete(title: str, date: str, time: str | None, completed: bool) -> bool:
     try:
         with transaction() as conn:
-            time = time or ''
-            conn.execute(
-                "UPDATE events SET completed=? WHERE title=? AND date=? AND time=?",
-                (1 if completed else 0, title, date, time)
-            )
-        return True
+            return _op_event_toggle_complete(conn, title, date, time, completed)
     except Exception as e:
         _log_error('event_toggle_complete', e)
         return False
 
+def _op_event_delete(conn: sqlite3.Connection, title: str, date: str, time: str | None) -> int:
+    cur = _execute(conn, 'event_delete', (title, date, time or ''))
+    n = cur.rowcount or len(_op_occurrences_set(conn, [(title, date, time or '')], cancel=True))
+    if n > 0:
+        _record_change('events', 'delete', [(title, date, time or '')])
+    return n
+
 def event_delete(title: str, date: str, time: str | None) -> int:
     try:
         with transaction() as conn:
-            time = time or ''
-            cur = conn.execute(
-                "DELETE FROM events WHERE title=? AND date=? AND time=?",
-                (title, date, time)
-            )
-            return cur.rowcount
+            return _op_event_delete(conn, title, date, time)
     except Exception as e:
         _log_error('event_delete', e)
         return 0
 
+# --- Operaciones masivas (executemany en una sola transacción) ---
+# Cada función devuelve un resultado por fila de entrada, en el mismo orden.
+
+_IN_CHUNK = 500  # máximo de parámetros por cláusula IN
+
+def _event_key(row: Sequence) -> tuple[str, str, str] | None:
+    try:
+        title, date = row[0], row[1]
+        time = row[2] if len(row) > 2 else ''
+    except Exception:
+        return None
+    if not title or not date:
+        return None
+    return (str(title), str(date), str(time or ''))
+
+def _existing_event_keys(conn: sqlite3.Connection, keys: Iterable[tuple[str, str, str]]) -> set[tuple[str, str, str]]:
+    # Filtra por título (prefijo del índice UNIQUE(title,date,time))
+    titles = list({k[0] for k in keys})
+    found: set[tuple[str, str, str]] = set()
+    for i in range(0, len(titles), _IN_CHUNK):
+        chunk = titles[i:i + _IN_CHUNK]
+        rows = _query(conn, 'event_keys_in', chunk,
+                      sql=f"SELECT title, date, time FROM events WHERE title IN ({','.join('?' * len(chunk))})")
+        found.update((r[0], r[1], r[2]) for r in rows)
+    return found
+
+def _op_event_create_many(conn: sqlite3.Connection, rows: Iterable[Sequence]) -> list[bool]:
+    """rows: (title, date, time[, completed]). True si la fila se insertó."""
+    parsed = []
+    for row in rows:
+        key = _event_key(row)
+        completed = 1 if key and len(row) > 3 and row[3] else 0
+        parsed.append((key, completed))
+    existing = _existing_event_keys(conn, [k for k, _ in parsed if k])
+    outcomes: list[bool] = []
+    params = []
+    for key, completed in parsed:
+        if key is None or key in existing:
+            outcomes.append(False)
+            continue
+        existing.add(key)
+        params.append((*key, completed))
+        outcomes.append(True)
+    _execute(conn, 'event_insert', params, many=True)
+    for flag in (0, 1):
+        _record_change('events', 'insert', [p[:3] for p in params if p[3] == flag], {'completed': flag})
+    return outcomes
+
+def _op_event_delete_many(conn: sqlite3.Connection, keys: Iterable[Sequence]) -> list[int]:
+    """keys: (title, date, time). Filas borradas por clave (0 o 1)."""
+    parsed = [_event_key(k) for k in keys]
+    existing = _existing_event_keys(conn, [k for k in parsed if k])
+    outcomes: list[int] = []
+    for key in parsed:
+        if key is not None and key in existing:
+            existing.discard(key)
+            outcomes.append(1)
+        else:
+            outcomes.append(0)
+    deleted = [k for k, n in zip(parsed, outcomes) if n]
+    _execute(conn, 'event_delete', deleted, many=True)
+    # Claves que no son filas: ocurrencias de series (se cancelan con un override)
+    cancelled = set(_op_occurrences_set(conn, [k for k, n in zip(parsed, outcomes) if k and not n], cancel=True))
+    for i, key in enumerate(parsed):
+        if key in cancelled:
+            cancelled.discard(key)
+            outcomes[i] = 1
+            deleted.append(key)
+    _record_change('events', 'delete', deleted)
+    return outcomes
+
+def _op_event_set_completed_many(conn: sqlite3.Connection, keys: Iterable[Sequence], completed: bool) -> list[bool]:
+    """keys: (title, date, time). True si el evento existía."""
+    parsed = [_event_key(k) for k in keys]
+    existing = _existing_event_keys(conn, [k for k in parsed if k])
+    outcomes = [key is not None and key in existing for key in parsed]
+    flag = 1 if completed else 0
+    updated = [k for k, ok in zip(parsed, outcomes) if ok]
+    _execute(conn, 'event_set_completed', [(flag, *k) for k in updated], many=True)
+    marked = set(_op_occurrences_set(conn, [k for k, ok in zip(parsed, outcomes) if k and not ok], completed=flag))
+    for i, key in enumerate(parsed):
+        if key in marked:
+            outcomes[i] = True
+            if key not in updated:
+                updated.append(key)
+    _record_change('events', 'update', updated, {'completed': flag})
+    return outcomes
+
+def event_create_many(rows: Iterable[Sequence]) -> list[bool]:
+    rows = list(rows)
+    try:
+        with transaction() as conn:
+            return _op_event_create_many(conn, rows)
+    except Exception as e:
+        _log_error('event_create_many', e)
+        return [False] * len(rows)
+
+def event_delete_many(keys: Iterable[Sequence]) -> list[int]:
+    keys = list(keys)
+    try:
+        with transaction() as conn:
+            return _op_event_delete_many(conn, keys)
+    except Exception as e:
+        _log_error('event_delete_many', e)
+        return [0] * len(keys)
+
+def event_set_completed_many(keys: Iterable[Sequence], completed: bool) -> list[bool]:
+    keys = list(keys)
+    try:
+        with transaction() as conn:
+            return _op_event_set_completed_many(conn, keys, completed)
+    except Exception as e:
+        _log_error('event_set_completed_many', e)
+        return [False] * len(keys)
+
 # === API Notas ===
 
+def _op_note_upsert(conn: sqlite3.Connection, title: str, content: str, folder: str | None) -> bool:
+    folder = folder or ''
+    current = _query(conn, 'note_current', (title, folder))
+    if current and current[0]['content'] == content:
+        return True  # sin cambios: no reescribir notes/FTS ni crear revisión
+    _execute(conn, 'note_upsert', (title, content, folder, None))
+    if _schema_ready.is_set():
+        try:
+            if current:
+                _record_revision(conn, current[0]['id'], current[0]['content'], content, current[0]['updated_at'])
+            else:
+                _record_revision(conn, _query(conn, 'note_current', (title, folder))[0]['id'], None, content)
+        except sqlite3.Error as e:
+            _log_error('note_revision', e)
+    _record_change('notes', 'update' if current else 'insert', [(title, folder)])
+    return True
+
 def note_upsert(title: str, content: str, folder: str | None) -> bool:
     try:
         with transaction() as conn:
-            folder = folder or ''
-            conn.execute(
-                "INSERT INTO notes(title, content, folder) VALUES (?,?,?) ON CONFLICT(title, folder) "
-                "DO UPDATE SET content=excluded.content, updated_at=CURRENT_TIMESTAMP",
-                (title, content, folder)
-            )
-        return True
+            return _op_note_upsert(conn, title, content, folder)
     except Exception as e:
         _log_error('note_upsert', e)
         return False
 
+def _note_get_db(title: str, folder: str) -> str | None:
+    rows = _query(get_conn(), 'note_get', (title, folder))
+    return rows[0][0] if rows else None
+
 def note_get(title: str, folder: str | None) -> str | None:
-    conn = get_conn()
-    folder = folder or ''
-    cur = conn.execute(
-        "SELECT content FROM notes WHERE title=? AND folder=?",
-        (title, folder)
-    )
-    row = cur.fetchone()
-    return row[0] if row else None
+    """Contenido de la nota o None (también se cachea la ausencia)."""
+    key = (title, folder or '')
+    return _read_through(_note_cache, key, lambda: _note_get_db(*key),
+                         lambda v: 64 + len(title) + len(v or ''))
+
+def _op_note_delete(conn: sqlite3.Connection, title: str, folder: str | None) -> bool:
+    cur = _execute(conn, 'note_delete', (title, folder or ''))
+    if cur.rowcount > 0:
+        _record_change('notes', 'delete', [(title, folder or '')])
+    return cur.rowcount > 0
 
 def note_delete(title: str, folder: str | None) -> bool:
-    folder = folder or ''
     with transaction() as conn:
-        cur = conn.execute(
-            "DELETE FROM notes WHERE title=? AND folder=?",
-            (title, folder)
-        )
-        return cur.rowcount > 0
+        return _op_note_delete(conn, title, folder)
 
 def note_search(term: str, folder: str | None = None) -> list[tuple[str, str | None]]:
+    """Notas cuyo título o contenido contiene `term` (sin distinguir mayúsculas).
+
+    Usa el índice de subcadenas si existe; el recorrido con LIKE queda para
+    términos de menos de 3 caracteres o si el índice falla.
+    """
+    _wait_schema()
     conn = get_conn()
+    try:
+        res = _note_search_indexed(conn, term, folder)
+        if res is not None:
+            return res
+    except sqlite3.Error as e:
+        _log_error('note_search_indexed', e)
     like = f"%{term.lower()}%"
     if folder is not None:
-        folder = folder or ''
-        cur = conn.execute(
-            "SELECT title, folder FROM notes WHERE (LOWER(content) LIKE ? OR LOWER(title) LIKE ?) AND folder=?",
-            (like, like, folder)
-        )
+        rows = _query(conn, 'note_search_like_folder', (like, like, folder or ''))
     else:
-        cur = conn.execute(
-            "SELECT title, folder FROM notes WHERE LOWER(content) LIKE ? OR LOWER(title) LIKE ?",
-            (like, like)
-        )
-    return [(r[0], r[1]) for r in cur.fetchall()]
+        rows = _query(conn, 'note_search_like', (like, like))
+    return [(r[0], r[1]) for r in rows]
 
-def note_list_folders() -> list[str]:
+def note_search_page(term: str, folder: str | None = None, after: tuple[str, int] | None = None,
+                     limit: int = PAGE_SIZE, exclude_ranked: bool = False) -> dict:
+    """Página de note_search por (title, id): {'results': [(title, folder)], 'next': (title, id) | None}.
+
+    exclude_ranked=True omite las notas que devuelve note_search_ranked con el
+    mismo término: es la continuación de esa búsqueda una vez agotada.
+    """
+    _wait_schema()
     conn = get_conn()
-    cur = conn.execute("SELECT DISTINCT folder FROM notes WHERE folder<>'' ORDER BY folder")
-    return [r[0] for r in cur.fetchall()]
+    cond, params, _mode = _substring_filter(conn, term)
+    if exclude_ranked:
+        if not _has_fts(conn):
+            return {'results': [], 'next': None}  # note_search_ranked ya recorrió la subcadena
+        match = fts_query(term)
+        if match is not None:
+            cond += " AND n.id NOT IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)"
+            params.append(match)
+    if folder is not None:
+        cond += " AND n.folder=?"
+        params.append(folder or '')
+    q = f"SELECT n.title, n.folder, n.id FROM notes n WHERE {cond} AND (n.title, n.id) > (?, ?) ORDER BY n.title, n.id LIMIT ?"
+    rows = _query(conn, 'note_search_page', [*params, *(after or ('', 0)), limit], sql=q)
+    return {'results': [(r[0], r[1]) for r in rows],
+            'next': (rows[-1][0], rows[-1][2]) if len(rows) == limit else None}
+
+def note_list_folders() -> list[str]:
+    return [r[0] for r in _folder_rows('folder_names', 'note_folders')]
+
+def note_folder_exists(folder: str) -> bool:
+    """True si la carpeta existe (aunque esté vacía)."""
+    return bool(_folder_rows('folder_exists', 'note_folder_exists', (folder or '',)))
 
 def note_list_titles(folder: str | None) -> list[str]:
-    conn = get_conn()
-    if folder is None:
-        cur = conn.execute("SELECT title FROM notes WHERE folder='' ORDER BY title")
-    else:
-        folder = folder or ''
-        cur = conn.execute("SELECT title FROM notes WHERE folder=? ORDER BY title", (folder,))
-    return [r[0] for r in cur.fetchall()]
+    return [r[0] for r in _query(get_conn(), 'note_titles', (folder or '',))]
+
+def note_list_titles_page(folder: str | None, after: tuple[str, int] | None = None,
+                          limit: int = PAGE_SIZE) -> dict:
+    """Página de títulos de la carpeta: {'results': [title], 'next': (title, id) | None}."""
+    rows = _query(get_conn(), 'note_titles_page', (folder or '', *(after or ('', 0)), limit))
+    return {'results': [r[0] for r in rows], 'next': tuple(rows[-1]) if len(rows) == limit else None}
+
+def note_list_folders_page(after: str | None = None, limit: int = PAGE_SIZE) -> dict:
+    """Página de carpetas: {'results': [folder], 'next': folder | None}."""
+    rows = _folder_rows('folder_names_page', 'note_folders_page', (after or '', limit))
+    return {'results': [r[0] for r in rows], 'next': rows[-1][0] if len(rows) == limit else None}
+
+# --- Operaciones masivas de notas ---
+
+def _note_key(row: Sequence) -> tuple[str, str] | None:
+    try:
+        title = row[0]
+        folder = row[1] if len(row) > 1 else ''
+    except Exception:
+        return None
+    if not title:
+        return None
+    return (str(title), str(folder or ''))
+
+def _existing_note_keys(conn: sqlite3.Connection, keys: Iterable[tuple[str, str]]) -> set[tuple[str, str]]:
+    titles = list({k[0] for k in keys})
+    found: set[tuple[str, str]] = set()
+    for i in range(0, len(titles), _IN_CHUNK):
+        chunk = titles[i:i + _IN_CHUNK]
+        rows = _query(conn, 'note_keys_in', chunk,
+                      sql=f"SELECT title, folder FROM notes WHERE title IN ({','.join('?' * len(chunk))})")
+        found.update((r[0], r[1]) for r in rows)
+    return found
+
+def _op_note_upsert_many(conn: sqlite3.Connection, rows: Iterable[Sequence]) -> list[bool]:
+    """rows: (title, content, folder[, updated_at]). True si la fila se escribió."""
+    outcomes: list[bool] = []
+    params = []
+    for row in rows:
+        try:
+            title, content = row[0], row[1]
+            folder = row[2] if len(row) > 2 else ''
+            updated_at = row[3] if len(row) > 3 else None
+        except Exception:
+            outcomes.append(False)
+            continue
+        if not title or not isinstance(content, str):
+            outcomes.append(False)
+            continue
+        params.append((str(title), content, str(folder or ''), updated_at or None))
+        outcomes.append(True)
+    keys = [(p[0], p[2]) for p in params]
+    existing = _existing_note_keys(conn, keys) if keys else set()
+    _execute(conn, 'note_upsert', params, many=True)
+    _record_change('notes', 'insert', dict.fromkeys(k for k in keys if k not in existing))
+    _record_change('notes', 'update', dict.fromkeys(k for k in keys if k in existing))
+    return outcomes
+
+def _op_note_delete_many(conn: sqlite3.Connection, keys: Iterable[Sequence]) -> list[bool]:
+    """keys: (title, folder). True si la nota existía."""
+    parsed = [_note_key(k) for k in keys]
+    existing = _existing_note_keys(conn, [k for k in parsed if k])
+    outcomes: list[bool] = []
+    for key in parsed:
+        ok = key is not None and key in existing
+        if ok:
+            existing.discard(key)
+        outcomes.append(ok)
+    deleted = [k for k, ok in zip(parsed, outcomes) if ok]
+    _execute(conn, 'note_delete', deleted, many=True)
+    _record_change('notes', 'delete', deleted)
+    return outcomes
+
+def note_upsert_many(rows: Iterable[Sequence]) -> list[bool]:
+    rows = list(rows)
+    try:
+        with transaction() as conn:
+            return _op_note_upsert_many(conn, rows)
+    except Exception as e:
+        _log_error('note_upsert_many', e)
+        return [False] * len(rows)
+
+def note_delete_many(keys: Iterable[Sequence]) -> list[bool]:
+    keys = list(keys)
+    try:
+        with transaction() as conn:
+            return _op_note_delete_many(conn, keys)
+    except Exception as e:
+        _log_error('note_delete_many', e)
+        return [False] * len(keys)
+
+# === Cola de escritura agrupada (write-behind) ===
+
+class WriteQueue:
+    """Agrupa mutaciones pendientes en una sola transacción.
+
+    Cada operación se encola con `submit(op, *args)` y devuelve un
+    `concurrent.futures.Future` con el mismo resultado que la API síncrona
+    (usar `add_done_callback` si se prefiere callback; se invoca en el hilo
+    de la cola). El lote se confirma cada `flush_interval_ms` o al llegar a
+    `max_batch` operaciones. Cada operación corre en su propio SAVEPOINT, de
+    modo que un fallo no invalida el resto del lote.
+    """
+
+    def __init__(self, flush_interval_ms: int = 50, max_batch: int = 200) -> None:
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: list[tuple] = []
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def submit(self, op, *args) -> Future:
+        fut: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('WriteQueue cerrada')
+            self._pending.append((op, args, fut))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-write-queue', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return fut
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Fuerza el envío de lo pendiente y espera. True si todo terminó."""
+        with self._cond:
+            futs = [p[2] for p in self._pending]
+            self._flush_requested = True
+            self._cond.notify_all()
+        if not futs:
+            return True
+        done, not_done = futures_wait(futs, timeout=timeout)
+        return not not_done
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Vacía la cola y detiene el hilo de escritura.
+
+        Si el hilo no termina en `timeout`, las operaciones que siguen en cola
+        no se ejecutan: sus Futures fallan con RuntimeError.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            th = self._thread
+        if th is None or th is threading.current_thread():
+            return
+        th.join(timeout)
+        with self._cond:
+            left, self._pending = self._pending, []
+        for _, _, fut in left:
+            if not fut.done():
+                fut.set_exception(RuntimeError('WriteQueue cerrada'))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._pending) < self.max_batch and not self._closed
+                       and not self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not self._pending:
+                    self._flush_requested = False
+            self._execute(batch)
+
+    def _execute(self, batch: list[tuple]) -> None:
+        outcomes = []
+        try:
+            with transaction() as conn:
+                for op, args, fut in batch:
+                    if not fut.set_running_or_notify_cancel():
+                        continue
+                    conn.execute('SAVEPOINT wq_op')
+                    mark = len(_local.changes)
+                    try:
+                        res = op(conn, *args)
+                    except Exception as e:
+                        del _local.changes[mark:]
+                        conn.execute('ROLLBACK TO wq_op')
+                        conn.execute('RELEASE wq_op')
+                        _log_error('write_queue_op', e)
+                        outcomes.append((fut, None, e))
+                        continue
+                    conn.execute('RELEASE wq_op')
+                    outcomes.append((fut, res, None))
+        except Exception as e:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for fut, res, exc in outcomes:
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(res)
+
+_write_queue: WriteQueue | None = None
+
+def write_queue() -> WriteQueue:
+    """Cola write-behind del proceso (se crea bajo demanda)."""
+    global _write_queue
+    with _lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue()
+        return _write_queue
+
+def _close_write_queue() -> None:
+    global _write_queue
+    with _lock:
+        wq, _write_queue = _write_queue, None
+    if wq is not None:
+        wq.close()
+
+atexit.register(_close_write_queue)
+
+def event_create_async(title: str, date: str, time: str | None) -> Future:
+    return write_queue().submit(_op_event_create, title, date, time)
+
+def event_toggle_complete_async(title: str, date: str, time: str | None, completed: bool) -> Future:
+    return write_queue().submit(_op_event_toggle_complete, title, date, time, completed)
+
+def event_delete_async(title: str, date: str, time: str | None) -> Future:
+    return write_queue().submit(_op_event_delete, title, date, time)
+
+def note_upsert_async(title: str, content: str, folder: str | None) -> Future:
+    return write_queue().submit(_op_note_upsert, title, content, folder)
+
+def note_delete_async(title: str, folder: str | None) -> Future:
+    return write_queue().submit(_op_note_delete, title, folder)
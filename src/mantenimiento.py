@@ -0,0 +1,65 @@
+"""Mantenimiento automático de la base en un hilo de fondo.
+
+Cada `intervalo` segundos comprueba los umbrales de `db.maintenance_status`
+(tamaño del WAL, segmentos FTS, filas cambiadas, páginas libres) y, si la
+base lleva `inactividad` segundos sin escrituras, ejecuta `db.run_maintenance`.
+La clase no depende de Qt: la GUI recibe el informe por callback.
+"""
+from __future__ import annotations
+import threading
+try:
+    from . import db  # type: ignore
+except ImportError:
+    import db  # type: ignore
+
+INTERVALO = 5 * 60    # segundos entre comprobaciones
+INACTIVIDAD = 30      # segundos sin escrituras para considerar la app ociosa
+
+
+class ProgramadorMantenimiento:
+    """Hilo que ejecuta el mantenimiento cuando hace falta y la base está ociosa.
+
+    al_terminar(informe) se llama desde el hilo de fondo tras cada ejecución.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO, inactividad: float = INACTIVIDAD,
+                 al_terminar=None) -> None:
+        self.intervalo = intervalo
+        self.inactividad = inactividad
+        self.al_terminar = al_terminar
+        self.ultimo_informe: dict | None = None
+        self._parar = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._run, name='db-mantenimiento', daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float | None = 5.0) -> None:
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def revisar(self, force: bool = False) -> dict | None:
+        """Ejecuta el mantenimiento si toca (o siempre con force). Retorna el informe o None."""
+        try:
+            if not force and (db.idle_seconds() < self.inactividad or not db.maintenance_due()):
+                return None
+            informe = db.run_maintenance(force=force)
+        except Exception as e:
+            db._log_error('mantenimiento', e)
+            return None
+        self.ultimo_informe = informe
+        if self.al_terminar:
+            try:
+                self.al_terminar(informe)
+            except Exception:
+                pass
+        return informe
+
+    def _run(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.revisar()
@@ -2,7 +2,9 @@
 
 No requiere dependencias pesadas obligatorias. Intenta usar spaCy si está
 instalado (para lematización y normalización); si no, recurre a heurísticas
-simples con regex y similitud difusa.
+simples con regex y similitud difusa. dateparser y spaCy no se importan al
+cargar el módulo: warmup() los carga en segundo plano (la app lo llama al
+mostrar la ventana) y si no, se cargan al primer uso.
 
 API principal:
     analyze(texto: str) -> dict
@@ -11,40 +13,123 @@ API principal:
            params: dict
            confidence: float (0-1)
            tokens: list[str] (debug)
+    rank_intents(texto: str, k: int = 3) -> list[tuple[str, float]]
+        Las k frases de INTENT_PATTERNS más parecidas (intención, confianza).
+    parse_when(frase: str, now=None) -> (datetime, caduca) | None
+        Fechas/horas relativas frecuentes en español sin dateparser.
 
 Intenciones soportadas (intent):
     greet, help, time, create_event, delete_event, query_events_day, query_events_week,
     open_app, create_note, delete_note, search_note, cleanup_legacy, reminder_create,
     exit_app, change_theme, change_voice
 
-Se diseñó para ampliarse fácilmente agregando patrones a INTENT_PATTERNS.
+Se diseñó para ampliarse agregando patrones a COMMAND_PATTERNS (comandos con
+parámetros) o INTENT_PATTERNS (frases). Al importar se compilan en un único
+motor: un regex de alternancia con grupos con nombre, probado solo donde un
+trie de palabras clave encontró el comienzo de un comando, y un diccionario de
+frases exactas. Tras modificar las listas, llamar a compile_patterns().
 """
 from __future__ import annotations
-import re, difflib, datetime as _dt
-try:
-    import dateparser  # type: ignore
-except Exception:  # pragma: no cover
-    dateparser = None  # fallback
+import re, math, threading, time, datetime as _dt
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Optional, Dict, Any, List, Tuple
 
-_nlp = None  # spaCy pipeline (lazy)
+_T_IMPORT = time.perf_counter()
+
+# Dependencias pesadas: se cargan al primer uso o con warmup() en segundo plano.
+# None = sin cargar; False = no instalada.
+_nlp = None         # spaCy pipeline
+_dateparser = None  # módulo dateparser
+_spacy_lock = threading.Lock()
+_dateparser_lock = threading.Lock()
+_load_times: Dict[str, float] = {}  # segundos por etapa de carga
 
 def _load_spacy():
     global _nlp
     if _nlp is not None:
         return _nlp
+    with _spacy_lock:
+        if _nlp is not None:
+            return _nlp
+        t0 = time.perf_counter()
+        pipeline = False  # Marcador de que no hay spaCy
+        try:
+            import spacy  # type: ignore
+            # Intentar modelo español, fallback a modelo pequeño inglés para normalizar
+            for model in ("es_core_news_sm", "en_core_web_sm"):
+                try:
+                    pipeline = spacy.load(model)  # type: ignore
+                    break
+                except Exception:
+                    continue
+        except Exception:
+            pass
+        _load_times['spacy'] = time.perf_counter() - t0
+        _nlp = pipeline
+    return _nlp
+
+def _load_dateparser():
+    global _dateparser
+    if _dateparser is not None:
+        return _dateparser
+    with _dateparser_lock:
+        if _dateparser is not None:
+            return _dateparser
+        t0 = time.perf_counter()
+        try:
+            import dateparser  # type: ignore
+            module = dateparser
+        except Exception:
+            module = False
+        _load_times['dateparser'] = time.perf_counter() - t0
+        _dateparser = module
+    return _dateparser
+
+_warm_future: Optional[Future] = None
+_warm_lock = threading.Lock()
+
+def warmup(spacy: bool = False) -> Future:
+    """Carga dateparser (y spaCy si spacy=True) en un hilo de fondo. Idempotente.
+
+    El Future resuelve con load_times(). analyze no usa spaCy: solo se precarga
+    si se pide, para no gastar memoria en un modelo sin uso.
+    """
+    global _warm_future
+    with _warm_lock:
+        if _warm_future is None:
+            _warm_future = Future()
+            threading.Thread(target=_warm, args=(_warm_future, spacy), name='nlp-warmup', daemon=True).start()
+        return _warm_future
+
+def _warm(future: Future, spacy: bool) -> None:
     try:
-        import spacy  # type: ignore
-        # Intentar modelo español, fallback a modelo pequeño inglés para normalizar
-        for model in ("es_core_news_sm", "en_core_web_sm"):
-            try:
-                _nlp = spacy.load(model)  # type: ignore
-                break
-            except Exception:
-                continue
+        if _load_dateparser():
+            # El primer parse carga los datos de idioma: pagarlo aquí y no en el primer comando
+            t0 = time.perf_counter()
+            _parse_natural_datetime("mañana a las 5")
+            _load_times['dateparser_first_parse'] = time.perf_counter() - t0
+        if spacy:
+            _load_spacy()
+        future.set_result(load_times())
+    except Exception as e:  # pragma: no cover
+        future.set_exception(e)
+
+def is_ready() -> bool:
+    """True si el precalentamiento terminó (el primer comando no pagará importaciones)."""
+    return _warm_future is not None and _warm_future.done()
+
+def wait_ready(timeout: float | None = None) -> bool:
+    """Lanza warmup() si hace falta y espera a que termine."""
+    try:
+        warmup().result(timeout)
+        return True
     except Exception:
-        _nlp = False  # Marcador de que no hay spaCy
-    return _nlp
+        return False
+
+def load_times() -> Dict[str, float]:
+    """Segundos medidos: import del módulo (compilar patrones), dateparser, primer parse, spaCy."""
+    return dict(_load_times)
 
 NORMALIZE_MAP = {
     'á':'a','é':'e','í':'i','ó':'o','ú':'u','ü':'u','ñ':'n'
@@ -75,39 +160,339 @@ THEMES = ["claro","oscuro"]
 VOICE_SPEEDS = ["lento","normal","rapido"]
 VOICE_GENDERS = ["masculina","femenina"]
 
-def _ratio(a: str, b: str) -> float:
-    return difflib.SequenceMatcher(None, a, b).ratio()
+# Comandos con parámetros: (intent, palabras clave, regex, confianza).
+# Las palabras clave son las palabras con que puede empezar el comando: el regex
+# solo se prueba donde aparece alguna. Un intent por entrada; a igual
+# posición gana el primero de la lista.
+COMMAND_PATTERNS: List[Tuple[str, Tuple[str, ...], str, float]] = [
+    ("create_event", ("crear evento",),
+     r"crear evento (?P<title>.+?) (?:el|para) (?P<date>\d{4}-\d{2}-\d{2})(?:.*?(?:a las )?(?P<time>\d{1,2}:\d{2}))?", 0.95),
+    ("delete_event", ("eliminar evento",),
+     r"eliminar evento (?P<title>.+?) (?:el|de) (?P<date>\d{4}-\d{2}-\d{2})(?:.*?(?:a las )?(?P<time>\d{1,2}:\d{2}))?", 0.95),
+    ("create_note", ("crear nota",), r"crear nota (?P<title>.+?)(?: en (?P<folder>.+))?$", 0.9),
+    ("delete_note", ("eliminar nota",), r"eliminar nota (?P<title>.+?)(?: en (?P<folder>.+))?$", 0.9),
+    ("search_note", ("buscar nota",), r"buscar nota (?P<term>.+?)(?: en (?P<folder>.+))?$", 0.9),
+    ("reminder_create", ("crear", "pon", "establece", "establec"),
+     r"(?:crear|pon|establece?) (?:un )?(?:recordatorio|alarma) (?P<title>.+?) (?:para|el|en) (?P<when>.+)$", 0.9),
+    ("change_theme", ("cambia", "poner", "pon"), r"(?:cambia|poner|pon) tema (?P<theme>\w+)", 0.9),
+    ("change_voice", ("cambia", "poner", "pon"), r"(?:cambia|poner|pon) voz (?P<voice>.+)$", 0.7),
+]
 
-def _best_pattern(norm: str) -> tuple[Optional[str], float]:
-    best = (None, 0.0)
+_WORD_REGEX = re.compile(r"\w+")
+
+def _build_trie(entries) -> Dict[str, Any]:
+    """Trie por palabras: cada clave (una o más palabras) termina en un nodo con su valor en None."""
+    trie: Dict[str, Any] = {}
+    for key, value in entries:
+        node = trie
+        for word in key.split():
+            node = node.setdefault(word, {})
+        node.setdefault(None, value)
+    return trie
+
+def _trie_find(trie: Dict[str, Any], words: List[str]):
+    """Genera (índice de palabra, valor) para cada clave del trie presente en words, de izquierda a derecha."""
+    n = len(words)
+    for i, word in enumerate(words):
+        node = trie.get(word)
+        j = i + 1
+        while node is not None:
+            if None in node:
+                yield i, node[None]
+                break
+            if j >= n:
+                break
+            node = node.get(words[j])
+            j += 1
+
+_COMMAND_REGEX: re.Pattern = re.compile('(?!)')  # no coincide con nada hasta compile_patterns()
+_COMMAND_TRIE: Dict[str, Any] = {}
+_COMMAND_GROUPS: Dict[str, Tuple[List[Tuple[str, str]], float]] = {}
+_PHRASES: Dict[str, str] = {}
+_APP_TRIE: Dict[str, Any] = {}
+
+def compile_patterns() -> None:
+    """Compila COMMAND_PATTERNS, INTENT_PATTERNS y APP_KEYWORDS en un solo motor.
+
+    Se ejecuta al importar; volver a llamarla tras modificar esas listas.
+    """
+    global _COMMAND_REGEX, _COMMAND_TRIE, _COMMAND_GROUPS, _PHRASES, _APP_TRIE
+    alts: List[str] = []
+    groups: Dict[str, Tuple[List[Tuple[str, str]], float]] = {}
+    keywords: set = set()
+    for intent, kws, pattern, confidence in COMMAND_PATTERNS:
+        # Grupos internos con prefijo del intent: los nombres no pueden repetirse en la alternancia
+        inner = re.sub(r"\(\?P<(\w+)>", lambda m: f"(?P<{intent}__{m.group(1)}>", pattern)
+        alts.append(f"(?P<{intent}>{inner})")
+        names = list(re.compile(pattern).groupindex)
+        groups[intent] = ([(f"{intent}__{n}", n) for n in names], confidence)
+        keywords.update(k.lower() for k in kws)
+    _COMMAND_REGEX = re.compile('|'.join(alts) or '(?!)', re.IGNORECASE)
+    _COMMAND_TRIE = _build_trie((k, k) for k in keywords)
+    _COMMAND_GROUPS = groups
+    _PHRASES = {}
     for intent, pats in INTENT_PATTERNS:
         for p in pats:
-            r = _ratio(norm, p)
-            if r > best[1]:
-                best = (intent, r)
+            _PHRASES.setdefault(_basic_normalize(p), intent)
+    _APP_TRIE = _build_trie((_basic_normalize(k), k) for k in APP_KEYWORDS)
+    _build_fuzzy_index()
+    _cache.clear()
+
+def _match_command(text: str) -> Optional[re.Match]:
+    """Primer comando (el más a la izquierda) que encaja en el texto, o None.
+
+    El coste no depende del número de patrones: el trie señala las palabras
+    donde empieza un comando y el regex solo se prueba ahí.
+    """
+    spans = list(_WORD_REGEX.finditer(text))
+    words = [w.group().lower() for w in spans]
+    for i, _kw in _trie_find(_COMMAND_TRIE, words):
+        m = _COMMAND_REGEX.match(text, spans[i].start())
+        if m:
+            return m
+    return None
+
+# --- Puntuación difusa de frases (INTENT_PATTERNS) ---
+# Un índice invertido de trigramas reduce las frases candidatas a las que
+# comparten más trigramas con el texto. Solo esas se comparan, con la razón de
+# subsecuencia común más larga (LCS bit-parallel), contra el texto entero y
+# contra ventanas de palabras completas: nunca contra trozos de palabra.
+NGRAM = 3
+FUZZY_SHORTLIST = 8      # candidatas que pasan a la puntuación exacta
+FUZZY_THRESHOLD = 0.75   # confianza mínima para aceptar la mejor
+FUZZY_FLOOR = 0.45       # peso de una ventana que cubre muy poco del texto
+FUZZY_EDGE_PENALTY = 0.9  # factor si la ventana no empieza por la letra de la frase
+
+_FUZZY_PHRASES: List[Tuple[str, str, Dict[str, int], int, int]] = []  # (frase, intent, máscaras, n trigramas, n palabras)
+_GRAM_INDEX: Dict[str, List[int]] = {}
+
+def _ngrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+def _build_fuzzy_index() -> None:
+    global _FUZZY_PHRASES, _GRAM_INDEX
+    phrases: List[Tuple[str, str, Dict[str, int], int, int]] = []
+    index: Dict[str, List[int]] = {}
+    for phrase, intent in _PHRASES.items():
+        masks: Dict[str, int] = {}
+        for i, ch in enumerate(phrase):
+            masks[ch] = masks.get(ch, 0) | (1 << i)
+        grams = _ngrams(phrase)
+        for g in grams:
+            index.setdefault(g, []).append(len(phrases))
+        phrases.append((phrase, intent, masks, len(grams), len(phrase.split())))
+    _FUZZY_PHRASES, _GRAM_INDEX = phrases, index
+
+def _lcs_length(masks: Dict[str, int], m: int, text: str) -> int:
+    """Largo de la subsecuencia común más larga entre la frase (máscaras, m) y text.
+
+    Algoritmo bit-paralelo de Allison-Dix/Hyyrö: O(len(text)) operaciones sobre enteros.
+    """
+    full = (1 << m) - 1
+    v = full
+    for ch in text:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    return m - bin(v).count('1')
+
+def _phrase_score(phrase: str, masks: Dict[str, int], n_words: int, norm: str, tokens: List[str]) -> float:
+    """Mejor confianza de la frase contra el texto entero o una ventana de palabras.
+
+    razón = 2 * LCS / (largo frase + largo ventana), como SequenceMatcher.ratio;
+    contra el texto entero es la confianza. Una ventana se pondera con
+    FUZZY_FLOOR + (1 - FUZZY_FLOOR) * cobertura (fracción del texto que ocupa).
+    Las ventanas que empiezan en la misma palabra comparten el estado de LCS.
+    """
+    m, n = len(phrase), len(norm)
+    first = phrase[:1]
+    best = 2 * _lcs_length(masks, m, norm) / (m + n) * (1.0 if norm[:1] == first else FUZZY_EDGE_PENALTY)
+    full = (1 << m) - 1
+    lo, hi = max(1, n_words - 1), n_words + 1
+    for i in range(len(tokens)):
+        edge = 1.0 if tokens[i][:1] == first else FUZZY_EDGE_PENALTY
+        v, L = full, -1
+        for size in range(1, min(hi, len(tokens) - i) + 1):
+            piece = tokens[i + size - 1] if size == 1 else ' ' + tokens[i + size - 1]
+            for ch in piece:
+                u = v & masks.get(ch, 0)
+                v = ((v + u) | (v - u)) & full
+            L += len(piece) + (1 if size == 1 else 0)
+            if size >= lo:
+                score = 2 * (m - bin(v).count('1')) / (m + L) * (FUZZY_FLOOR + (1 - FUZZY_FLOOR) * L / n) * edge
+                if score > best:
+                    best = score
     return best
 
-EVENT_CREATE_REGEX = re.compile(
-    r"crear evento (?P<title>.+?) (?:el|para) (?P<date>\d{4}-\d{2}-\d{2})(?:.*?(?:a las )?(?P<time>\d{1,2}:\d{2}))?",
-    re.IGNORECASE
-)
-EVENT_DELETE_REGEX = re.compile(
-    r"eliminar evento (?P<title>.+?) (?:el|de) (?P<date>\d{4}-\d{2}-\d{2})(?:.*?(?:a las )?(?P<time>\d{1,2}:\d{2}))?",
-    re.IGNORECASE
-)
-NOTE_CREATE_REGEX = re.compile(r"crear nota (?P<title>.+?)(?: en (?P<folder>.+))?$", re.IGNORECASE)
-NOTE_DELETE_REGEX = re.compile(r"eliminar nota (?P<title>.+?)(?: en (?P<folder>.+))?$", re.IGNORECASE)
-NOTE_SEARCH_REGEX = re.compile(r"buscar nota (?P<term>.+?)(?: en (?P<folder>.+))?$", re.IGNORECASE)
+def rank_intents(text: str, k: int = 3) -> List[Tuple[str, float]]:
+    """Las k intenciones de INTENT_PATTERNS más parecidas al texto, con su confianza.
+
+    Con el texto entero la confianza equivale a SequenceMatcher.ratio; una
+    frase dicha dentro de una oración puntúa por su ventana de palabras, menos
+    cuanto menor parte del texto cubre. Las coincidencias dentro de una
+    palabra ("holanda", "consalir") no cuentan.
+    """
+    norm = _basic_normalize(text)
+    if not norm:
+        return []
+    tokens = norm.split()
+    overlap: Dict[int, int] = {}
+    for g in _ngrams(norm):
+        for idx in _GRAM_INDEX.get(g, ()):
+            overlap[idx] = overlap.get(idx, 0) + 1
+    # Candidatas: mayor fracción de sus trigramas presentes en el texto
+    shortlist = sorted(overlap, key=lambda i: overlap[i] / _FUZZY_PHRASES[i][3], reverse=True)[:FUZZY_SHORTLIST]
+    best: Dict[str, float] = {}
+    for idx in shortlist:
+        phrase, intent, masks, _ng, n_words = _FUZZY_PHRASES[idx]
+        conf = round(_phrase_score(phrase, masks, n_words, norm, tokens), 3)
+        if conf > best.get(intent, 0.0):
+            best[intent] = conf
+    return sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+def _best_pattern(norm: str) -> tuple[Optional[str], float]:
+    ranked = rank_intents(norm, 1)
+    return ranked[0] if ranked else (None, 0.0)
+
+# --- Fechas y horas relativas en español ---
+# Las formas habituales de un recordatorio ("mañana a las 5", "el lunes",
+# "en 10 minutos", "pasado mañana", "5 de marzo a las 9:30") se resuelven con
+# regex compilados en microsegundos; dateparser solo se usa si no encajan.
+# Cada resolución dice además hasta cuándo vale (para la caché de analyze).
+_NUM_WORDS = {
+    'un': 1, 'uno': 1, 'una': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5, 'seis': 6,
+    'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10, 'once': 11, 'doce': 12, 'quince': 15,
+    'veinte': 20, 'treinta': 30, 'cuarenta': 40, 'cincuenta': 50,
+}
+_UNITS = {'segundo': 'seconds', 'minuto': 'minutes', 'hora': 'hours', 'dia': 'days', 'semana': 'weeks'}
+_WEEKDAYS = {'lunes': 0, 'martes': 1, 'miercoles': 2, 'jueves': 3, 'viernes': 4, 'sabado': 5, 'domingo': 6}
+_MONTHS = {m: i + 1 for i, m in enumerate((
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto',
+    'septiembre', 'octubre', 'noviembre', 'diciembre'))}
 
-REMINDER_REGEX = re.compile(
-    r"(crear|pon|establece?) (?:un )?(recordatorio|alarma) (?P<title>.+?) (?:para|el|en) (?P<when>.+)$",
-    re.IGNORECASE
+_OFFSET_REGEX = re.compile(
+    r"(?:en |dentro de )?(?P<n>\d+|" + "|".join(_NUM_WORDS) + r"|media) "
+    r"(?P<unit>segundo|minuto|hora|dia|semana)s?(?P<half> y media)?")
+_DAY_PART = (
+    r"(?P<rel>hoy|pasado manana|manana)"
+    r"|(?:el )?(?:proximo )?(?P<wd>" + "|".join(_WEEKDAYS) + r")(?: que viene| proximo)?"
+    r"|(?:el )?(?P<d>\d{1,2}) de (?P<mon>" + "|".join(_MONTHS) + r")(?: de (?P<y>\d{4}))?"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2})"
+    r"|(?P<dd>\d{1,2})/(?P<mm>\d{1,2})(?:/(?P<yy>\d{2}|\d{4}))?")
+_TIME_PART = (
+    r"(?:(?:(?:a |sobre )?las? |a la )(?P<h>\d{1,2})|(?P<hc>\d{1,2})(?=:))(?::(?P<mi>\d{2}))?"
+    r"(?: en punto| y (?P<frac>media|cuarto)| (?P<menos>menos cuarto))?"
+    r"(?: (?:de|por) la (?P<part>manana|tarde|noche)| ?(?P<ampm>am|pm)| ?h| horas)?"
+    r"|(?P<noon>(?:al |a )?mediodia)|(?P<midnight>(?:a )?(?:la )?medianoche)")
+_WHEN_REGEXES = (
+    re.compile(f"(?:{_DAY_PART})(?:,? (?:{_TIME_PART}))?"),
+    re.compile(f"(?:{_TIME_PART})(?: (?:del? )?(?:{_DAY_PART}))?"),
 )
 
-CHANGE_THEME_REGEX = re.compile(r"(cambia|poner|pon) tema (?P<theme>\w+)", re.IGNORECASE)
-CHANGE_VOICE_REGEX = re.compile(r"(cambia|poner|pon) voz (?P<voice>.+)$", re.IGNORECASE)
+def _clock(m: re.Match) -> Optional[_dt.time]:
+    """Hora del grupo de hora de m, o None si no la hay o es inválida."""
+    if m.group('noon'):
+        return _dt.time(12, 0)
+    if m.group('midnight'):
+        return _dt.time(0, 0)
+    h = m.group('h') or m.group('hc')
+    if h is None:
+        return None
+    h, mi = int(h), int(m.group('mi') or 0)
+    if m.group('frac'):
+        mi += 30 if m.group('frac') == 'media' else 15
+    elif m.group('menos'):
+        h, mi = h - 1, mi + 45
+    part, ampm = m.group('part'), m.group('ampm')
+    if (part in ('tarde', 'noche') or ampm == 'pm') and 0 < h < 12:
+        h += 12
+    elif (part == 'noche' or ampm == 'am') and h == 12:
+        h = 0
+    if not (0 <= h <= 23 and 0 <= mi <= 59):
+        return None
+    return _dt.time(h, mi)
+
+def parse_when(frase: str, now: Optional[_dt.datetime] = None) -> Optional[Tuple[_dt.datetime, float]]:
+    """Resuelve una expresión temporal española frecuente sin dateparser.
+
+    Retorna (fecha, caduca) o None si la forma no se reconoce. caduca es el
+    epoch hasta el que la resolución no cambia: 0 si depende del instante
+    ("en 10 minutos", "mañana" sin hora), medianoche si depende del día,
+    `fecha` si cae hoy y pasaría al día siguiente, math.inf si es absoluta.
+    Sin hora, los días relativos conservan la hora actual (como dateparser)
+    y las fechas absolutas usan las 00:00. Siempre prefiere el futuro.
+    """
+    now = (now or _dt.datetime.now()).replace(microsecond=0)
+    text = _basic_normalize(frase).strip(" .,;")
+    if text.startswith("para "):
+        text = text[5:]
+    today = now.date()
+    midnight = _dt.datetime.combine(today + _dt.timedelta(days=1), _dt.time()).timestamp()
+
+    m = _OFFSET_REGEX.fullmatch(text)
+    if m:
+        n, unit = m.group('n'), _UNITS[m.group('unit')]
+        if n == 'media':
+            if unit != 'hours' or m.group('half'):
+                return None
+            amount = 0.5
+        else:
+            amount = int(n) if n.isdigit() else _NUM_WORDS[n]
+            if m.group('half'):
+                amount += 0.5
+        return now + _dt.timedelta(**{unit: amount}), 0.0
+
+    for rgx in _WHEN_REGEXES:
+        m = rgx.fullmatch(text)
+        if m:
+            break
+    else:
+        return None
+    clock = _clock(m)
+    has_time = clock is not None
+    if not has_time and (m.group('h') or m.group('hc')):
+        return None  # hora inválida ("a las 25")
+    rel, wd = m.group('rel'), m.group('wd')
+    try:
+        if rel or wd:
+            if rel:
+                day = today + _dt.timedelta(days={'hoy': 0, 'manana': 1, 'pasado manana': 2}[rel])
+            else:
+                ahead = (_WEEKDAYS[wd] - today.weekday()) % 7
+                if ahead == 0 and not (has_time and _dt.datetime.combine(today, clock) > now):  # type: ignore[arg-type]
+                    ahead = 7
+                day = today + _dt.timedelta(days=ahead)
+            if not has_time:
+                return _dt.datetime.combine(day, now.time()), 0.0
+            dt = _dt.datetime.combine(day, clock)  # type: ignore[arg-type]
+            # Un día de la semana que cae hoy pasa a la semana próxima cuando llega la hora
+            return dt, (dt.timestamp() if wd and day == today else midnight)
+        if m.group('iso'):
+            day, explicit = _dt.date.fromisoformat(m.group('iso')), True
+        elif m.group('mon') or m.group('dd'):
+            if m.group('mon'):
+                d, mon, y = int(m.group('d')), _MONTHS[m.group('mon')], m.group('y')
+            else:
+                d, mon, y = int(m.group('dd')), int(m.group('mm')), m.group('yy')
+            explicit = y is not None
+            year = (int(y) + (2000 if len(y) == 2 else 0)) if y else today.year
+            day = _dt.date(year, mon, d)
+            if not explicit and day < today:
+                day = _dt.date(year + 1, mon, d)
+        else:
+            # Solo hora: hoy si aún no pasó, si no mañana
+            dt = _dt.datetime.combine(today, clock)  # type: ignore[arg-type]
+            if dt <= now:
+                return dt + _dt.timedelta(days=1), midnight
+            return dt, dt.timestamp()
+    except ValueError:
+        return None  # fecha inexistente ("31 de febrero")
+    dt = _dt.datetime.combine(day, clock or _dt.time())
+    return dt, (math.inf if explicit else midnight)
 
 def _parse_natural_datetime(frase: str) -> Optional[_dt.datetime]:
+    """dateparser (respaldo de parse_when para las formas que no reconoce)."""
+    dateparser = _load_dateparser()
     if not dateparser:
         return None
     settings = {"PREFER_DATES_FROM":"future","RELATIVE_BASE": _dt.datetime.now()}
@@ -116,76 +501,171 @@ def _parse_natural_datetime(frase: str) -> Optional[_dt.datetime]:
     except Exception:
         return None
 
+# --- Caché de resultados de analyze ---
+ANALYZE_CACHE_SIZE = 256  # entradas (textos normalizados)
+
+_INSTANT_WORDS = re.compile(r"\b(?:en|dentro de) (?:\d+|un|una|medio|media)\b|\bahora\b|\b(?:minutos?|segundos?|horas?)\b")
+_DAY_WORDS = re.compile(r"\b(?:hoy|manana|pasado|lunes|martes|miercoles|jueves|viernes|sabado|domingo|semana|mes|ano)\b")
+_CLOCK_WORDS = re.compile(r"\b\d{1,2}(?::\d{2})?\b|\ba las?\b|\bmediodia\b|\bmedianoche\b")
+_ISO_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+def _when_expiry(frase: str, dt: _dt.datetime, now: _dt.datetime) -> float:
+    """Hasta cuándo (epoch) sigue valiendo `dt`, resuelta por dateparser, para `frase`.
+
+    0 = depende del instante (no cachear); math.inf = fecha absoluta. Con
+    palabras de día y hora explícita ("mañana a las 5") vale hasta medianoche,
+    o hasta `dt` si cae hoy (después pasaría al día siguiente).
+    """
+    norm = _basic_normalize(frase)
+    if _INSTANT_WORDS.search(norm):
+        return 0.0
+    day = _DAY_WORDS.search(norm)
+    if _ISO_DATE.search(norm) and not day:
+        return math.inf
+    if day and _CLOCK_WORDS.search(norm):
+        midnight = _dt.datetime.combine(now.date() + _dt.timedelta(days=1), _dt.time())
+        return min(dt, midnight).timestamp() if dt > now else midnight.timestamp()
+    return 0.0
+
+def _resolve_when(frase: str) -> Tuple[Optional[_dt.datetime], float]:
+    """(fecha, caduca): parse_when y, si no reconoce la forma, dateparser."""
+    now = _dt.datetime.now()
+    hit = parse_when(frase, now)
+    if hit:
+        return hit
+    dt = _parse_natural_datetime(frase)
+    return (dt, _when_expiry(frase, dt, now)) if dt else (None, math.inf)
+
+class _ResultCache:
+    """LRU segura entre hilos de resultados de analyze con caducidad por entrada.
+
+    Los resultados con parámetros guardan además el texto original (títulos con
+    mayúsculas/acentos): solo se reutilizan para ese mismo texto.
+    """
+
+    def __init__(self, max_items: int) -> None:
+        self.max_items = max_items
+        self.gen = 0
+        self._data: OrderedDict = OrderedDict()  # norm -> (resultado, texto | None, caduca)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.expired = 0
+
+    def get(self, key: str, text: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[2] <= now:
+                del self._data[key]
+                self.expired += 1
+                item = None
+            if item is None or (item[1] is not None and item[1] != text):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, text: Optional[str], result: Dict[str, Any], expires: float, gen: int) -> None:
+        with self._lock:
+            if gen != self.gen or self.max_items <= 0:
+                return
+            self._data[key] = (result, text, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def clear(self, reset_stats: bool = False) -> None:
+        with self._lock:
+            self.gen += 1
+            self._data.clear()
+            if reset_stats:
+                self.hits = self.misses = self.expired = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0,
+                    'expired': self.expired, 'items': len(self._data)}
+
+_cache = _ResultCache(ANALYZE_CACHE_SIZE)
+
+def cache_stats() -> Dict[str, Any]:
+    """Aciertos, fallos, tasa de aciertos, caducadas y entradas de la caché de analyze."""
+    return _cache.stats()
+
+def cache_clear(reset_stats: bool = False) -> None:
+    _cache.clear(reset_stats)
+
 def analyze(text: str) -> Dict[str, Any]:
-    original = text
+    """Intención del texto. Los textos repetidos (misma normalización) salen de una caché LRU."""
     norm = _basic_normalize(text)
+    now = time.time()
+    result = _cache.get(norm, text, now)
+    if result is None:
+        gen = _cache.gen
+        result, expires = _analyze(text, norm)
+        if expires > now:
+            _cache.put(norm, text if result["params"] else None, result, expires, gen)
+    return {**result, "params": dict(result["params"]), "tokens": list(result["tokens"])}
+
+def _analyze(text: str, norm: str) -> Tuple[Dict[str, Any], float]:
+    """Resultado de analyze y hasta cuándo (epoch) se puede reutilizar."""
+    original = text
     tokens: List[str] = norm.split()
     params: Dict[str, Any] = {}
+    expires = math.inf
 
-    # Eventos crear
-    m = EVENT_CREATE_REGEX.search(text)
+    # Comandos con parámetros (eventos, notas, recordatorio, tema, voz)
+    m = _match_command(text)
     if m:
-        params = m.groupdict()
-        return {"intent":"create_event","params":params,"confidence":0.95,"tokens":tokens}
-    # Eventos eliminar
-    m = EVENT_DELETE_REGEX.search(text)
-    if m:
-        params = m.groupdict()
-        return {"intent":"delete_event","params":params,"confidence":0.95,"tokens":tokens}
-    # Notas
-    for intent, rgx in (("create_note", NOTE_CREATE_REGEX),("delete_note", NOTE_DELETE_REGEX),("search_note", NOTE_SEARCH_REGEX)):
-        m = rgx.search(text)
-        if m:
-            params = m.groupdict()
-            return {"intent":intent,"params":params,"confidence":0.9,"tokens":tokens}
-    # Recordatorio
-    m = REMINDER_REGEX.search(text)
-    if m:
-        gd = m.groupdict()
-        dt = _parse_natural_datetime(gd.get('when',''))
-        if dt:
-            params = {"title": gd.get('title'), "when_iso": dt.isoformat()}
-            return {"intent":"reminder_create","params":params,"confidence":0.9,"tokens":tokens}
-        else:
-            params = {"title": gd.get('title'), "when_text": gd.get('when')}
-            return {"intent":"reminder_create","params":params,"confidence":0.6,"tokens":tokens}
-
-    # Cambiar tema
-    m = CHANGE_THEME_REGEX.search(text)
-    if m:
-        theme = _basic_normalize(m.group('theme'))
-        if theme in THEMES:
-            return {"intent":"change_theme","params":{"theme":theme},"confidence":0.9,"tokens":tokens}
-        return {"intent":"change_theme","params":{"theme":theme},"confidence":0.5,"tokens":tokens}
-
-    # Cambiar voz (solo marca el texto, UI confirmará)
-    m = CHANGE_VOICE_REGEX.search(text)
-    if m:
-        voice_raw = m.group('voice').strip()
-        return {"intent":"change_voice","params":{"voice":voice_raw},"confidence":0.7,"tokens":tokens}
+        intent = m.lastgroup or ""
+        names, confidence = _COMMAND_GROUPS[intent]
+        params = {name: m.group(full) for full, name in names}
+        if intent == "reminder_create":
+            dt, expires = _resolve_when(params.get('when') or '')
+            if dt:
+                params = {"title": params.get('title'), "when_iso": dt.isoformat()}
+            else:
+                params = {"title": params.get('title'), "when_text": params.get('when')}
+                confidence = 0.6
+        elif intent == "change_theme":
+            params = {"theme": _basic_normalize(params['theme'])}
+            if params['theme'] not in THEMES:
+                confidence = 0.5
+        elif intent == "change_voice":
+            # Solo marca el texto, UI confirmará
+            params = {"voice": params['voice'].strip()}
+        return {"intent":intent,"params":params,"confidence":confidence,"tokens":tokens}, expires
 
     # Abrir app
     if norm.startswith("abrir "):
-        for kw in APP_KEYWORDS:
-            if kw in norm:
-                return {"intent":"open_app","params":{"app":kw},"confidence":0.85,"tokens":tokens}
-        return {"intent":"open_app","params":{},"confidence":0.6,"tokens":tokens}
+        for _i, app in _trie_find(_APP_TRIE, _WORD_REGEX.findall(norm)):
+            return {"intent":"open_app","params":{"app":app},"confidence":0.85,"tokens":tokens}, expires
+        return {"intent":"open_app","params":{},"confidence":0.6,"tokens":tokens}, expires
 
     # Heurísticos directos
     if "hora" in tokens:
-        return {"intent":"time","params":{},"confidence":0.75,"tokens":tokens}
+        return {"intent":"time","params":{},"confidence":0.75,"tokens":tokens}, expires
 
     # Consultas agenda básicas
     if ("que" in tokens or "qué" in original.lower()) and "tengo" in tokens and "hoy" in tokens:
-        return {"intent":"query_events_day","params":{},"confidence":0.8,"tokens":tokens}
+        return {"intent":"query_events_day","params":{},"confidence":0.8,"tokens":tokens}, expires
     if ("que" in tokens or "qué" in original.lower()) and "tengo" in tokens and "semana" in tokens:
-        return {"intent":"query_events_week","params":{},"confidence":0.8,"tokens":tokens}
+        return {"intent":"query_events_week","params":{},"confidence":0.8,"tokens":tokens}, expires
+
+    # Frase exacta de INTENT_PATTERNS
+    intent = _PHRASES.get(norm)
+    if intent:
+        return {"intent":intent, "params":{}, "confidence":1.0, "tokens":tokens}, expires
 
     # Patrón general
     intent, score = _best_pattern(norm)
-    if intent and score >= 0.75:
-        return {"intent":intent, "params":{}, "confidence":score, "tokens":tokens}
+    if intent and score >= FUZZY_THRESHOLD:
+        return {"intent":intent, "params":{}, "confidence":score, "tokens":tokens}, expires
+
+    return {"intent":None, "params":{}, "confidence":0.0, "tokens":tokens}, expires
 
-    return {"intent":None, "params":{}, "confidence":0.0, "tokens":tokens}
+compile_patterns()
+_load_times['nlp_import'] = time.perf_counter() - _T_IMPORT
 
-__all__ = ["analyze"]
+__all__ = ["analyze", "rank_intents", "parse_when", "compile_patterns", "cache_stats", "cache_clear",
+           "warmup", "is_ready", "wait_ready", "load_times", "COMMAND_PATTERNS", "INTENT_PATTERNS"]
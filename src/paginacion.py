@@ -0,0 +1,82 @@
+"""Carga por páginas de un QListWidget a medida que se hace scroll.
+
+`pagina(despues)` devuelve {'results': [...], 'next': cursor | None} (los
+listados `*_page` de db, paginados por cursor). Solo se piden filas cuando la
+barra de desplazamiento se acerca al final o si lo cargado no llena la vista.
+La clase no importa Qt: recibe la lista ya creada.
+"""
+from __future__ import annotations
+
+MARGEN = 10  # filas antes del final a partir de las que se pide otra página
+
+
+class CargaPaginada:
+    """Rellena `lista` con páginas de `pagina`.
+
+    crear(fila) convierte cada fila en texto o QListWidgetItem (por defecto la
+    fila es el texto). `siguiente` es el cursor de la última fila cargada.
+    """
+
+    def __init__(self, lista, pagina, crear=None, margen: int = MARGEN) -> None:
+        self.lista = lista
+        self.pagina = pagina
+        self.crear = crear
+        self.margen = margen
+        self.siguiente = None
+        self._agotada = True
+        self._cargando = False
+        barra = lista.verticalScrollBar()
+        barra.valueChanged.connect(self._al_desplazar)
+        barra.rangeChanged.connect(lambda _min, _max: self._al_desplazar(barra.value()))
+
+    @property
+    def hay_mas(self) -> bool:
+        return not self._agotada
+
+    def recargar(self) -> int:
+        """Vacía la lista y carga la primera página. Retorna las filas cargadas."""
+        self.lista.clear()
+        self.siguiente = None
+        self._agotada = False
+        return self.cargar_mas()
+
+    def cargar_mas(self) -> int:
+        if self._agotada or self._cargando:
+            return 0
+        self._cargando = True
+        try:
+            try:
+                res = self.pagina(self.siguiente)
+            except Exception:
+                res = {'results': [], 'next': None}
+            filas = res['results']
+            if self.crear is None:
+                self.lista.addItems(filas)
+            else:
+                for fila in filas:
+                    self.lista.addItem(self.crear(fila))
+            self.siguiente = res['next']
+            self._agotada = self.siguiente is None
+            return len(filas)
+        finally:
+            self._cargando = False
+
+    def cubre(self, clave) -> bool:
+        """True si una fila que ordena como `clave` cae en lo ya cargado.
+
+        `clave` se compara tal cual con el cursor: del mismo tipo (p.ej. la
+        carpeta con `note_list_folders_page`) o, con cursores tupla, una tupla
+        prefijo (p.ej. (title,) con (title, id)). Las filas posteriores llegarán
+        con las próximas páginas: no insertarlas a mano.
+        """
+        if self._agotada:
+            return True
+        if isinstance(clave, tuple) != isinstance(self.siguiente, tuple):
+            raise TypeError(f"clave {clave!r} no comparable con el cursor {self.siguiente!r}")
+        return clave <= self.siguiente
+
+    def _al_desplazar(self, valor: int) -> None:
+        if self._agotada:
+            return
+        if valor >= self.lista.verticalScrollBar().maximum() - self.margen:
+            self.cargar_mas()
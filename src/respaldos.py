@@ -0,0 +1,106 @@
+"""Snapshots periódicos de la base en un hilo de fondo.
+
+Usa `db.snapshot_create` (API de backup de SQLite por pasos), verifica cada
+copia con integrity_check y rota los archivos en data/backups/. La clase no
+depende de Qt: la GUI pasa callbacks y los reenvía por señales.
+"""
+from __future__ import annotations
+import threading, time
+from concurrent.futures import Future
+try:
+    from . import db  # type: ignore
+except ImportError:
+    import db  # type: ignore
+
+INTERVALO = 24 * 3600     # segundos entre snapshots
+RETRASO_INICIAL = 120     # no competir con el arranque de la app
+
+
+class ProgramadorRespaldos:
+    """Hilo que crea un snapshot cada `intervalo` segundos y conserva `conservar`.
+
+    al_progreso(copiadas, total) y al_terminar(ruta | None) se llaman desde el
+    hilo de fondo.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO, conservar: int = db.SNAPSHOT_KEEP,
+                 al_progreso=None, al_terminar=None) -> None:
+        self.intervalo = intervalo
+        self.conservar = conservar
+        self.al_progreso = al_progreso
+        self.al_terminar = al_terminar
+        self._pedidos: list[Future] = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def iniciar(self, retraso: float = RETRASO_INICIAL) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._run, args=(retraso,), name='db-snapshots', daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float | None = 5.0) -> None:
+        self._parar.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        with self._lock:
+            pendientes, self._pedidos = self._pedidos, []
+        for fut in pendientes:
+            fut.cancel()
+
+    def respaldar_ahora(self) -> Future:
+        """Pide un snapshot inmediato; el Future resuelve con la ruta o None."""
+        fut: Future = Future()
+        with self._lock:
+            self._pedidos.append(fut)
+        self._despertar.set()
+        return fut
+
+    def proximo(self, ahora: float | None = None) -> float:
+        """Segundos hasta el siguiente snapshot programado según el más reciente."""
+        ahora = time.time() if ahora is None else ahora
+        snaps = db.snapshot_list()
+        if not snaps:
+            return 0.0
+        try:
+            ultimo = snaps[-1].stat().st_mtime
+        except OSError:
+            return 0.0
+        return max(0.0, ultimo + self.intervalo - ahora)
+
+    def ejecutar(self) -> str | None:
+        """Crea un snapshot y rota (en el hilo que llama)."""
+        ruta = db.snapshot_create(progress=self.al_progreso)
+        if ruta:
+            db.snapshot_rotate(self.conservar)
+        if self.al_terminar:
+            try:
+                self.al_terminar(ruta)
+            except Exception:
+                pass
+        return ruta
+
+    def _run(self, retraso: float) -> None:
+        espera = max(retraso, self.proximo())
+        while not self._parar.is_set():
+            self._despertar.wait(espera)
+            self._despertar.clear()
+            if self._parar.is_set():
+                break
+            with self._lock:
+                pedidos, self._pedidos = self._pedidos, []
+            if not pedidos and self.proximo() > 0:
+                espera = self.proximo()
+                continue
+            ruta = None
+            try:
+                ruta = self.ejecutar()
+            finally:
+                for fut in pedidos:
+                    if fut.set_running_or_notify_cancel():
+                        fut.set_result(ruta)
+            espera = self.intervalo
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src import db  # type: ignore
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Base de datos aislada en tmp_path (no toca data/app.db)."""
+    db.close_all()
+    monkeypatch.setattr(db, 'DB_PATH', tmp_path / 'app.db')
+    monkeypatch.setattr(db, 'MIGRATION_MSG_FILE', tmp_path / 'migration_pending.json')
+    monkeypatch.setattr(db, 'EVENTOS_JSON', tmp_path / 'eventos.json')
+    monkeypatch.setattr(db, 'NOTAS_DIR', tmp_path / 'notas')
+    monkeypatch.setattr(db, 'CONFIG_JSON_PATH', tmp_path / 'config.json')
+    monkeypatch.setattr(db, 'LOG_FILE', tmp_path / 'db_errors.log')
+    monkeypatch.setattr(db, 'DATA_DIR', tmp_path)
+    yield db
+    db.close_all()
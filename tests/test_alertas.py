@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from src import db  # type: ignore
+from src.alertas import ProgramadorAlertas, AVISO_PREVIO  # type: ignore
+
+def _key(dt: datetime) -> tuple[str, str]:
+    return dt.strftime('%Y-%m-%d'), dt.strftime('%H:%M')
+
+def test_heap_fires_prealert_and_exact(tmp_db):
+    base = datetime.now().replace(second=0, microsecond=0) + timedelta(hours=1)
+    fecha, hora = _key(base)
+    db.event_create('Reunion', fecha, hora)
+    prog = ProgramadorAlertas()
+    prog.cargar()
+    ts = db.to_start_ts(base)
+    assert prog.proximo_disparo() == ts - AVISO_PREVIO
+    assert prog.vencidas(ts - AVISO_PREVIO - 1) == []
+    previas = prog.vencidas(ts - AVISO_PREVIO)
+    assert [(e['evento'], p) for e, p in previas] == [('Reunion', True)]
+    assert prog.proximo_disparo() == ts
+    finales = prog.vencidas(ts + 30)
+    assert [(e['evento'], p) for e, p in finales] == [('Reunion', False)]
+    assert len(prog) == 0
+
+def test_incremental_updates_from_db_changes(tmp_db):
+    base = datetime.now().replace(second=0, microsecond=0) + timedelta(hours=2)
+    fecha, hora = _key(base)
+    avisos = []
+    prog = ProgramadorAlertas(al_cambiar=lambda: avisos.append(1))
+    prog.cargar()
+    db.subscribe(prog.on_change)
+    try:
+        db.event_create('Nuevo', fecha, hora)
+        assert len(prog) == 1 and avisos
+        db.event_toggle_complete('Nuevo', fecha, hora, True)
+        assert len(prog) == 0
+        db.event_set_completed_many([('Nuevo', fecha, hora)], False)
+        assert len(prog) == 1
+        db.event_delete('Nuevo', fecha, hora)
+        assert len(prog) == 0
+        assert prog.vencidas(db.to_start_ts(base) + 1) == []
+    finally:
+        db.unsubscribe(prog.on_change)
+
+def test_untimed_and_far_events_are_not_scheduled(tmp_db):
+    hoy = datetime.now()
+    db.event_create('SinHora', hoy.strftime('%Y-%m-%d'), None)
+    lejos = hoy + timedelta(days=30)
+    db.event_create('Lejano', *_key(lejos))
+    prog = ProgramadorAlertas()
+    prog.cargar()
+    assert len(prog) == 0
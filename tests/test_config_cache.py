@@ -0,0 +1,39 @@
+import json, sqlite3
+from src import db, config_store  # type: ignore
+
+def test_write_through_and_cross_process_invalidation(tmp_db, monkeypatch):
+    assert config_store.save_config({'voice_lang': 'en', 'mic_index': 2})
+    cfg = config_store.load_config()
+    assert cfg['voice_lang'] == 'en' and cfg['mic_index'] == 2 and cfg['ui_theme'] == 'neon'
+    # Escritura de "otro proceso": conexión independiente que sube la versión
+    monkeypatch.setattr(db, 'CONFIG_RECHECK_S', 0.0)
+    other = sqlite3.connect(str(db.DB_PATH))
+    other.execute("UPDATE config SET value=? WHERE key='voice_lang'", (json.dumps('fr'),))
+    other.execute("UPDATE meta SET value=CAST(value AS INTEGER)+1 WHERE key='config_version'")
+    other.commit()
+    other.close()
+    assert config_store.load_config()['voice_lang'] == 'fr'
+    assert db.config_set('voice_lang', 'de')
+    assert db.config_get('voice_lang') == 'de'
+
+def test_cached_reads_skip_sql(tmp_db):
+    db.config_set('k', 1)
+    db.config_load_all()
+    calls = []
+    db.get_conn().set_trace_callback(calls.append)
+    try:
+        for _ in range(100):
+            assert db.config_load_all()['k'] == 1
+    finally:
+        db.get_conn().set_trace_callback(None)
+    assert calls == []
+    copia = db.config_load_all()
+    copia['k'] = 99
+    assert db.config_get('k') == 1
+
+def test_callers_cannot_mutate_cached_values(tmp_db):
+    db.config_set('recientes', ['a'])
+    db.config_load_all()['recientes'].append('MUTADO')
+    db.config_get('recientes').append('MUTADO')
+    assert db.config_get('recientes') == ['a']
+    assert db.config_get('falta', 'x') == 'x'
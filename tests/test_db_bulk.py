@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+from src import db  # type: ignore
+
+def test_event_bulk_outcomes(tmp_db):
+    db.event_create('Existente', '2099-04-01', '10:00')
+    res = db.event_create_many([
+        ('Nuevo', '2099-04-01', '09:00'),
+        ('Existente', '2099-04-01', '10:00'),
+        ('Nuevo', '2099-04-01', '09:00'),   # duplicado dentro del lote
+        ('', '2099-04-01', None),           # inválido
+        ('SinHora', '2099-04-01', None, 1),
+    ])
+    assert res == [True, False, False, False, True]
+    done = db.event_set_completed_many([('Nuevo', '2099-04-01', '09:00'), ('Falta', '2099-04-01', None)], True)
+    assert done == [True, False]
+    evs = {e['title']: e for e in db.event_list_day('2099-04-01')}
+    assert evs['Nuevo']['completed'] == 1 and evs['SinHora']['completed'] == 1
+    borrados = db.event_delete_many([('Nuevo', '2099-04-01', '09:00'), ('Nuevo', '2099-04-01', '09:00'), ('SinHora', '2099-04-01', None)])
+    assert borrados == [1, 0, 1]
+    assert [e['title'] for e in db.event_list_day('2099-04-01')] == ['Existente']
+
+def test_note_bulk_outcomes(tmp_db):
+    res = db.note_upsert_many([('A', 'uno', None), ('B', 'dos', 'x'), ('', 'mal', None), ('A', 'uno bis', '')])
+    assert res == [True, True, False, True]
+    assert db.note_get('A', None) == 'uno bis'
+    assert db.note_delete_many([('A', None), ('B', 'x'), ('B', 'otra')]) == [True, True, False]
+    assert db.note_list_titles(None) == []
+
+def test_backup_import_bulk(tmp_db, tmp_path):
+    blob = {
+        'events': [{'title': f'E{i}', 'date': '2099-05-01', 'time': '', 'completed': 0} for i in range(2000)],
+        'notes': [{'title': f'N{i}', 'content': 'c', 'folder': ''} for i in range(2000)],
+        'config': [{'key': 'k', 'value': '1'}],
+    }
+    path = tmp_path / 'import.json'
+    path.write_text(json.dumps(blob), encoding='utf-8')
+    assert db.backup_import(str(path))
+    assert len(db.event_list_day('2099-05-01')) == 2000
+    assert len(db.note_list_titles(None)) == 2000
+    assert db.config_get('k') == 1
+
+
+def test_backup_ndjson_roundtrip(tmp_db, tmp_path):
+    db.event_create_many([(f'E{i}', '2099-06-01', '', i % 2) for i in range(25)])
+    db.note_upsert_many([(f'N{i}', 'línea\ncon "comillas"', 'f') for i in range(25)])
+    db.config_set('tema', 'oscuro')
+    for name in ('b.ndjson', 'b.ndjson.gz'):
+        path = db.backup_export(str(tmp_path / name))
+        assert path and not Path(path + '.tmp').exists()
+        with open(path, 'rb') as fh:
+            assert (fh.read(2) == b'\x1f\x8b') == name.endswith('.gz')
+    db.close_all()
+    db.DB_PATH = tmp_path / 'otra.db'
+    assert db.backup_import(str(tmp_path / 'b.ndjson.gz'), batch_size=7)
+    evs = db.event_list_day('2099-06-01')
+    assert len(evs) == 25 and sum(e['completed'] for e in evs) == 12
+    assert db.note_get('N3', 'f') == 'línea\ncon "comillas"'
+    assert db.config_get('tema') == 'oscuro'
@@ -0,0 +1,68 @@
+from src import db
+
+
+def test_note_cache_hits_and_invalidation(tmp_db):
+    db.wait_ready()
+    db.cache_clear(reset_stats=True)
+    db.note_upsert('A', 'uno', 'f')
+    assert db.note_get('A', 'f') == 'uno'
+    assert db.note_get('A', 'f') == 'uno'
+    assert db.note_get('B', None) is None
+    assert db.note_get('B', None) is None
+    st = db.cache_stats()['notes']
+    assert (st['hits'], st['misses'], st['items']) == (2, 2, 2)
+    db.note_upsert('A', 'dos', 'f')
+    db.note_upsert('B', 'nueva', '')
+    assert db.cache_stats()['notes']['invalidations'] == 2
+    assert db.note_get('A', 'f') == 'dos' and db.note_get('B', None) == 'nueva'
+    db.note_delete('A', 'f')
+    assert db.note_get('A', 'f') is None
+
+
+def test_agenda_cache_invalidates_overlapping_ranges(tmp_db):
+    db.wait_ready()
+    db.cache_clear(reset_stats=True)
+    db.event_create('E1', '2024-05-06', '10:00')
+    assert [e['title'] for e in db.event_list_week('2024-05-06', '2024-05-12')] == ['E1']
+    db.event_list_day('2024-05-20')
+    db.event_list_week('2024-05-06', '2024-05-12')[0]['title'] = 'mutado'
+    assert db.event_list_week('2024-05-06', '2024-05-12')[0]['title'] == 'E1'
+    db.event_create('E2', '2024-05-08', '')
+    st = db.cache_stats()['agenda']
+    assert st['invalidations'] == 1 and st['items'] == 1  # el día 20 sigue cacheado
+    assert len(db.event_list_week('2024-05-06', '2024-05-12')) == 2
+    db.event_toggle_complete('E2', '2024-05-08', None, True)
+    assert db.event_list_day('2024-05-08')[0]['completed'] == 1
+
+
+def test_unrelated_writes_keep_caches_warm(tmp_db):
+    db.wait_ready()
+    db.note_upsert('A', 'uno', 'f')
+    db.event_create('E1', '2024-05-06', '10:00')
+    db.cache_clear(reset_stats=True)
+    db.note_get('A', 'f')
+    db.event_list_day('2024-05-06')
+    assert db.config_set('tema', 'oscuro')
+    db.prune_revisions(0)
+    with db.transaction() as conn:  # escritura de notas sin Change: vacía todo
+        assert db.cache_stats()['notes']['items'] == 1
+        assert db.cache_stats()['agenda']['items'] == 1
+        conn.execute("UPDATE notes SET content='dos' WHERE title='A'")
+    assert db.cache_stats()['notes']['items'] == 0
+    assert db.note_get('A', 'f') == 'dos'
+
+
+def test_cache_eviction_by_items_and_bytes():
+    cache = db._LRUCache(max_items=2, max_bytes=100)
+    for k in 'abc':
+        cache.put(k, k, 10, cache.gen)
+    assert cache.get('a') is db._MISS and cache.get('c') == 'c'
+    cache.put('d', 'd', 90, cache.gen)
+    st = cache.stats()
+    assert st['items'] == 2 and st['bytes'] == 100 and st['evictions'] == 2
+    cache.put('big', 'x', 101, cache.gen)
+    assert cache.get('big') is db._MISS
+    gen = cache.gen
+    cache.discard(lambda k: False)
+    cache.put('tarde', 1, 1, gen)  # lectura anterior a un COMMIT: no se guarda
+    assert cache.get('tarde') is db._MISS
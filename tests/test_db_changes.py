@@ -0,0 +1,53 @@
+import threading
+from src import db  # type: ignore
+
+def _collect():
+    got: list = []
+    def cb(change):
+        got.append((change.table, change.kind, change.keys, change.fields))
+    return got, cb
+
+def test_note_changes_published_after_commit(tmp_db):
+    got, cb = _collect()
+    db.subscribe(cb)
+    try:
+        db.note_upsert('A', 'x', None)
+        db.note_upsert('A', 'y', None)
+        db.note_upsert_many([('B', '1', 'f'), ('A', 'z', '')])
+        db.note_delete('B', 'f')
+        assert not db.note_delete('B', 'f')  # sin cambio → sin evento
+    finally:
+        db.unsubscribe(cb)
+    assert got == [
+        ('notes', 'insert', (('A', ''),), {}),
+        ('notes', 'update', (('A', ''),), {}),
+        ('notes', 'insert', (('B', 'f'),), {}),
+        ('notes', 'update', (('A', ''),), {}),
+        ('notes', 'delete', (('B', 'f'),), {}),
+    ]
+
+def test_rolled_back_changes_are_not_published(tmp_db):
+    got, cb = _collect()
+    db.subscribe(cb)
+    try:
+        try:
+            with db.transaction():
+                db.event_create('X', '2099-08-01', '10:00')
+                raise RuntimeError('abortar')
+        except RuntimeError:
+            pass
+        assert got == []
+        done = threading.Event()
+        marcar = lambda c: done.set()
+        db.subscribe(marcar)
+        db.event_create_async('Y', '2099-08-01', None).result(timeout=5)
+        assert done.wait(5)
+        db.unsubscribe(marcar)
+        assert got == [('events', 'insert', (('Y', '2099-08-01', ''),), {'completed': 0})]
+    finally:
+        db.unsubscribe(cb)
+
+def test_folder_exists_helper(tmp_db):
+    assert not db.note_folder_exists('vacia')
+    db.note_upsert('N', 'c', 'vacia')
+    assert db.note_folder_exists('vacia')
@@ -0,0 +1,50 @@
+import sqlite3
+
+from src import db  # type: ignore
+
+
+def _folders():
+    return {f['name']: f['notes'] for f in db.folder_list()}
+
+
+def test_folder_counts_follow_notes(tmp_db):
+    db.wait_ready()
+    db.note_upsert_many([('a', '1', 'trabajo'), ('b', '2', 'trabajo'), ('c', '3', ''), ('d', '4', 'casa')])
+    assert _folders() == {'casa': 1, 'trabajo': 2}
+    antes = {f['name']: f['updated_at'] for f in db.folder_list()}['trabajo']
+    db.note_upsert('a', 'editada', 'trabajo')  # actualizar no cambia el recuento
+    assert _folders()['trabajo'] == 2
+    assert {f['name']: f['updated_at'] for f in db.folder_list()}['trabajo'] >= antes
+    db.note_delete_many([('d', 'casa')])
+    assert _folders() == {'casa': 0, 'trabajo': 2}  # vacía pero existe
+    assert db.note_list_folders() == ['casa', 'trabajo'] and db.note_folder_exists('casa')
+
+
+def test_empty_folder_create_and_delete(tmp_db):
+    db.wait_ready()
+    got = []
+    db.subscribe(got.append)
+    try:
+        assert db.folder_create('Ideas') and not db.folder_create('Ideas')
+        assert db.note_list_folders() == ['Ideas'] and db.note_list_titles('Ideas') == []
+        db.note_upsert('n', 'x', 'Ideas')
+        assert not db.folder_delete('Ideas')  # tiene notas
+        db.note_delete('n', 'Ideas')
+        assert db.folder_delete('Ideas') and db.note_list_folders() == []
+    finally:
+        db.unsubscribe(got)
+    assert [(c.table, c.kind) for c in got if c.table == 'folders'] == [('folders', 'insert'), ('folders', 'delete')]
+
+
+def test_upgrade_v6_backfills_existing_notes(tmp_db):
+    db.note_upsert_many([('x', '1', 'f1'), ('y', '2', 'f1'), ('z', '3', 'f2')])
+    db.wait_ready()
+    db.close_all()
+    raw = sqlite3.connect(db.DB_PATH)
+    raw.executescript("DROP TRIGGER folders_ai; DROP TRIGGER folders_au; DROP TRIGGER folders_ad; "
+                      "DROP TABLE folders; UPDATE meta SET value='5' WHERE key='schema_version';")
+    raw.close()
+    db.wait_ready()
+    assert _folders() == {'f1': 2, 'f2': 1}
+    db.note_upsert('w', '4', 'f2')
+    assert _folders()['f2'] == 2
@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import threading
+
+from src import db
+
+
+def _legacy_files():
+    db.EVENTOS_JSON.write_text(json.dumps([{'evento': 'Viejo', 'fecha': '2099-01-01', 'hora': ''}]), encoding='utf-8')
+    db.NOTAS_DIR.mkdir()
+    (db.NOTAS_DIR / 'n.txt').write_text('hola', encoding='utf-8')
+
+
+def test_legacy_migration_runs_in_background(tmp_db, monkeypatch):
+    _legacy_files()
+    gate = threading.Event()
+    real = db._migrate_legacy
+    monkeypatch.setattr(db, '_migrate_legacy', lambda conn: (gate.wait(5), real(conn))[1])
+    cambios = []
+    db.subscribe(cambios.append)
+    try:
+        fut = db.init_async()
+        # La base responde mientras la migración sigue pendiente
+        assert not fut.done()
+        assert db.note_list_titles(None) == []
+        gate.set()
+        assert fut.result(5) == {'eventos_migrados': 1, 'notas_migradas': 1}
+    finally:
+        db.unsubscribe(cambios.append)
+    assert db.note_get('n', None) == 'hola'
+    assert {c.table for c in cambios} == {'events', 'notes'}
+    assert db.get_conn().execute("SELECT 1 FROM meta WHERE key='legacy_migration'").fetchone() is None
+    assert 'Migración completada' in db.consume_migration_message()
+
+
+def test_interrupted_migration_is_retried(tmp_db):
+    assert db.wait_ready(5)
+    db.close_all()
+    _legacy_files()
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.execute("INSERT INTO meta(key,value) VALUES('legacy_migration','pending')")
+    conn.commit()
+    conn.close()
+    assert db.init_async().result(5)['notas_migradas'] == 1
+    assert len(db.event_list_day('2099-01-01')) == 1
+
+
+def test_batched_migration_resumes_from_checkpoint(tmp_db, monkeypatch):
+    assert db.wait_ready(5)
+    db.close_all()
+    db.NOTAS_DIR.mkdir()
+    (db.NOTAS_DIR / 'sub').mkdir()
+    for i in range(5):
+        (db.NOTAS_DIR / ('sub' if i % 2 else '.') / f'n{i}.txt').write_text(f'c{i}', encoding='utf-8')
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.execute("INSERT INTO meta(key,value) VALUES('legacy_migration','pending')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(db, 'LEGACY_BATCH', 2)
+    real = db._op_note_upsert_many
+    llamadas = []
+
+    def _falla_en_el_segundo(tx, rows):
+        llamadas.append(len(rows))
+        if len(llamadas) == 2:
+            raise RuntimeError('corte simulado')
+        return real(tx, rows)
+
+    monkeypatch.setattr(db, '_op_note_upsert_many', _falla_en_el_segundo)
+    assert not db.wait_ready(5)
+    state = db._legacy_state(db.get_conn())
+    assert state['notas'] == 2 and state['notas_tras'] == 'n2.txt'
+    db.close_all()
+    monkeypatch.setattr(db, '_op_note_upsert_many', real)
+    progreso = []
+
+    def _progreso(*a):
+        progreso.append(a)
+
+    db.subscribe_migration_progress(_progreso)
+    try:
+        assert db.init_async().result(5) == {'eventos_migrados': 0, 'notas_migradas': 5}
+    finally:
+        db.unsubscribe_migration_progress(_progreso)
+    assert progreso == [('notas', 4, 5), ('notas', 5, 5)]
+    assert sorted(db.note_list_titles('sub')) == ['n1', 'n3']
+    assert db.note_get('n4', None) == 'c4'
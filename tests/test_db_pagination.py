@@ -0,0 +1,33 @@
+from src import db  # type: ignore
+
+
+def _todas(fetch):
+    out, after = [], None
+    while True:
+        pag = fetch(after)
+        out += pag['results']
+        after = pag['next']
+        if after is None:
+            return out
+
+
+def test_note_titles_and_folders_pages(tmp_db):
+    db.note_upsert_many([(f'n{i:03d}', 'x', 'f') for i in range(25)] + [('otra', 'y', '')])
+    db.note_upsert_many([('t', 'z', f'c{i}') for i in range(7)])
+    primera = db.note_list_titles_page('f', limit=10)
+    assert primera['results'] == [f'n{i:03d}' for i in range(10)] and primera['next'][0] == 'n009'
+    assert _todas(lambda a: db.note_list_titles_page('f', a, limit=10)) == db.note_list_titles('f')
+    assert _todas(lambda a: db.note_list_folders_page(a, limit=3)) == db.note_list_folders()
+    # Un cursor de una fila borrada sigue siendo válido
+    db.note_delete('n009', 'f')
+    assert db.note_list_titles_page('f', primera['next'], limit=1)['results'] == ['n010']
+
+
+def test_event_pages_match_range(tmp_db):
+    db.event_create_many([(f'E{i:02d}', '2024-03-01', f'{i % 24:02d}:00') for i in range(30)])
+    db.event_create('Sin hora', '2024-03-01', None)
+    lo, hi = db.event_start_ts('2024-03-01', '00:00'), db.event_start_ts('2024-03-01', None)
+    paginado = _todas(lambda a: db.event_list_page(lo, hi, a, limit=7))
+    assert [e['title'] for e in paginado] == [e['title'] for e in db.event_list_day('2024-03-01')]
+    assert paginado[-1]['title'] == 'Sin hora'
+
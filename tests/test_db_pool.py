@@ -0,0 +1,58 @@
+import threading, time
+from src import db  # type: ignore
+
+def test_readers_not_blocked_by_writer(tmp_db):
+    db.event_create('Base', '2099-01-01', '08:00')
+    in_tx = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO events(title,date,time) VALUES ('Pendiente','2099-01-01','09:00')")
+            in_tx.set()
+            release.wait(5)
+
+    w = threading.Thread(target=writer)
+    w.start()
+    assert in_tx.wait(5)
+    results: list[tuple[float, list[str]]] = []
+
+    def reader():
+        t0 = time.perf_counter()
+        for _ in range(20):
+            titles = [e['title'] for e in db.event_list_day('2099-01-01')]
+        results.append((time.perf_counter() - t0, titles))
+
+    readers = [threading.Thread(target=reader) for _ in range(8)]
+    for r in readers:
+        r.start()
+    for r in readers:
+        r.join(2)
+    # Todos los lectores terminaron mientras el escritor mantiene la transacción
+    assert len(results) == 8
+    assert all(elapsed < 1.0 for elapsed, _ in results)
+    # Y no ven la fila sin confirmar
+    assert all(titles == ['Base'] for _, titles in results)
+    release.set()
+    w.join(5)
+    assert [e['title'] for e in db.event_list_day('2099-01-01')] == ['Base', 'Pendiente']
+
+def test_each_thread_gets_own_reader(tmp_db):
+    conns = []
+    def grab():
+        conns.append(db.get_conn())
+    ts = [threading.Thread(target=grab) for _ in range(3)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len({id(c) for c in conns}) == 3
+    assert db.get_conn() is db.get_conn()
+
+def test_nested_transaction_joins_outer(tmp_db):
+    with db.transaction():
+        assert db.note_upsert('Anidada', 'x', None)
+        assert db.event_create('Anidado', '2099-02-02', None)
+    assert db.note_get('Anidada', None) == 'x'
+    assert db.config_set('clave', {'a': 1})
+    assert db.config_get('clave') == {'a': 1}
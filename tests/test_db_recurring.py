@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src import db  # type: ignore
+
+
+def _ingenuo(rule: dict, start: date, hasta: date) -> list[date]:
+    """Expansión día a día desde dtstart (referencia)."""
+    out, d = [], start
+    while d <= hasta and (rule['count'] is None or len(out) < rule['count']):
+        if rule['until'] is not None and d > rule['until']:
+            break
+        f, n = rule['freq'], rule['interval']
+        if f == 'DAILY':
+            ok = (d - start).days % n == 0
+        elif f == 'WEEKLY':
+            semana = ((d - timedelta(days=d.weekday())) - (start - timedelta(days=start.weekday()))).days // 7
+            ok = semana % n == 0 and d.weekday() in (rule['byday'] or [start.weekday()])
+        elif f == 'MONTHLY':
+            ok = d.day == start.day and ((d.year - start.year) * 12 + d.month - start.month) % n == 0
+        else:
+            ok = (d.month, d.day) == (start.month, start.day) and (d.year - start.year) % n == 0
+        if ok:
+            out.append(d)
+        d += timedelta(days=1)
+    return out
+
+
+@pytest.mark.parametrize('regla,inicio', [
+    ('FREQ=DAILY;INTERVAL=3;COUNT=40', date(2024, 1, 5)),
+    ('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,SU;COUNT=25', date(2024, 1, 3)),
+    ('FREQ=WEEKLY;UNTIL=20240601', date(2024, 2, 29)),
+    ('FREQ=MONTHLY;COUNT=10', date(2024, 1, 31)),
+    ('FREQ=YEARLY;COUNT=3', date(2024, 2, 29)),
+])
+def test_window_expansion_matches_reference(regla, inicio):
+    rule = db.parse_rrule(regla)
+    todas = _ingenuo(rule, inicio, date(2040, 12, 31))
+    for d0, d1 in ((date(2024, 1, 1), date(2024, 1, 31)), (date(2024, 3, 10), date(2024, 4, 20)),
+                   (date(2024, 11, 1), date(2040, 12, 31))):
+        esperadas = [d for d in todas if d0 <= d <= d1]
+        assert list(db._rrule_dates(rule, inicio, d0, d1)) == esperadas, (d0, d1)
+
+
+def test_parse_rrule_rejects_unsupported():
+    for mala in ('FREQ=HOURLY', 'FREQ=DAILY;BYDAY=MO', 'FREQ=DAILY;COUNT=2;UNTIL=20240101',
+                 'FREQ=WEEKLY;BYMONTH=1', 'FREQ=DAILY;INTERVAL=0', 'FREQ=WEEKLY;BYDAY=XX'):
+        with pytest.raises(ValueError):
+            db.parse_rrule(mala)
+
+
+def test_series_listing_overrides_and_exceptions(tmp_db):
+    db.wait_ready()
+    sid = db.event_series_create('Gimnasio', '2024-05-06', '07:00', 'FREQ=WEEKLY;BYDAY=MO,WE,FR')
+    assert sid
+    db.event_create('Puntual', '2024-05-08', '06:00')
+    semana = db.event_list_week('2024-05-06', '2024-05-12')
+    assert [(e['title'], e['date']) for e in semana] == [
+        ('Gimnasio', '2024-05-06'), ('Puntual', '2024-05-08'), ('Gimnasio', '2024-05-08'), ('Gimnasio', '2024-05-10')]
+    # Completar y borrar ocurrencias con la clave de siempre
+    assert db.event_toggle_complete('Gimnasio', '2024-05-08', '07:00', True)
+    assert db.event_delete('Gimnasio', '2024-05-10', '07:00') == 1
+    assert db.event_occurrence_update(sid, '2024-05-06', time='09:30')
+    dia = {e['date']: e for e in db.event_list_week('2024-05-06', '2024-05-12') if e['title'] == 'Gimnasio'}
+    assert sorted(dia) == ['2024-05-06', '2024-05-08']
+    assert dia['2024-05-08']['completed'] == 1 and dia['2024-05-06']['time'] == '09:30'
+    assert db.event_list_range(*db._day_bounds('2024-05-08'), pending_only=True)[0]['title'] == 'Puntual'
+    # Solo las ocurrencias tocadas tienen fila; desmarcar quita el override
+    n = lambda: db.get_conn().execute('SELECT COUNT(*) FROM event_overrides').fetchone()[0]
+    assert n() == 3
+    db.event_set_completed_many([('Gimnasio', '2024-05-08', '07:00')], False)
+    assert n() == 2
+    assert db.event_list_day('2030-01-07')[0]['title'] == 'Gimnasio'  # serie sin fin
+    assert db.event_series_delete(sid) and n() == 0 and db.event_list_day('2030-01-07') == []
+
+
+def test_series_in_pages_and_alerts(tmp_db):
+    from src.alertas import ProgramadorAlertas  # type: ignore
+    db.wait_ready()
+    db.event_series_create('Pastilla', '2024-01-01', '08:00', 'FREQ=DAILY;COUNT=30')
+    db.event_create_many([(f'E{i}', f'2024-01-{i:02d}', '12:00') for i in range(1, 11)])
+    lo, hi = db._day_bounds('2024-01-01')[0], db._day_bounds('2024-12-31')[1]
+    vistos, after = [], None
+    while True:
+        pag = db.event_list_page(lo, hi, after, limit=7)
+        vistos += [(e['start_ts'], e['title']) for e in pag['results']]
+        after = pag['next']
+        if after is None:
+            break
+    assert vistos == sorted(vistos) and len(vistos) == 40 and len(set(vistos)) == 40
+    prog = ProgramadorAlertas()
+    prog.cargar(ahora=db.event_start_ts('2024-01-15', '07:00'))
+    assert ('Pastilla', '2024-01-15', '08:00') in prog._vivos
+
+
+def test_backup_import_remaps_series_ids(tmp_db, tmp_path):
+    yoga = db.event_series_create('Yoga', '2026-11-05', '08:00', 'FREQ=WEEKLY')
+    assert db.event_occurrence_update(yoga, '2026-11-05', title='Yoga especial', time='18:00')
+    path = db.backup_export(str(tmp_path / 'b.ndjson'))
+    # Base distinta con otra serie en el mismo id
+    db.close_all()
+    db.DB_PATH = tmp_path / 'otra.db'
+    gym = db.event_series_create('Gym', '2026-11-05', '07:00', 'FREQ=WEEKLY')
+    assert gym == yoga
+    for _ in range(2):  # reimportar converge
+        assert db.backup_import(path, batch_size=1)
+    dia = {e['title']: e['time'] for e in db.event_list_day('2026-11-05')}
+    assert dia == {'Gym': '07:00', 'Yoga especial': '18:00'}
+    assert sorted(s['title'] for s in db.event_series_list()) == ['Gym', 'Yoga']
@@ -0,0 +1,66 @@
+from src import db  # type: ignore
+
+
+def _guardar(title, content, when, monkeypatch):
+    monkeypatch.setattr(db.time, 'time', lambda: when)
+    assert db.note_upsert(title, content, 'f')
+
+
+def test_revisions_deltas_and_retrieval(tmp_db, monkeypatch):
+    db.wait_ready()
+    base = ''.join(f'línea {i} con texto de relleno bastante largo\n' for i in range(2000))
+    versiones = [base]
+    _guardar('N', base, 1000, monkeypatch)
+    for k in range(1, 25):
+        v = versiones[-1].replace(f'línea {k * 50} ', f'línea {k * 50} editada ')
+        versiones.append(v)
+        _guardar('N', v, 1000 + k * 120, monkeypatch)
+    revs = db.note_revisions('N', 'f')
+    assert [r['rev'] for r in revs] == list(range(25, 0, -1))
+    deltas = [r for r in revs if not r['full']]
+    assert len(deltas) == 23 and max(r['stored'] for r in deltas) < 200  # ~tamaño de la edición
+    assert {r['rev'] for r in revs if r['full']} == {1, 21}
+    for rev in (1, 7, 20, 21, 25):
+        assert db.note_revision_get('N', 'f', rev) == versiones[rev - 1]
+
+
+def test_burst_coalesces_and_unchanged_save_is_noop(tmp_db, monkeypatch):
+    db.wait_ready()
+    _guardar('A', 'uno', 1000, monkeypatch)
+    _guardar('A', 'uno dos', 2000, monkeypatch)
+    for i, t in enumerate(('uno dos tres', 'uno dos tres cuatro', 'fin')):
+        _guardar('A', t, 2010 + i, monkeypatch)
+    _guardar('A', 'fin', 2100, monkeypatch)  # mismo contenido: sin revisión
+    revs = db.note_revisions('A', 'f')
+    assert [(r['rev'], r['created']) for r in revs] == [(2, 2000), (1, 1000)]
+    assert db.note_revision_get('A', 'f', 2) == 'fin'
+    assert db.note_revision_restore('A', 'f', 1) and db.note_get('A', 'f') == 'uno'
+
+
+def test_retention_keeps_chain_readable(tmp_db, monkeypatch):
+    db.wait_ready()
+    monkeypatch.setattr(db, 'REVISION_KEEP', 5)
+    for i in range(12):
+        _guardar('R', f'v{i}\n' * 3 + 'cola\n', 1000 + i * 100, monkeypatch)
+    revs = db.note_revisions('R', 'f')
+    assert [r['rev'] for r in revs] == [12, 11, 10, 9, 8] and revs[-1]['full']
+    assert db.note_revision_get('R', 'f', 8) == 'v7\n' * 3 + 'cola\n'
+    monkeypatch.setattr(db.time, 'time', lambda: 1000 + 11 * 100 + 86400 * 2)
+    assert db.prune_revisions(max_age_days=1) == 4
+    assert [r['rev'] for r in db.note_revisions('R', 'f')] == [12]
+    assert db.note_revision_get('R', 'f', 12) == db.note_get('R', 'f')
+    db.note_delete('R', 'f')
+    assert db.note_revisions('R', 'f') == []
+
+
+def test_bulk_write_between_saves_keeps_history_consistent(tmp_db, monkeypatch):
+    db.wait_ready()
+    _guardar('B', 'alpha\nbeta\n', 1000, monkeypatch)
+    _guardar('B', 'alpha\nbeta\ngamma\n', 2000, monkeypatch)
+    assert db.note_upsert_many([('B', 'importada\nbeta\n', 'f')]) == [True]
+    _guardar('B', 'importada\nbeta\neditada\n', 3000, monkeypatch)
+    revs = db.note_revisions('B', 'f')
+    assert [r['rev'] for r in revs] == [4, 3, 2, 1]
+    assert db.note_revision_get('B', 'f', 3) == 'importada\nbeta\n'
+    assert db.note_revision_get('B', 'f', 4) == db.note_get('B', 'f') == 'importada\nbeta\neditada\n'
+    assert db.note_revision_get('B', 'f', 2) == 'alpha\nbeta\ngamma\n'
@@ -0,0 +1,59 @@
+import sqlite3
+from datetime import datetime
+from src import db  # type: ignore
+
+def test_day_ordering_and_range(tmp_db):
+    db.event_create_many([
+        ('SinHora', '2099-06-01', None),
+        ('Tarde', '2099-06-01', '18:30'),
+        ('Temprano', '2099-06-01', '7:05'),
+        ('OtroDia', '2099-06-02', '00:00'),
+    ])
+    assert [e['title'] for e in db.event_list_day('2099-06-01')] == ['Temprano', 'Tarde', 'SinHora']
+    assert [e['title'] for e in db.event_list_week('2099-06-01', '2099-06-02')][-1] == 'OtroDia'
+    ts = db.to_start_ts(datetime(2099, 6, 1, 18, 30))
+    rows = db.event_list_range(ts - 60, ts + 60, pending_only=True, timed_only=True)
+    assert [r['title'] for r in rows] == ['Tarde'] and rows[0]['start_ts'] == ts
+
+def test_range_query_uses_covering_index(tmp_db):
+    assert db.wait_ready(10)
+    plan = ' '.join(str(r[3]) for r in db.get_conn().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM events WHERE start_ts BETWEEN 0 AND 1 ORDER BY start_ts, title"))
+    assert 'COVERING INDEX idx_events_start' in plan
+    assert 'TEMP B-TREE' not in plan
+
+def test_v3_upgrade_on_existing_db(tmp_db):
+    # Base con esquema v2 y datos previos
+    conn = sqlite3.connect(str(db.DB_PATH))
+    for ddl in db.SCHEMA:
+        conn.execute(ddl)
+    conn.execute("INSERT INTO meta(key,value) VALUES('schema_version','2')")
+    conn.execute("INSERT INTO events(title,date,time) VALUES ('Viejo','2099-07-01','09:15')")
+    conn.commit()
+    conn.close()
+    evs = db.event_list_day('2099-07-01')
+    assert evs[0]['title'] == 'Viejo'
+    assert evs[0]['start_ts'] == db.to_start_ts(datetime(2099, 7, 1, 9, 15))
+    assert db._get_schema_version(db.get_conn()) >= 3
+
+def test_failed_upgrade_is_not_marked_done(tmp_db, monkeypatch):
+    conn = sqlite3.connect(str(db.DB_PATH))
+    for ddl in db.SCHEMA:
+        conn.execute(ddl)
+    conn.execute("INSERT INTO meta(key,value) VALUES('schema_version','2')")
+    conn.commit()
+    conn.close()
+    real = db._upgrade_to_v3
+    def roto(c):
+        c.execute("CREATE TABLE a_medias (x)")
+        raise sqlite3.OperationalError('disco lleno')
+    monkeypatch.setattr(db, '_upgrade_to_v3', roto)
+    db.wait_ready()
+    w = db.get_conn()
+    assert db._get_schema_version(w) == 2
+    assert not w.execute("SELECT 1 FROM sqlite_master WHERE name='a_medias'").fetchone()
+    db.close_all()
+    monkeypatch.setattr(db, '_upgrade_to_v3', real)
+    db.event_create('Reintento', '2099-07-02', '10:00')
+    assert db.event_list_day('2099-07-02')[0]['title'] == 'Reintento'
+    assert db._get_schema_version(db.get_conn()) == 8
@@ -0,0 +1,28 @@
+import pytest
+
+from src import db
+
+
+def test_stats_per_statement(tmp_db):
+    db.wait_ready()  # el cierre de la migración vacía la caché de lectura
+    db.stats(reset=True)
+    db.note_upsert_many([('A', 'x', ''), ('B', 'y', '')])
+    for _ in range(3):
+        db.note_get('A', None)
+    db.note_list_titles(None)
+    st = db.stats()
+    assert st['note_get']['calls'] == 1 and st['note_get']['rows'] == 1  # resto desde la caché
+    assert st['note_titles']['rows'] == 2
+    assert st['note_upsert']['rows'] == 2
+    for m in st.values():
+        assert m['p95_ms'] >= 0 and m['mean_ms'] * m['calls'] == pytest.approx(m['total_ms'])
+    assert db.stats(reset=True) and db.stats() == {}
+
+
+def test_slow_query_and_error_log(tmp_db, monkeypatch):
+    monkeypatch.setattr(db, 'SLOW_QUERY_MS', 0.0)
+    db.note_get('nada', None)
+    db._log_error('prueba', ValueError('fallo'))
+    log = db.LOG_FILE.read_text(encoding='utf-8')
+    assert 'consulta lenta note_get' in log
+    assert 'prueba: fallo' in log and 'ValueError' in log
@@ -0,0 +1,54 @@
+import pytest
+
+from src import db
+
+
+def _poblar():
+    db.note_upsert_many([
+        ('Receta', 'Moler el CAFÉ y filtrar', 'cocina'),
+        ('Compras', 'leche, pan, "café" molido', 'casa'),
+        ('Otra', 'nada relevante', ''),
+    ])
+
+
+@pytest.fixture(params=['trigram', 'ngram'])
+def modo(request, tmp_db, monkeypatch):
+    if request.param == 'ngram':
+        monkeypatch.setattr(db, 'TRIGRAM_TOKENIZE', 'tokenizador_inexistente')
+    _poblar()
+    assert db.wait_ready(10)
+    actual = db._substring_index(db.get_conn())
+    if actual != request.param:
+        pytest.skip(f'índice {request.param} no disponible')
+    return actual
+
+
+def test_substring_matches_like_path(modo):
+    conn = db.get_conn()
+    for term in ('olid', 'moler', 'leche, pan', '"café"', 'relevante', 'zzz'):
+        esperado = conn.execute(
+            "SELECT title, folder FROM notes WHERE LOWER(content) LIKE ? OR LOWER(title) LIKE ? ORDER BY id",
+            (f"%{term.lower()}%",) * 2).fetchall()
+        esperado = [tuple(r) for r in esperado]
+        assert db.note_search(term) == esperado, term
+    assert db.note_search('mol', 'casa') == [('Compras', 'casa')]
+    # Término corto: recorrido LIKE
+    assert db.note_search('pa') == [('Compras', 'casa')]
+
+
+def test_index_follows_updates_and_deletes(modo):
+    db.note_upsert('Otra', 'ahora habla de jazmines', '')
+    assert db.note_search('jazmin') == [('Otra', '')]
+    assert db.note_search('relevante') == []
+    db.note_delete('Otra', '')
+    assert db.note_search('jazmin') == []
+
+
+def test_index_queries_show_in_stats(modo):
+    db.stats(reset=True)
+    db.note_upsert('Nueva', 'contenido con orquídeas', '')
+    assert db.note_search('orquídea') == [('Nueva', '')]
+    nombres = set(db.stats())
+    assert f'note_search_{modo}' in nombres
+    if modo == 'ngram':
+        assert {'ngram_dirty_any', 'ngram_dirty_ids', 'ngram_put', 'ngram_notes_in'} <= nombres
@@ -0,0 +1,50 @@
+from src import db  # type: ignore
+
+def test_queue_groups_ops_and_reports_results(tmp_db):
+    wq = db.WriteQueue(flush_interval_ms=1000, max_batch=500)
+    futs = [wq.submit(db._op_event_create, f'Ev{i}', '2099-03-01', f'{i:02d}:00') for i in range(10)]
+    # Aún no confirmado: el intervalo es largo y no se alcanzó max_batch
+    assert db.event_list_day('2099-03-01') == []
+    assert wq.flush(timeout=5)
+    assert all(f.result() is True for f in futs)
+    assert len(db.event_list_day('2099-03-01')) == 10
+    borrado = wq.submit(db._op_event_delete, 'Ev0', '2099-03-01', '00:00')
+    wq.close()
+    assert borrado.result(timeout=5) == 1
+
+def test_failed_op_does_not_abort_batch(tmp_db):
+    wq = db.WriteQueue(flush_interval_ms=1000)
+    ok = wq.submit(db._op_note_upsert, 'Buena', 'x', None)
+    def boom(conn):
+        conn.execute("INSERT INTO notes(title, content) VALUES ('Mala', 'y')")
+        raise ValueError('fallo')
+    bad = wq.submit(boom)
+    wq.flush(timeout=5)
+    assert ok.result() is True
+    assert isinstance(bad.exception(), ValueError)
+    assert db.note_get('Buena', None) == 'x'
+    assert db.note_get('Mala', None) is None
+    wq.close()
+
+def test_async_helpers_flush_on_close_all(tmp_db):
+    fut = db.note_upsert_async('Diferida', 'contenido', 'cola')
+    db.close_all()
+    assert fut.result(timeout=5) is True
+    assert db.note_get('Diferida', 'cola') == 'contenido'
+
+def test_close_timeout_fails_queued_ops(tmp_db):
+    import threading
+    wq = db.WriteQueue(flush_interval_ms=0, max_batch=1)
+    empezado, soltar = threading.Event(), threading.Event()
+    def lenta(conn):
+        empezado.set()
+        soltar.wait(5)
+        return 'lenta'
+    primera = wq.submit(lenta)
+    assert empezado.wait(5)
+    encolada = wq.submit(db._op_note_upsert, 'Tarde', 'x', None)
+    wq.close(timeout=0.05)
+    assert isinstance(encolada.exception(timeout=1), RuntimeError)
+    soltar.set()
+    assert primera.result(timeout=5) == 'lenta'
+    assert db.note_get('Tarde', None) is None
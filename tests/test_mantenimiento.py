@@ -0,0 +1,62 @@
+import os
+import sqlite3
+
+from src import db
+from src.mantenimiento import ProgramadorMantenimiento
+
+
+def _llenar_y_borrar(n=400):
+    filas = [(f'N{i}', 'contenido extenso ' * 200, '') for i in range(n)]
+    db.note_upsert_many(filas)
+    db.note_delete_many([(t, f) for t, _, f in filas])
+
+
+def test_incremental_vacuum_and_checkpoint(tmp_db):
+    assert db.wait_ready(5)
+    st = db.maintenance_status()
+    assert st['auto_vacuum'] == 'incremental'
+    _llenar_y_borrar()
+    st = db.maintenance_status()
+    assert st['freelist_pages'] >= db.MAINT_FREELIST_PAGES and db.maintenance_due(st)
+    informe = db.run_maintenance()
+    assert 'incremental_vacuum' in informe['tasks'] and 'optimize' in informe['tasks']
+    assert informe['freed_pages'] >= db.MAINT_FREELIST_PAGES
+    assert informe['reclaimed_bytes'] > 0
+    assert os.path.getsize(f"{db.DB_PATH}-wal") == 0
+    assert not db.maintenance_due()
+
+
+def test_fts_optimize_merges_segments(tmp_db):
+    for i in range(5):
+        db.note_upsert(f'N{i}', 'hola mundo', '')
+    assert db.wait_ready(5)
+    assert db.maintenance_status()['fts_segments']['notes_fts'] > 1
+    informe = db.run_maintenance(force=True)
+    assert 'fts_optimize:notes_fts' in informe['tasks']
+    assert set(db.maintenance_status()['fts_segments'].values()) == {1}
+
+
+def test_old_database_converted_with_vacuum(tmp_db):
+    conn = sqlite3.connect(db.DB_PATH)
+    for ddl in db.SCHEMA:
+        conn.execute(ddl)
+    conn.commit()
+    conn.close()
+    assert db.wait_ready(5)
+    assert db.maintenance_status()['auto_vacuum'] == 'none'
+    _llenar_y_borrar()
+    informe = db.run_maintenance()
+    assert 'vacuum' in informe['tasks']
+    st = db.maintenance_status()
+    assert st['auto_vacuum'] == 'incremental' and st['freelist_pages'] == 0
+
+
+def test_scheduler_waits_for_idle(tmp_db, monkeypatch):
+    assert db.wait_ready(5)
+    monkeypatch.setattr(db, 'MAINT_CHANGES', 1)
+    db.note_upsert('N', 'x', '')
+    informes = []
+    prog = ProgramadorMantenimiento(inactividad=3600, al_terminar=informes.append)
+    assert prog.revisar() is None
+    prog.inactividad = 0
+    assert prog.revisar() is not None and informes and prog.ultimo_informe is informes[0]
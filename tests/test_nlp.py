@@ -0,0 +1,165 @@
+import pytest
+from src import nlp  # type: ignore
+
+
+@pytest.mark.parametrize('texto,intent,params', [
+    ("crear evento Reunión el 2024-05-01 a las 10:30", 'create_event',
+     {'title': 'Reunión', 'date': '2024-05-01', 'time': '10:30'}),
+    ("eliminar evento Cita de 2024-01-02", 'delete_event', {'title': 'Cita', 'date': '2024-01-02', 'time': None}),
+    ("Crear Nota compras en casa", 'create_note', {'title': 'compras', 'folder': 'casa'}),
+    ("buscar nota pan", 'search_note', {'term': 'pan', 'folder': None}),
+    ("poner tema Oscuro", 'change_theme', {'theme': 'oscuro'}),
+    ("abrir el bloc de notas", 'open_app', {'app': 'bloc de notas'}),
+])
+def test_comandos_con_parametros(texto, intent, params):
+    r = nlp.analyze(texto)
+    assert r['intent'] == intent
+    assert r['params'] == params
+
+
+def test_palabra_clave_solo_al_inicio_de_palabra():
+    # "componer" contiene "poner" pero no empieza un comando
+    assert nlp.analyze("componer voz grave")['intent'] != 'change_voice'
+    # Gana el comando más a la izquierda
+    r = nlp.analyze("crear nota pon tema claro")
+    assert r['intent'] == 'create_note' and r['params']['title'] == 'pon tema claro'
+    assert nlp.analyze("qué tengo hoy")['intent'] == 'query_events_day'
+    assert nlp.analyze("Buenos días")['confidence'] == 1.0
+
+
+def test_compile_patterns_agrega_comandos(monkeypatch):
+    monkeypatch.setattr(nlp, 'COMMAND_PATTERNS', nlp.COMMAND_PATTERNS + [
+        ("play_music", ("reproducir",), r"reproducir (?P<song>.+)$", 0.8)])
+    monkeypatch.setattr(nlp, 'INTENT_PATTERNS', nlp.INTENT_PATTERNS + [("stop", ["detener todo"])])
+    nlp.compile_patterns()
+    try:
+        assert nlp.analyze("reproducir La Bamba")['params'] == {'song': 'La Bamba'}
+        assert nlp.analyze("detener todo")['intent'] == 'stop'
+    finally:
+        monkeypatch.undo()
+        nlp.compile_patterns()
+    assert nlp.analyze("reproducir La Bamba")['intent'] != 'play_music'
+
+
+def _lcs(p, t):
+    prev = [0] * (len(t) + 1)
+    for a in p:
+        cur = [0]
+        for j, b in enumerate(t):
+            cur.append(prev[j] + 1 if a == b else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def test_lcs_bit_paralelo_coincide_con_programacion_dinamica():
+    import random
+    rnd = random.Random(3)
+    for _ in range(300):
+        p = ''.join(rnd.choice('abc ') for _ in range(rnd.randint(1, 12)))
+        texto = ''.join(rnd.choice('abc ') for _ in range(rnd.randint(0, 25)))
+        masks = {}
+        for i, ch in enumerate(p):
+            masks[ch] = masks.get(ch, 0) | (1 << i)
+        assert nlp._lcs_length(masks, len(p), texto) == _lcs(p, texto)
+
+
+@pytest.mark.parametrize('texto,intent', [
+    # Dentro de una palabra o con poca cobertura: nada
+    ("holanda", None), ("consalir", None), ("quiero salir", None), ("salir ahora", None),
+    ("no quiero salir", None), ("oye hola", None),
+    # Como la razón de SequenceMatcher sobre el texto entero
+    ("agenda", 'query_events_day'), ("sal", 'exit_app'), ("holaa", 'greet'), ("salir ya", 'exit_app'),
+])
+def test_puntuacion_difusa_respeta_palabras(texto, intent):
+    assert nlp.analyze(texto)['intent'] == intent
+
+
+def test_rank_intents_top_k():
+    ranked = nlp.rank_intents("holaa", k=3)
+    assert ranked[0][0] == 'greet' and ranked[0][1] >= nlp.FUZZY_THRESHOLD
+    assert len({i for i, _c in ranked}) == len(ranked) <= 3
+    assert [c for _i, c in ranked] == sorted((c for _i, c in ranked), reverse=True)
+    # Frase exacta dentro de una oración: puntúa, pero menos que sola
+    sola = nlp.rank_intents("salir", 1)[0]
+    dentro = nlp.rank_intents("ya quiero salir", 1)[0]
+    assert sola == ('exit_app', 1.0) and dentro[0] == 'exit_app' and dentro[1] < 1.0
+    assert nlp.rank_intents("xyz") == []
+
+
+def test_cache_de_analyze():
+    nlp.cache_clear(reset_stats=True)
+    for _ in range(3):
+        assert nlp.analyze("Qué tengo hoy")['intent'] == 'query_events_day'
+    nlp.analyze("que tengo hoy")  # misma normalización
+    st = nlp.cache_stats()
+    assert (st['hits'], st['misses'], st['items']) == (3, 1, 1)
+    # Con parámetros solo se reutiliza para el mismo texto original
+    assert nlp.analyze("crear nota Compras")['params']['title'] == 'Compras'
+    assert nlp.analyze("crear nota compras")['params']['title'] == 'compras'
+    # El resultado devuelto es una copia
+    nlp.analyze("hola")['params']['x'] = 1
+    assert nlp.analyze("hola")['params'] == {}
+
+
+def test_cache_respeta_validez_de_fechas_relativas(monkeypatch):
+    import datetime as dt
+    ahora = dt.datetime.now()
+    manana = dt.datetime.combine(ahora.date() + dt.timedelta(days=1), dt.time(17, 0))
+    monkeypatch.setattr(nlp, '_parse_natural_datetime', lambda frase: manana)
+    nlp.cache_clear(reset_stats=True)
+    nlp.analyze("pon recordatorio pagar para mañana a las 5")
+    nlp.analyze("pon recordatorio pagar para mañana a las 5")
+    nlp.analyze("pon recordatorio pagar en 10 minutos")
+    nlp.analyze("pon recordatorio pagar en 10 minutos")
+    assert nlp.cache_stats()['hits'] == 1
+    medianoche = dt.datetime.combine(ahora.date() + dt.timedelta(days=1), dt.time())
+    assert nlp._when_expiry("mañana a las 5", manana, ahora) == medianoche.timestamp()
+    assert nlp._when_expiry("mañana", manana, ahora) == 0
+    assert nlp._when_expiry("2030-01-02 10:00", manana, ahora) == float('inf')
+
+
+def test_warmup_carga_dateparser_en_segundo_plano(monkeypatch):
+    import sys, types, datetime as dt
+    llamadas = []
+    falso = types.ModuleType('dateparser')
+    falso.parse = lambda frase, settings=None: llamadas.append(frase) or dt.datetime(2030, 1, 2, 17, 0)
+    monkeypatch.setitem(sys.modules, 'dateparser', falso)
+    monkeypatch.setattr(nlp, '_dateparser', None)
+    monkeypatch.setattr(nlp, '_warm_future', None)
+    assert not nlp.is_ready()
+    assert nlp.wait_ready(5) and nlp.is_ready()
+    assert llamadas and 'dateparser_first_parse' in nlp.load_times()
+    nlp.cache_clear()
+    r = nlp.analyze("pon recordatorio pagar para 2030-01-02 17:00")
+    assert r['params']['when_iso'] == '2030-01-02T17:00:00'
+
+
+_AHORA = __import__('datetime').datetime(2025, 3, 5, 10, 0, 30)  # miércoles
+
+
+@pytest.mark.parametrize('frase,esperado,caduca', [
+    ("mañana a las 5 de la tarde", "2025-03-06T17:00:00", 'medianoche'),
+    ("en 10 minutos", "2025-03-05T10:10:30", 0.0),
+    ("dentro de media hora", "2025-03-05T10:30:30", 0.0),
+    ("pasado mañana", "2025-03-07T10:00:30", 0.0),
+    ("el lunes a las 9:30", "2025-03-10T09:30:00", 'medianoche'),
+    ("el miércoles a las 11", "2025-03-05T11:00:00", 'fecha'),
+    ("el miércoles a las 9", "2025-03-12T09:00:00", 'medianoche'),
+    ("a las 9 menos cuarto", "2025-03-06T08:45:00", 'medianoche'),
+    ("4 de marzo", "2026-03-04T00:00:00", 'medianoche'),
+    ("10/03/2026 a las 8 pm", "2026-03-10T20:00:00", float('inf')),
+])
+def test_parse_when(frase, esperado, caduca):
+    import datetime as dt
+    fecha, exp = nlp.parse_when(frase, _AHORA)
+    assert fecha.isoformat() == esperado
+    if caduca == 'medianoche':
+        caduca = dt.datetime(2025, 3, 6).timestamp()
+    elif caduca == 'fecha':
+        caduca = fecha.timestamp()
+    assert exp == caduca
+
+
+def test_parse_when_no_reconoce():
+    for frase in ("mañana a las 25", "31 de febrero", "la oficina para mañana", "cuando pueda"):
+        assert nlp.parse_when(frase, _AHORA) is None
@@ -0,0 +1,44 @@
+import pytest
+
+from src.paginacion import CargaPaginada  # type: ignore
+
+
+class _Senal:
+    def connect(self, _cb):
+        pass
+
+
+class _Barra:
+    valueChanged = _Senal()
+    rangeChanged = _Senal()
+
+    def value(self):
+        return 0
+
+    def maximum(self):
+        return 0
+
+
+class _Lista:
+    def __init__(self):
+        self.items = []
+
+    def verticalScrollBar(self):
+        return _Barra()
+
+    def clear(self):
+        self.items = []
+
+    def addItems(self, filas):
+        self.items += filas
+
+
+def test_cubre_compares_cursors_as_they_come():
+    carpetas = CargaPaginada(_Lista(), lambda despues: {'results': ['a', 'mm'], 'next': 'mm'})
+    carpetas.recargar()
+    assert carpetas.cubre('b') and not carpetas.cubre('zz')
+    with pytest.raises(TypeError):
+        carpetas.cubre(('b',))
+    titulos = CargaPaginada(_Lista(), lambda despues: {'results': ['t'], 'next': ('t', 5)})
+    titulos.recargar()
+    assert titulos.cubre(('t',)) and not titulos.cubre(('u',))
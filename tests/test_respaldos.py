@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import time
+
+from src import db
+from src.respaldos import ProgramadorRespaldos
+
+
+def test_snapshot_full_copy_with_progress(tmp_db):
+    db.note_upsert_many([(f'N{i}', 'texto ' * 500, '') for i in range(200)])
+    pasos = []
+    ruta = db.snapshot_create(pages=8, sleep=0, progress=lambda c, t: pasos.append((c, t)))
+    assert ruta and ruta.startswith(str(db.snapshot_dir()))
+    assert len(pasos) > 1 and pasos[-1][0] == pasos[-1][1]
+    conn = sqlite3.connect(ruta)
+    assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 200
+    assert conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+    assert conn.execute("SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH 'texto'").fetchone()[0] == 200
+    conn.close()
+    assert not list(db.snapshot_dir().glob('*.tmp'))
+
+
+def test_rotate_keeps_newest(tmp_db):
+    d = db.snapshot_dir()
+    d.mkdir(parents=True, exist_ok=True)
+    for i in range(5):
+        (d / f'snapshot_2024010{i}_000000.db').write_bytes(b'')
+    borrados = db.snapshot_rotate(keep=2)
+    assert len(borrados) == 3
+    assert [p.name for p in db.snapshot_list()] == ['snapshot_20240103_000000.db', 'snapshot_20240104_000000.db']
+
+
+def test_scheduler_on_demand_and_schedule(tmp_db):
+    terminados = []
+    prog = ProgramadorRespaldos(intervalo=3600, conservar=1, al_terminar=terminados.append)
+    assert prog.proximo() == 0.0
+    prog.iniciar(retraso=3600)
+    try:
+        ruta = prog.respaldar_ahora().result(timeout=10)
+        assert ruta and os.path.exists(ruta) and terminados == [ruta]
+        assert 3500 < prog.proximo() <= 3600
+        # Con un snapshot reciente no se repite hasta que venza el intervalo
+        old = time.time() - 7200
+        os.utime(ruta, (old, old))
+        assert prog.proximo() == 0.0
+    finally:
+        prog.detener()
+    assert len(db.snapshot_list()) == 1